@@ -39,499 +39,5893 @@ Usage Examples:
     # Export results to JSON
     python analyze_hot_modules.py --export analysis.json
 
+    # Whole hierarchy for flamegraph.pl / speedscope, or as an HTML treemap
+    python analyze_hot_modules.py --flamegraph bundle.folded --weight gzip
+    flamegraph.pl --countname bytes bundle.folded > bundle.svg
+    python analyze_hot_modules.py --input .next/stats.json --treemap treemap.html --weight retained
+
+    # Stream very large reports (memory scales with the largest chunk)
+    python analyze_hot_modules.py --stream
+
+    # Re-runs on an unchanged report skip parsing (writes to ~/.cache/analyze-hot-modules)
+    python analyze_hot_modules.py --cache
+
+    # Find modules shipped more than once
+    python analyze_hot_modules.py --duplicates
+
+    # Initial JS cost per route on a slow phone over 3G
+    python analyze_hot_modules.py --entrypoints --network slow-3g --cpu low-end-mobile
+
+    # Measure what the CDN actually serves (gzip/deflate, zstd/brotli if installed)
+    python analyze_hot_modules.py --measure --codecs gzip-6,gzip-9,brotli-11
+    python analyze_hot_modules.py --what-if-merge framework vendor
+
+    # Attribute minified bytes to original files and packages (productionBrowserSourceMaps)
+    python analyze_hot_modules.py --source-maps --compact-tree
+
+    # client, nodejs and edge reports at once; modules shipped to several targets
+    python analyze_hot_modules.py --input .next/analyze
+    python analyze_hot_modules.py --input .next/analyze/client.html .next/analyze/edge.html
+
+    # Analyze webpack stats.json directly (keeps the module graph)
+    python analyze_hot_modules.py --input .next/stats.json
+
+    # Bytes that would disappear with each import (dominator tree over stats.json)
+    python analyze_hot_modules.py --input .next/stats.json --retained --tree
+
+    # Which direct dependencies pull in the most bytes (resolved via package-lock.json)
+    python analyze_hot_modules.py --packages
+
+    # Simulate splitChunks policies without rebuilding, or search for a better one
+    python analyze_hot_modules.py --simulate-split policy.json
+    python analyze_hot_modules.py --search-split 5000 --route-weights traffic.json
+
+    # Where does the time go? Per-phase breakdown plus a Chrome trace
+    python analyze_hot_modules.py --profile --profile-output profile.trace.json
+
+    # Compare two builds (reports or exports); chunk hashes are ignored
+    python analyze_hot_modules.py --diff base.json head.json --diff-metric gzip
+
+    # Which chunks a returning visitor re-downloads after a deploy
+    python analyze_hot_modules.py --cache-churn base.json head.json
+
+    # Fail CI when a route, chunk, package or category exceeds its budget
+    python analyze_hot_modules.py --budgets budgets.json --budget-baseline main.json --budget-output verdict.json
+
+    # Keep a local size history: record this build, backfill old reports, query trends
+    python analyze_hot_modules.py --input .next/analyze --history bundle-history.db
+    python analyze_hot_modules.py --history bundle-history.db --backfill reports/
+    python analyze_hot_modules.py --history bundle-history.db --trend react-dom --history-builds 200
+    python analyze_hot_modules.py --history bundle-history.db --first-crossing static/chunks/framework.js 200
+
+    # Re-index .next/analyze/*.html on every rebuild and answer queries over HTTP
+    python analyze_hot_modules.py --watch .next/analyze --port 8765
+    curl 'http://127.0.0.1:8765/top?report=client&n=10'
+
 Arguments:
-    --input FILE       Path to bundle analyzer HTML file (default: .next/analyze/client.html)
+    --input FILE       Bundle analyzer HTML, webpack stats.json, JSON or .ahm export
+                       (default: .next/analyze/client.html); several files or a directory
+                       are parsed concurrently as targets of one build
     --top N            Show top N modules (default: 20)
     --min-size SIZE    Minimum size in KB to consider (default: 50)
     --filter TYPE      Filter modules: 'all', 'node_modules', or 'local' (default: all)
     --tree             Show hierarchical tree view of modules
     --compact-tree     Show compact tree view grouped by category
     --export FILE      Export results to JSON file
+    --export-format F  'json' or 'compact' (memory-mappable; default for .ahm files)
+    --flamegraph FILE  Collapsed stacks (chunk;dir;...;module bytes) of every module for flamegraph.pl/speedscope
+    --treemap FILE     Self-contained HTML treemap of every module
+    --weight W         'parsed', 'gzip' or 'retained' bytes for --flamegraph/--treemap (default: parsed)
+    --profile          Print per-phase wall/CPU time, peak memory and item counts
+    --profile-output F Write phases as JSON lines (.jsonl) or a Chrome trace-event file
+    --stream           Memory-map the report and decode chunks one at a time
+    --duplicates       Report duplicated modules and the bytes deduplication would save
+    --entrypoints      Report initial JS bytes (shared vs unique) and load time per route
+    --network PROFILE  Network profile name or KBPS:RTT_MS (default: fast-3g)
+    --cpu PROFILE      CPU profile name or PARSE_BYTES_PER_MS (default: mid-mobile)
+    --measure          Compress emitted chunk files in parallel and show measured sizes
+    --codecs LIST      Codecs to measure, e.g. gzip-6,gzip-9,deflate-9,zstd-19,brotli-11
+    --source-maps      Attribute chunk bytes to original source files via emitted .js.map files
+    --workers N        Worker processes for parallel work (default: all cores)
+    --cache            Reuse flattened tables across runs from a parse cache (off by default)
+    --cache-dir DIR    Parse cache directory (default: ~/.cache/analyze-hot-modules)
+    --cache-size MB    Parse cache size limit, LRU-evicted (default: 512)
+    --what-if-merge C  Measure the compressed size of several chunks merged into one
+    --retained         Rank modules/packages by retained size (stats.json input)
+    --retained-entrypoint NAME  Retained sizes as seen from a single entrypoint
+    --packages         Per package@version sizes and bytes pulled in by each direct dependency
+    --lockfile FILE    package-lock.json for --packages (default: project root or cwd)
+    --category-rules F JSON category rules for --compact-tree (package globs, path regexes)
+    --simulate-split F Evaluate a splitChunks-like policy JSON in memory
+    --search-split N   Search N candidate policies minimizing weighted route payload
+    --route-weights F  JSON object of per-entrypoint weights for the search
+    --request-cost B   Byte-equivalent cost of one extra initial request (default: 1024)
+    --build-dir DIR    Next.js build directory with emitted chunks (default: .next)
+    --diff BASE HEAD   Compare two reports/exports by hash-insensitive module key
+    --diff-metric M    Rank diff changes by 'parsed' or 'gzip' delta (default: parsed)
+    --cache-churn B H  Invalidated chunks, triggering modules and re-fetch bytes per entrypoint
+    --watch [DIR]      Keep reports indexed in memory and serve /top, /tree, /diff queries
+    --port N           HTTP port for --watch on 127.0.0.1 (default: 8765)
+    --socket PATH      Serve --watch queries on a Unix socket instead
+    --poll             Poll for changes instead of inotify (--poll-interval seconds)
+    --budgets FILE     Size budgets (glob/re: rules over entrypoints, chunks, packages, categories); exit 1 on failure
+    --budget-baseline R  Baseline report/export (or directory, per target) for delta_* limits
+                       (default: the budgets file's "baseline")
+    --budget-output F  Write the machine-readable budget verdict as JSON
+    --history DB       SQLite size history; a normal run records this build (--build-label, --commit, --target)
+    --backfill DIR     Ingest past reports (DIR/<build>/**/<target>.html, or DIR/<build>.html) in parallel;
+                       dated by export timestamp, else commit date (build named by a SHA), else file mtime
+    --trend NAME       Parsed/gzip history of a package or module key over --history-builds builds
+    --first-crossing C KB  First build where chunk C reached KB (--history-metric gzip or parsed)
 """
 
+from array import array
+import codecs
+import contextlib
+import fnmatch
+import functools
+import hashlib
+import heapq
+import http.server
+import io
 import json
+import mmap
 import re
 import argparse
+import os
+import random
+import select
+import socketserver
+import sqlite3
+import struct
+import subprocess
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from urllib.parse import parse_qs, urlsplit
+from typing import Dict, List, Any, Iterator, Optional, Sequence, Tuple
 import sys
+import zlib
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; typed arrays are used instead
+    np = None
 
-class BundleAnalyzer:
-    """Analyzes bundle analyzer data from Next.js webpack-bundle-analyzer."""
+try:
+    import zstandard
+except ImportError:  # Optional codec
+    zstandard = None
 
-    def __init__(self, html_file: str):
-        self.html_file = Path(html_file)
-        self.chart_data: List[Dict[str, Any]] = []
-        self.modules: List[Dict[str, Any]] = []
+try:
+    import brotli
+except ImportError:  # Optional codec
+    brotli = None
+
+
+CHART_DATA_MARKER = b'window.chartData'
+STREAM_WINDOW = 1 << 20
+_JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_JSON_WHITESPACE_BYTES = re.compile(rb'[ \t\n\r]*')
+_JSON_STRING_BYTES = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+_JSON_SCALAR_BYTES = re.compile(rb'[^,}\]\s]+')
+_JSON_STRUCTURE_BYTES = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]')
+
+ASSET_EXTENSIONS = ('.png', '.jpg', '.svg', '.woff', '.woff2')
+FLAG_NODE_MODULES = 1
+FLAG_ASSET = 2
+
+# Transfer profiles: bandwidth in kilobits per second, round-trip time in ms
+NETWORK_PROFILES = {
+    'slow-3g': {'bandwidth_kbps': 400, 'rtt_ms': 400},
+    'fast-3g': {'bandwidth_kbps': 1600, 'rtt_ms': 150},
+    '4g': {'bandwidth_kbps': 9000, 'rtt_ms': 85},
+    'cable': {'bandwidth_kbps': 5000, 'rtt_ms': 28},
+    'fiber': {'bandwidth_kbps': 100000, 'rtt_ms': 5},
+}
+# Parse/compile throughput in bytes of parsed JavaScript per millisecond
+CPU_PROFILES = {
+    'low-end-mobile': {'parse_bytes_per_ms': 1000},
+    'mid-mobile': {'parse_bytes_per_ms': 3000},
+    'desktop': {'parse_bytes_per_ms': 10000},
+}
+
+_VENDORED_PACKAGE = re.compile(r'^dist/compiled/((?:@[^/]+/)?[^/]+)/(.*)$')
+_CHUNK_HASH = re.compile(r'[-.~][0-9a-f]{8,}(?=\.[A-Za-z0-9]+$)')
+_CONCATENATED_SUFFIX = re.compile(r' \+ \d+ modules \(concatenated\)$')
+_COMMIT_SHA = re.compile(r'^[0-9a-f]{7,40}$')
+
+
+def find_chart_data(buf: Any) -> int:
+    """Return the byte offset of the chartData array opening bracket, or -1."""
+    pos = buf.find(CHART_DATA_MARKER)
+    if pos < 0:
+        return -1
+
+    # Walk `\s*=\s*[` by hand; a plain find never backtracks over the payload
+    pos += len(CHART_DATA_MARKER)
+    end = len(buf)
+    while pos < end and buf[pos:pos + 1].isspace():
+        pos += 1
+    if buf[pos:pos + 1] != b'=':
+        return -1
+    pos += 1
+    while pos < end and buf[pos:pos + 1].isspace():
+        pos += 1
+    return pos if buf[pos:pos + 1] == b'[' else -1
+
+
+def utc_timestamp(seconds: Optional[float] = None) -> str:
+    """ISO 8601 UTC timestamp (``2025-01-24T09:30:00Z``) for ``seconds``, or now."""
+    moment = datetime.fromtimestamp(time.time() if seconds is None else seconds, timezone.utc)
+    return moment.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def normalize_chunk_name(label: str) -> str:
+    """Strip the content hash from an emitted chunk file name."""
+    return _CHUNK_HASH.sub('', label)
+
+
+def normalize_module_path(path: str) -> str:
+    """Turn a webpack module path into a build-independent module key.
+
+    Concatenated modules are keyed by their inner module, and ``./`` and
+    empty segments (``./node_modules/./node_modules/...``) are collapsed.
+    """
+    if ' (concatenated)' in path:
+        if ' (concatenated)/' in path:
+            path = path.rsplit(' (concatenated)/', 1)[1]
+        path = _CONCATENATED_SUFFIX.sub('', path)
+    if path.startswith('./'):
+        path = path[2:]
+    if '/./' in path or '//' in path or path.startswith('.'):
+        path = '/'.join(part for part in path.split('/') if part and part != '.')
+    return path
+
+
+def package_name(path: str) -> Optional[str]:
+    """Return the npm package a module path belongs to, or None for local code."""
+    if 'node_modules/' not in path:
+        return None
+    parts = path.rsplit('node_modules/', 1)[1].split('/')
+    if parts[0].startswith('@') and len(parts) >= 2:
+        # Scoped package
+        return f"{parts[0]}/{parts[1]}"
+    return parts[0]
+
+
+def package_relative_path(path: str) -> Tuple[Optional[str], str]:
+    """Split a module key into ``(package, path inside the package)``.
+
+    Packages vendored by another one (``next/dist/compiled/react-dom``) are
+    attributed to the vendored package so they line up with the real copy.
+    """
+    package = package_name(path)
+    if package is None:
+        return None, path
+
+    relative = path.rsplit('node_modules/', 1)[1][len(package) + 1:]
+    vendored = _VENDORED_PACKAGE.match(relative)
+    if vendored:
+        return vendored.group(1), vendored.group(2)
+    return package, relative
+
+
+def resolve_profile(value: str, profiles: Dict[str, Dict[str, float]],
+                    fields: Sequence[str]) -> Dict[str, float]:
+    """Resolve a named profile or a custom ``value[:value...]`` spec for ``fields``."""
+    if value in profiles:
+        return dict(profiles[value])
+    try:
+        numbers = [float(part) for part in value.split(':')]
+    except ValueError:
+        numbers = []
+    if len(numbers) != len(fields):
+        known = ', '.join(profiles)
+        raise ValueError(f"Unknown profile '{value}' (known: {known}, or {':'.join(fields).upper()})")
+    if not all(number > 0 for number in numbers):
+        raise ValueError(f"Profile values must be positive: '{value}'")
+    return dict(zip(fields, numbers))
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Yield the indices of the set bits of an integer bitset."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def file_digest(path: Path, block_size: int = STREAM_WINDOW) -> str:
+    """Return the BLAKE2b content hash of a file."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Replace ``path`` with ``data`` through a uniquely named temporary file."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+
+
+def iter_json_object(members: Sequence[Tuple[str, Any]], encoder: json.JSONEncoder) -> Iterator[str]:
+    """Encode ``(key, value)`` members as one JSON object, exactly like ``encoder.iterencode``.
+
+    Values that are iterators (generators) are written as arrays one element
+    at a time, so a large section never has to exist as a list. ``encoder``
+    must use an integer ``indent``.
+    """
+    step = ' ' * encoder.indent
+    key_encoder = json.JSONEncoder(ensure_ascii=encoder.ensure_ascii)
+
+    def nested(value: Any, newline: str) -> Iterator[str]:
+        for piece in encoder.iterencode(value):
+            yield piece.replace('\n', newline) if '\n' in piece else piece
+
+    yield '{'
+    first = True
+    for key, value in members:
+        yield f"{',' if not first else ''}\n{step}{key_encoder.encode(key)}: "
+        first = False
+        if not isinstance(value, Iterator):
+            yield from nested(value, '\n' + step)
+            continue
+        empty = True
+        for item in value:
+            yield f"{'[' if empty else ','}\n{step * 2}"
+            empty = False
+            yield from nested(item, '\n' + step * 2)
+        yield '[]' if empty else f"\n{step}]"
+    yield '}' if first else '\n}'
+
+
+def iter_json_array(buf: Any, start: int,
+                    window: int = STREAM_WINDOW) -> Iterator[Tuple[int, int, Any]]:
+    """Incrementally decode the JSON array opening at ``buf[start]``.
+
+    ``buf`` is any bytes-like buffer (typically an ``mmap``). Elements are
+    yielded one at a time as ``(byte_start, byte_end, value)`` while only a
+    sliding text window is decoded, so peak memory is bounded by the window
+    plus the largest single element rather than by the whole array. The
+    generator returns the offset just past the closing bracket.
+    """
+    if buf[start:start + 1] != b'[':
+        raise json.JSONDecodeError("Expecting '['", '', 0)
+
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')('surrogateescape')
+    size = len(buf)
+    read_pos = start + 1
+    text = ''
+    i = 0
+    byte_pos = start + 1  # byte offset corresponding to text[i]
+    need = window
+    first = True
+
+    def byte_len(s: str) -> int:
+        return len(s) if s.isascii() else len(s.encode('utf-8', 'surrogateescape'))
+
+    while True:
+        # Make sure there is at least one significant character to look at
+        j = _JSON_WHITESPACE.match(text, i).end()
+        if j >= len(text):
+            if read_pos >= size:
+                raise json.JSONDecodeError('Unterminated array', text, j)
+            byte_pos += byte_len(text[i:j])
+            chunk = buf[read_pos:read_pos + need]
+            read_pos += len(chunk)
+            text = utf8.decode(chunk, read_pos >= size)
+            i = 0
+            continue
+
+        ch = text[j]
+        if ch == ']':
+            # The generator's return value is the offset just past the array
+            return byte_pos + byte_len(text[i:j]) + 1
+        if not first:
+            if ch != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", text, j)
+            j = _JSON_WHITESPACE.match(text, j + 1).end()
 
-    def extract_chart_data(self) -> bool:
-        """Extract chartData from the HTML file."""
         try:
-            with open(self.html_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+            value, end = decoder.raw_decode(text, j)
+            if end >= len(text) and read_pos < size:
+                # A value touching the window edge may be a truncated number
+                raise json.JSONDecodeError('Truncated value', text, end)
+        except json.JSONDecodeError:
+            if read_pos >= size:
+                raise
+            # Keep the unconsumed tail and double the read until the element fits
+            chunk = buf[read_pos:read_pos + need]
+            read_pos += len(chunk)
+            text = text[i:] + utf8.decode(chunk, read_pos >= size)
+            i = 0
+            need *= 2
+            continue
 
-            # Find the chartData assignment
-            chart_data_match = re.search(r'window\.chartData\s*=\s*(\[.*?\]);', content, re.DOTALL)
+        element_start = byte_pos + byte_len(text[i:j])
+        element_end = element_start + byte_len(text[j:end])
+        yield element_start, element_end, value
 
-            if not chart_data_match:
-                print("Error: Could not find chartData in HTML file")
-                return False
+        byte_pos = element_end
+        i = end
+        need = window
+        first = False
 
-            chart_data_json = chart_data_match.group(1)
 
-            # Parse the JSON data
-            self.chart_data = json.loads(chart_data_json)
-            return True
+class PhaseProfiler:
+    """Wall time, CPU time, peak traced memory and item counts per named phase.
+
+    Phases nest: ``with profiler.phase('flatten') as record:`` yields the
+    record dict, so callers can fill in ``record['items']``. Peak memory is
+    tracked with :mod:`tracemalloc` and reported as the growth over the
+    memory in use when the phase started; nested phases roll their peaks up
+    into their parents. A disabled profiler costs one attribute check per
+    phase, which is what :class:`BundleAnalyzer` uses by default.
+    """
+
+    def __init__(self, enabled: bool = True, trace_memory: bool = True):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.records: List[Dict[str, Any]] = []
+        self._stack: List[Dict[str, Any]] = []
+        self._origin = time.perf_counter()
+        self._started_tracing = False
+
+    @contextlib.contextmanager
+    def phase(self, name: str, items: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Time the enclosed block as phase ``name``."""
+        record: Dict[str, Any] = {'name': name, 'items': items, 'depth': len(self._stack)}
+        if not self.enabled:
+            yield record
+            return
+
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            current, peak = tracemalloc.get_traced_memory()
+            for outer in self._stack:
+                outer['_peak'] = max(outer['_peak'], peak)
+            tracemalloc.reset_peak()
+            record['_base'] = record['_peak'] = current
+        self.records.append(record)
+        self._stack.append(record)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record['start_ms'] = (wall - self._origin) * 1000
+            record['wall_ms'] = (time.perf_counter() - wall) * 1000
+            record['cpu_ms'] = (time.process_time() - cpu) * 1000
+            self._stack.pop()
+            if self.trace_memory:
+                peak = max(record.pop('_peak'), tracemalloc.get_traced_memory()[1])
+                record['peak_kb'] = (peak - record.pop('_base')) // 1024
+                if self._stack:
+                    self._stack[-1]['_peak'] = max(self._stack[-1]['_peak'], peak)
+
+    def stop(self) -> None:
+        """Stop memory tracing if this profiler started it."""
+        if self._started_tracing:
+            self._started_tracing = False
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+    def print_report(self) -> None:
+        """Print the phase breakdown, nested phases indented under their parent."""
+        print("\n⏱️  Phase Profile")
+        print("=" * 90)
+        print(f"{'Phase':<36} {'Wall ms':>10} {'CPU ms':>10} {'Peak MB':>9} {'Items':>10} {'Items/s':>11}")
+        print("-" * 90)
+        for record in self.records:
+            name = "  " * record['depth'] + record['name']
+            peak = f"{record['peak_kb'] / 1024:.1f}" if 'peak_kb' in record else '-'
+            items = record['items']
+            rate = (f"{items / (record['wall_ms'] / 1000):,.0f}"
+                    if items and record['wall_ms'] > 0 else '')
+            print(f"{name:<36} {record['wall_ms']:>10.1f} {record['cpu_ms']:>10.1f} {peak:>9} "
+                  f"{items if items is not None else '':>10} {rate:>11}")
+        if self.trace_memory:
+            print("(times include tracemalloc overhead)")
+
+    def as_dicts(self) -> List[Dict[str, Any]]:
+        return [{k: round(v, 3) if isinstance(v, float) else v for k, v in record.items()}
+                for record in self.records]
+
+    def write_jsonl(self, filename: str) -> None:
+        """Write one JSON object per phase."""
+        with open(filename, 'w', encoding='utf-8') as f:
+            for record in self.as_dicts():
+                f.write(json.dumps(record) + '\n')
+
+    def write_chrome_trace(self, filename: str) -> None:
+        """Write Chrome trace-event JSON (chrome://tracing, Perfetto, speedscope)."""
+        events = [{
+            'name': record['name'],
+            'ph': 'X',
+            'ts': round(record['start_ms'] * 1000),
+            'dur': round(record['wall_ms'] * 1000),
+            'pid': os.getpid(),
+            'tid': 1,
+            'args': {k: record[k] for k in ('cpu_ms', 'peak_kb', 'items') if record.get(k) is not None},
+        } for record in self.as_dicts()]
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+def profiled(name: str, items: Any = None):
+    """Run a :class:`BundleAnalyzer` method as a phase of ``self.profiler``.
+
+    ``items(self, result)`` may return the number of items processed.
+    """
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.profiler.phase(name) as record:
+                result = method(self, *args, **kwargs)
+                if items is not None and self.profiler.enabled:
+                    record['items'] = items(self, result)
+                return result
+        return wrapper
+    return decorate
+
+
+class JsonStreamReader:
+    """Selective reader over a memory-mapped JSON document.
+
+    Object members are dispatched to per-key handlers; members without a
+    handler are skipped by scanning brackets and strings, without building
+    any Python objects for them.
+    """
+
+    def __init__(self, buf: Any, window: int = STREAM_WINDOW):
+        self.buf = buf
+        self.window = window
+
+    def skip_ws(self, pos: int) -> int:
+        return _JSON_WHITESPACE_BYTES.match(self.buf, pos).end()
+
+    def expect(self, pos: int, char: bytes) -> int:
+        pos = self.skip_ws(pos)
+        if self.buf[pos:pos + 1] != char:
+            raise json.JSONDecodeError(f"Expecting {char.decode()!r}", '', pos)
+        return pos + 1
+
+    def skip_value(self, pos: int) -> int:
+        """Return the offset just past the JSON value starting at ``pos``."""
+        buf = self.buf
+        first = buf[pos:pos + 1]
+        if first == b'"':
+            match = _JSON_STRING_BYTES.match(buf, pos)
+        elif first not in (b'[', b'{'):
+            match = _JSON_SCALAR_BYTES.match(buf, pos)
+        else:
+            depth = 0
+            for match in _JSON_STRUCTURE_BYTES.finditer(buf, pos):
+                token = match.group()
+                if token in (b'[', b'{'):
+                    depth += 1
+                elif token in (b']', b'}'):
+                    depth -= 1
+                    if depth == 0:
+                        return match.end()
+            match = None
+        if match is None:
+            raise json.JSONDecodeError('Unterminated value', '', pos)
+        return match.end()
+
+    def decode_value(self, pos: int) -> Tuple[Any, int]:
+        """Decode one (small) value, returning it with its end offset."""
+        end = self.skip_value(pos)
+        return json.loads(self.buf[pos:end]), end
+
+    def read_array(self, pos: int, callback: Any) -> int:
+        """Stream the array at ``pos`` element by element into ``callback``."""
+        elements = iter_json_array(self.buf, pos, self.window)
+        while True:
+            try:
+                _, _, value = next(elements)
+            except StopIteration as done:
+                return done.value
+            callback(value)
+
+    def read_object(self, pos: int, handlers: Dict[str, Any]) -> Optional[int]:
+        """Walk the object at ``pos`` calling ``handlers[key](value_pos) -> end``.
+
+        A handler returning None stops the walk early (and so does this method).
+        """
+        buf = self.buf
+        pos = self.expect(pos, b'{')
+        pos = self.skip_ws(pos)
+        if buf[pos:pos + 1] == b'}':
+            return pos + 1
+
+        while True:
+            key_match = _JSON_STRING_BYTES.match(buf, pos)
+            if key_match is None:
+                raise json.JSONDecodeError('Expecting property name', '', pos)
+            key = json.loads(key_match.group())
+            pos = self.skip_ws(self.expect(key_match.end(), b':'))
+
+            handler = handlers.get(key)
+            pos = handler(pos) if handler else self.skip_value(pos)
+            if pos is None:
+                return None
+
+            pos = self.skip_ws(pos)
+            delimiter = buf[pos:pos + 1]
+            if delimiter == b'}':
+                return pos + 1
+            if delimiter != b',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", '', pos)
+            pos = self.skip_ws(pos + 1)
+
+
+class ModuleTrie:
+    """Interned prefix trie of webpack module path segments.
+
+    Each node stores its own segment and a pointer to its parent, so shared
+    prefixes are kept once and full paths are only joined when displayed.
+    Path flags (inside node_modules, asset extension) are inherited from the
+    parent when a node is created, which lets filters skip materialization.
+    """
+
+    def __init__(self):
+        self.segments: List[str] = ['']
+        self.parents = array('l', [-1])
+        self.flags = array('B', [0])
+        self._children: Dict[Tuple[int, str], int] = {}
+        self._keys: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    def add(self, parent: int, segment: str) -> int:
+        """Return the node for ``segment`` under ``parent``, creating it if needed."""
+        key = (parent, segment)
+        node = self._children.get(key)
+        if node is None:
+            node = self.add_leaf(parent, segment)
+            self._children[key] = node
+        return node
+
+    def add_leaf(self, parent: int, segment: str) -> int:
+        """Append a node that is never looked up again (webpack leaves are unique)."""
+        segment = sys.intern(segment)
+        flags = self.flags[parent]
+        if 'node_modules' in segment:
+            flags |= FLAG_NODE_MODULES
+        lowered = segment.lower()
+        if any(ext in lowered for ext in ASSET_EXTENSIONS):
+            flags |= FLAG_ASSET
+
+        self.segments.append(segment)
+        self.parents.append(parent)
+        self.flags.append(flags)
+        return len(self.segments) - 1
+
+    def path(self, node: int) -> str:
+        """Materialize the full ``/``-joined path of a node."""
+        parts = []
+        segments, parents = self.segments, self.parents
+        while node > 0:
+            parts.append(segments[node])
+            node = parents[node]
+        return '/'.join(reversed(parts))
+
+    def module_key(self, node: int) -> str:
+        """Return the hash-insensitive module key of a node, without its chunk.
+
+        webpack ``path`` fields already hold the full chunk-relative path, so
+        the key comes from the node's own segment; label-only nodes fall back
+        to their parent's key.
+        """
+        segment = self.segments[node]
+        parent = self.parents[node]
+        if segment.startswith('./') or parent <= 0 or self.parents[parent] <= 0:
+            return normalize_module_path(segment)
+
+        key = self._keys.get(parent)
+        if key is None:
+            key = self._keys[parent] = self.module_key(parent)
+        return normalize_module_path(f"{key}/{segment}" if key else segment)
+
+
+class ModuleTable:
+    """Columnar table of flattened leaf modules.
+
+    Sizes are kept in typed arrays (NumPy when installed, ``array`` otherwise)
+    alongside node_modules/asset/local masks derived from the trie flags, so
+    totals, size thresholds, filters and top-N selection are single passes.
+    Rows are appended while flattening; call :meth:`freeze` before querying.
+    """
+
+    def __init__(self, trie: Optional[ModuleTrie] = None):
+        self.trie = trie if trie is not None else ModuleTrie()
+        self.stat = array('q')
+        self.parsed = array('q')
+        self.gzip = array('q')
+        self.nodes = array('l')
+        self.chunks = array('l')
+        self.ids: List[Any] = []
+        self.labels: List[str] = []
+        # Sparse per-row isAsset/isInitialByEntrypoint (almost always empty for leaves)
+        self.extras: Dict[int, Tuple[bool, Dict[str, bool]]] = {}
+        self.masks: Dict[str, Any] = {}
+        self.frozen = False
+        self._keys: Optional[List[str]] = None
+        self._package_paths: Optional[List[Tuple[Optional[str], str]]] = None
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def append(self, node: int, chunk: int, item: Dict[str, Any]) -> None:
+        """Append one leaf module from the chart data."""
+        row = len(self.nodes)
+        self.nodes.append(node)
+        self.chunks.append(chunk)
+        self.stat.append(int(item.get('statSize') or 0))
+        self.parsed.append(int(item.get('parsedSize') or 0))
+        self.gzip.append(int(item.get('gzipSize') or 0))
+        self.ids.append(item.get('id'))
+        self.labels.append(item.get('label', ''))
+
+        is_asset = item.get('isAsset', False)
+        initial = item.get('isInitialByEntrypoint')
+        if is_asset or initial:
+            self.extras[row] = (is_asset, initial)
+
+    def append_row(self, other: 'ModuleTable', i: int) -> None:
+        """Append row ``i`` of another table built over the same trie."""
+        is_asset, initial = other.extras.get(i, (False, None))
+        self.append(int(other.nodes[i]), int(other.chunks[i]), {
+            'statSize': other.stat[i],
+            'parsedSize': other.parsed[i],
+            'gzipSize': other.gzip[i],
+            'id': other.ids[i],
+            'label': other.labels[i],
+            'isAsset': is_asset,
+            'isInitialByEntrypoint': initial,
+        })
+
+    def freeze(self) -> 'ModuleTable':
+        """Convert columns to their query representation and build the masks."""
+        if self.frozen:
+            return self
+
+        flags = self.trie.flags
+        if np is not None:
+            for name in ('stat', 'parsed', 'gzip', 'nodes', 'chunks'):
+                column = getattr(self, name)
+                setattr(self, name, np.frombuffer(column, dtype=column.typecode).copy())
+            row_flags = np.frombuffer(flags, dtype=np.uint8)[self.nodes]
+            node_modules = (row_flags & FLAG_NODE_MODULES) != 0
+            self.masks = {
+                'node_modules': node_modules,
+                'local': ~node_modules,
+                'asset': (row_flags & FLAG_ASSET) != 0,
+            }
+        else:
+            row_flags = bytes(flags[node] for node in self.nodes)
+            self.masks = {
+                'node_modules': bytes(bool(f & FLAG_NODE_MODULES) for f in row_flags),
+                'local': bytes(not f & FLAG_NODE_MODULES for f in row_flags),
+                'asset': bytes(bool(f & FLAG_ASSET) for f in row_flags),
+            }
+
+        self.frozen = True
+        return self
+
+    def indices(self, column: str = 'parsed', min_size: int = 0,
+                filter_type: str = 'all') -> Sequence[int]:
+        """Return row indices with ``column >= min_size`` matching ``filter_type``."""
+        values = getattr(self, column)
+        mask = self.masks.get(filter_type)
+
+        if np is not None:
+            selected = values >= min_size
+            if mask is not None:
+                selected &= mask
+            return np.flatnonzero(selected)
+
+        if mask is None:
+            return [i for i, v in enumerate(values) if v >= min_size]
+        return [i for i, (v, m) in enumerate(zip(values, mask)) if m and v >= min_size]
+
+    def total(self, column: str, rows: Optional[Sequence[int]] = None) -> int:
+        """Sum a size column over all rows or over the given row indices."""
+        values = getattr(self, column)
+        if rows is None:
+            return int(values.sum()) if np is not None else sum(values)
+        if np is not None:
+            return int(values[rows].sum())
+        return sum(values[i] for i in rows)
+
+    def top(self, top_n: int, column: str = 'parsed', min_size: int = 0,
+            filter_type: str = 'all') -> List[int]:
+        """Return the ``top_n`` largest row indices, ties kept in flatten order."""
+        rows = self.indices(column, min_size, filter_type)
+        if top_n <= 0 or not len(rows):
+            return []
+
+        values = getattr(self, column)
+        if np is None:
+            return heapq.nlargest(top_n, rows, key=values.__getitem__)
+
+        selected = values[rows]
+        if top_n < len(rows):
+            # argpartition finds the n-th largest value in linear time; rows
+            # equal to it are taken in row order to match a stable sort
+            kth = selected[np.argpartition(selected, len(rows) - top_n)[len(rows) - top_n]]
+            above = rows[selected > kth]
+            ties = rows[selected == kth][:top_n - len(above)]
+            rows = np.concatenate([above, ties])
+            selected = values[rows]
+        return rows[np.lexsort((rows, -selected))].tolist()
+
+    def module_keys(self) -> List[str]:
+        """Return the module key of every row, computed once per frozen table."""
+        if self._keys is None:
+            module_key = self.trie.module_key
+            self._keys = [module_key(node) for node in self.nodes.tolist()]
+        return self._keys
+
+    def package_paths(self) -> List[Tuple[Optional[str], str]]:
+        """Return ``package_relative_path`` of every row's key, computed once."""
+        if self._package_paths is None:
+            self._package_paths = [package_relative_path(key) for key in self.module_keys()]
+        return self._package_paths
+
+    def key_index(self) -> Dict[str, List[int]]:
+        """Aggregate rows by module key into ``[parsed, gzip, stat, count]``.
+
+        A module split across several chunks is summed under one key.
+        """
+        index: Dict[str, List[int]] = {}
+        for key, parsed, gzip, stat in zip(self.module_keys(), self.parsed.tolist(),
+                                           self.gzip.tolist(), self.stat.tolist()):
+            entry = index.get(key)
+            if entry is None:
+                index[key] = [parsed, gzip, stat, 1]
+            else:
+                entry[0] += parsed
+                entry[1] += gzip
+                entry[2] += stat
+                entry[3] += 1
+        return index
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """Materialize one row as the classic module dict (with its full path)."""
+        is_asset, initial = self.extras.get(i, (False, None))
+        return {
+            'path': self.trie.path(int(self.nodes[i])),
+            'statSize': int(self.stat[i]),
+            'parsedSize': int(self.parsed[i]),
+            'gzipSize': int(self.gzip[i]),
+            'id': self.ids[i],
+            'label': self.labels[i],
+            'isAsset': is_asset,
+            'isInitialByEntrypoint': initial or {},
+        }
+
+
+def available_codecs() -> List[str]:
+    """Return the default compression codecs that can be measured here."""
+    codecs_ = ['gzip-6', 'gzip-9', 'deflate-9']
+    if zstandard is not None:
+        codecs_.append('zstd-19')
+    if brotli is not None:
+        codecs_.append('brotli-11')
+    return codecs_
+
+
+def compressed_size(data: Any, codec: str) -> int:
+    """Return the size of ``data`` compressed with a ``name-level`` codec."""
+    name, _, level = codec.rpartition('-')
+    level = int(level)
+    if name in ('gzip', 'deflate'):
+        # wbits 31 writes a gzip container, -15 a raw deflate stream
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31 if name == 'gzip' else -15)
+        return len(compressor.compress(data)) + len(compressor.flush())
+    if name == 'zstd' and zstandard is not None:
+        return len(zstandard.ZstdCompressor(level=level).compress(data))
+    if name == 'brotli' and brotli is not None:
+        return len(brotli.compress(bytes(data), quality=level))
+    raise ValueError(f"Unsupported codec '{codec}'")
+
+
+def _measure_file(path: str, codecs_: Sequence[str]) -> Dict[str, int]:
+    """Compress one file through a read-only memory map (process pool worker)."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return {codec: compressed_size(b'', codec) for codec in codecs_}
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return {codec: compressed_size(mm, codec) for codec in codecs_}
+
+
+def _measure_concatenation(paths: Sequence[str], codecs_: Sequence[str]) -> Dict[str, int]:
+    """Compress several files joined as if they were emitted as one chunk."""
+    data = b'\n'.join(Path(path).read_bytes() for path in paths)
+    return {codec: compressed_size(data, codec) for codec in codecs_}
+
+
+def run_parallel(func: Any, args: Sequence[Tuple], workers: Optional[int] = None) -> List[Any]:
+    """Run ``func(*arg)`` for every tuple in ``args`` across a process pool.
+
+    Small batches run inline, where process start-up would dominate.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(args) < 8:
+        return [func(*arg) for arg in args]
+
+    chunksize = max(1, len(args) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, *zip(*args), chunksize=chunksize))
+
+
+class ChunkSizeMeasurer:
+    """Measures real compressed sizes of emitted chunk files.
+
+    Files are compressed at several gzip/deflate levels (plus zstd/brotli
+    when importable) in a process pool. Results are cached by content hash
+    in a JSON file so unchanged chunks are never compressed twice.
+    """
+
+    def __init__(self, build_dir: Path, codecs_: Optional[Sequence[str]] = None,
+                 workers: Optional[int] = None, cache_file: Optional[Path] = None):
+        self.build_dir = Path(build_dir)
+        self.codecs = list(codecs_ or available_codecs())
+        self.workers = workers
+        self.cache_file = cache_file or self.build_dir / 'cache' / 'analyze-hot-modules' / 'compression.json'
+        self.cache: Dict[str, Dict[str, int]] = {}
+        self._cache_dirty = False
+
+    def chunk_files(self) -> List[Path]:
+        """Return every emitted JavaScript chunk under ``static/chunks``."""
+        chunks_dir = self.build_dir / 'static' / 'chunks'
+        return sorted(chunks_dir.rglob('*.js')) if chunks_dir.is_dir() else []
+
+    def load_cache(self) -> None:
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                self.cache = json.load(f)
+        except (OSError, ValueError):
+            self.cache = {}
+
+    def save_cache(self) -> None:
+        if not self._cache_dirty:
+            return
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            write_atomic(self.cache_file, json.dumps(self.cache).encode('utf-8'))
+            self._cache_dirty = False
+        except OSError as e:
+            print(f"Warning: could not write compression cache: {e}")
+
+    def measure(self, files: Optional[Sequence[Path]] = None) -> Dict[str, Dict[str, int]]:
+        """Measure files, keyed by their path relative to the build directory."""
+        files = list(files if files is not None else self.chunk_files())
+        if not files:
+            return {}
+
+        self.load_cache()
+        digests = run_parallel(file_digest, [(path,) for path in files], self.workers)
+
+        # Only compress content (and codecs) not already in the cache
+        pending: Dict[str, Path] = {}
+        for path, digest in zip(files, digests):
+            cached = self.cache.get(digest, {})
+            if digest not in pending and any(codec not in cached for codec in self.codecs):
+                pending[digest] = path
+
+        measured = run_parallel(_measure_file, [(str(path), self.codecs) for path in pending.values()],
+                                self.workers)
+        for digest, sizes in zip(pending, measured):
+            self.cache.setdefault(digest, {}).update(sizes)
+            self._cache_dirty = True
+        self.save_cache()
+
+        results = {}
+        for path, digest in zip(files, digests):
+            label = path.relative_to(self.build_dir).as_posix()
+            results[label] = {codec: self.cache[digest][codec] for codec in self.codecs}
+        return results
+
+    def measure_merged(self, files: Sequence[Path]) -> Dict[str, Dict[str, int]]:
+        """Compare separate versus merged compressed sizes for a set of chunks."""
+        separate = self.measure(files)
+        merged = _measure_concatenation([str(path) for path in files], self.codecs)
+        return {
+            'separate': {codec: sum(sizes[codec] for sizes in separate.values())
+                         for codec in self.codecs},
+            'merged': merged,
+        }
+
+
+_BASE64_DIGITS = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/'
+# Base64 digit -> value; ',' -> 64, ';' -> 65, anything else -> 66 (ignored)
+_VLQ_TABLE = bytes(_BASE64_DIGITS.find(bytes([c])) if bytes([c]) in _BASE64_DIGITS
+                   else 64 if c == ord(',') else 65 if c == ord(';') else 66 for c in range(256))
+_WEBPACK_SOURCE = re.compile(r'^webpack://[^/]*/')
+_SOURCE_MAPPING_URL = re.compile(rb'//[#@] sourceMappingURL=([^\s\'"]+)\s*$')
+SOURCE_MAP_BLOCK = 1 << 22
+
+
+def source_module_key(source: str, source_root: str = '') -> str:
+    """Turn a source map ``sources`` entry into a module key.
+
+    The ``webpack://<namespace>/`` prefix and ``?query`` suffixes are
+    dropped so keys line up with the ones of the analyzer report.
+    """
+    source = _WEBPACK_SOURCE.sub('', source).split('?', 1)[0]
+    if source_root and '://' not in source and not source.startswith('/'):
+        source = f"{source_root.rstrip('/')}/{source}"
+    if '://' in source:
+        source = source.split('://', 1)[1]
+    return normalize_module_path(source)
+
+
+def _source_bytes_numpy(mappings: bytes, js: bytes, n_sources: int) -> List[int]:
+    """Vectorized :func:`source_bytes`, decoding whole blocks of lines at once."""
+    data = np.frombuffer(js, dtype=np.uint8)
+    newlines = np.flatnonzero(data == 10)
+    line_start = np.concatenate(([0], newlines + 1))
+    line_end = np.concatenate((newlines, [len(data)]))
+
+    # Columns count UTF-16 units; map them to bytes through the first byte
+    # of every character when the file is not plain ASCII
+    leads = None
+    if (data >= 0x80).any():
+        leads = np.append(np.flatnonzero((data & 0xC0) != 0x80), len(data))
+        units = 1 + (data[leads[:-1]] >= 0xF0)
+        lead_units = np.concatenate(([0], np.cumsum(units)))
+        line_units = lead_units[np.searchsorted(leads, line_start)]
+
+    table = np.frombuffer(_VLQ_TABLE, dtype=np.uint8)
+    totals = np.zeros(n_sources, dtype=np.float64)
+    first_line = 0
+    source_base = 0
+    pos = 0
+    while pos < len(mappings):
+        end = mappings.find(b';', pos + SOURCE_MAP_BLOCK)
+        end = len(mappings) if end < 0 else end + 1
+        codes = table[np.frombuffer(mappings, dtype=np.uint8, count=end - pos, offset=pos)]
+        pos = end
+
+        # A value starts at a digit whose predecessor has no continuation bit
+        digit = codes < 64
+        starts_mask = digit.copy()
+        starts_mask[1:] &= ~(digit[:-1] & ((codes[:-1] & 32) != 0))
+        semicolons = np.flatnonzero(codes == 65)
+        digits = np.flatnonzero(digit)
+        if not len(digits):
+            first_line += len(semicolons)
+            continue
+        starts = np.flatnonzero(starts_mask)
+        value_starts = np.flatnonzero(starts_mask[digits])
+        shifts = (digits - np.repeat(starts, np.diff(np.append(value_starts, len(digits))))) * 5
+        raw = np.add.reduceat((codes[digits] & 31).astype(np.int64) << shifts, value_starts)
+        values = np.where(raw & 1, -(raw >> 1), raw >> 1)
+
+        # Segments are runs of values between ',' and ';'; the block starts one
+        after_separator = np.empty(len(codes), dtype=bool)
+        after_separator[0] = True
+        after_separator[1:] = codes[:-1] >= 64
+        first = np.flatnonzero(after_separator[starts])
+        fields = np.diff(np.append(first, len(starts)))
+        lines = np.searchsorted(semicolons, starts[first]) + first_line
+        first_line += len(semicolons)
+
+        # Generated columns are relative within a line, sources across the map
+        deltas = values[first]
+        columns = np.cumsum(deltas)
+        line_first = np.flatnonzero(np.concatenate(([True], lines[1:] != lines[:-1])))
+        columns -= np.repeat(columns[line_first] - deltas[line_first],
+                             np.diff(np.append(line_first, len(first))))
+        mapped = fields >= 4
+        source_deltas = np.zeros(len(first), dtype=np.int64)
+        source_deltas[mapped] = values[first[mapped] + 1]
+        sources = np.cumsum(source_deltas) + source_base
+        if len(sources):
+            source_base = int(sources[-1])
+
+        keep = lines < len(line_start)
+        lines, columns, sources, mapped = lines[keep], columns[keep], sources[keep], mapped[keep]
+        if leads is None:
+            offsets = line_start[lines] + columns
+        else:
+            offsets = leads[np.minimum(np.searchsorted(lead_units, line_units[lines] + columns),
+                                       len(leads) - 1)]
+        ends = line_end[lines]
+        offsets = np.minimum(offsets, ends)
+        order = np.argsort(offsets, kind='stable')
+        offsets, ends, sources, mapped = offsets[order], ends[order], sources[order], mapped[order]
+        # A segment runs to the next one or to the end of its line
+        spans = np.minimum(np.append(offsets[1:], len(data)), ends) - offsets
+        mapped &= (sources >= 0) & (sources < n_sources)
+        totals += np.bincount(sources[mapped], weights=spans[mapped], minlength=n_sources)
+    return totals.astype(np.int64).tolist()
+
+
+def _utf16_offsets(line: bytes) -> List[int]:
+    """Byte offset of every UTF-16 unit of a line (plus its end)."""
+    offsets = []
+    pos = 0
+    for char in line.decode('utf-8', 'replace'):
+        size = len(char.encode('utf-8', 'replace'))
+        # A column inside a surrogate pair points past the character
+        offsets.extend((pos, pos + size) if size == 4 else (pos,))
+        pos += size
+    offsets.append(pos)
+    return offsets
+
+
+def _source_bytes_python(mappings: bytes, js: bytes, n_sources: int) -> List[int]:
+    """Byte-loop :func:`source_bytes` used when NumPy is not installed."""
+    totals = [0] * n_sources
+    line_starts = [0]
+    pos = js.find(b'\n')
+    while pos >= 0:
+        line_starts.append(pos + 1)
+        pos = js.find(b'\n', pos + 1)
+
+    def flush(line: int, segments: List[Tuple[int, int]]) -> None:
+        if line >= len(line_starts) or not segments:
+            return
+        start = line_starts[line]
+        end = line_starts[line + 1] - 1 if line + 1 < len(line_starts) else len(js)
+        text = js[start:end]
+        offsets = None if text.isascii() else _utf16_offsets(text)
+        spans = sorted([(min(column if offsets is None else offsets[min(column, len(offsets) - 1)],
+                             end - start), source) for column, source in segments],
+                       key=lambda span: span[0])
+        for i, (offset, source) in enumerate(spans):
+            if 0 <= source < n_sources:
+                following = spans[i + 1][0] if i + 1 < len(spans) else end - start
+                totals[source] += following - offset
+
+    table = _VLQ_TABLE
+    line = column = source = value = shift = field = 0
+    segment_column = 0
+    segments: List[Tuple[int, int]] = []
+    for char in mappings:
+        digit = table[char]
+        if digit < 64:
+            value += (digit & 31) << shift
+            if digit & 32:
+                shift += 5
+                continue
+            value = -(value >> 1) if value & 1 else value >> 1
+            if field == 0:
+                column += value
+                segment_column = column
+            elif field == 1:
+                source += value
+            field += 1
+            value = shift = 0
+        elif digit < 66:
+            if field:
+                segments.append((segment_column, source if field >= 4 else -1))
+            field = 0
+            if digit == 65:
+                flush(line, segments)
+                segments = []
+                line += 1
+                column = 0
+    if field:
+        segments.append((segment_column, source if field >= 4 else -1))
+    flush(line, segments)
+    return totals
+
+
+def source_bytes(mappings: bytes, js: bytes, n_sources: int) -> List[int]:
+    """Count the generated bytes of ``js`` each source map source accounts for.
+
+    Every segment of the base64 VLQ ``mappings`` string covers its line from
+    its generated column up to the next segment (or the end of the line).
+    With NumPy whole blocks of lines are decoded at once: a digit lookup
+    table, a mask of value starts and ``add.reduceat`` over shifted digits.
+    Generated columns are UTF-16 offsets and are converted to bytes.
+    """
+    if np is not None:
+        return _source_bytes_numpy(mappings, js, n_sources)
+    return _source_bytes_python(mappings, js, n_sources)
+
+
+def _attribute_chunk(js_path: str, map_path: str) -> Optional[Dict[str, Any]]:
+    """Attribute one emitted chunk to its original sources (process pool worker).
+
+    Only ``sources``, ``sourceRoot`` and the span of ``mappings`` are read
+    from the memory-mapped map; ``sourcesContent`` is skipped undecoded.
+    Returns None for index maps (``sections``) and unreadable maps.
+    """
+    js = Path(js_path).read_bytes()
+    fields: Dict[str, Any] = {}
+    try:
+        with open(map_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            reader = JsonStreamReader(mm)
+
+            def keep(name: str) -> Any:
+                def handler(pos: int) -> int:
+                    fields[name], end = reader.decode_value(pos)
+                    return end
+                return handler
+
+            def mappings(pos: int) -> int:
+                end = reader.skip_value(pos)
+                # Base64 digits and separators never need unescaping
+                fields['mappings'] = mm[pos + 1:end - 1]
+                return end
+
+            reader.read_object(reader.skip_ws(0), {
+                'sources': keep('sources'),
+                'sourceRoot': keep('sourceRoot'),
+                'mappings': mappings,
+            })
+    except (OSError, ValueError):
+        return None
+    if 'mappings' not in fields or not isinstance(fields.get('sources'), list):
+        return None
+
+    source_root = fields.get('sourceRoot') or ''
+    sizes: Dict[str, int] = {}
+    for source, size in zip(fields['sources'], source_bytes(fields['mappings'], js, len(fields['sources']))):
+        if size:
+            key = source_module_key(source or '', source_root)
+            sizes[key] = sizes.get(key, 0) + size
+    return {
+        'size': len(js),
+        'gzip': compressed_size(js, 'gzip-6'),
+        'sources': sizes,
+    }
+
+
+class SourceMapAttribution:
+    """Attributes emitted chunk bytes to original source files via source maps.
+
+    Every ``static/chunks/**/*.js`` with a map (``X.js.map`` next to it or
+    a relative ``sourceMappingURL``) is decoded in a process pool. Chunks
+    with a map get one row per original source, replacing their webpack
+    modules; the chunk's gzip size is shared out in proportion to bytes.
+    Bytes no segment covers (runtime glue, whitespace) become one
+    ``(unmapped)`` row per chunk so chunk totals still add up.
+    """
+
+    UNMAPPED = '(unmapped)'
+
+    def __init__(self, build_dir: Path, workers: Optional[int] = None):
+        self.build_dir = Path(build_dir)
+        self.workers = workers
+        self.chunks: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def map_file(js: Path) -> Optional[Path]:
+        """Return the source map of an emitted file, if there is one on disk."""
+        sibling = js.with_name(js.name + '.map')
+        if sibling.is_file():
+            return sibling
+
+        with open(js, 'rb') as f:
+            f.seek(max(0, os.fstat(f.fileno()).st_size - 1024))
+            match = _SOURCE_MAPPING_URL.search(f.read())
+        if match is None or b':' in match.group(1):
+            # data: URIs and remote maps are not followed
+            return None
+        path = js.parent / match.group(1).decode('utf-8', 'replace')
+        return path if path.is_file() else None
+
+    def compute(self) -> Dict[str, Dict[str, Any]]:
+        """Attribute every chunk that has a map, keyed by build-relative label."""
+        files = []
+        for js in ChunkSizeMeasurer(self.build_dir).chunk_files():
+            source_map = self.map_file(js)
+            if source_map is not None:
+                files.append((js, source_map))
+
+        results = run_parallel(_attribute_chunk, [(str(js), str(source_map)) for js, source_map in files],
+                               self.workers)
+        self.chunks = {js.relative_to(self.build_dir).as_posix(): result
+                       for (js, _), result in zip(files, results) if result is not None}
+        return self.chunks
+
+    def apply(self, table: ModuleTable, chart_data: List[Dict[str, Any]]) -> ModuleTable:
+        """Return a table where mapped chunks hold source rows instead of modules.
+
+        Rows keep the webpack stat size of the module with the same key in
+        the same chunk (source maps carry no original sizes); sources webpack
+        does not list report their generated bytes instead. Mapped chunks
+        missing from ``chart_data`` are appended to it.
+        """
+        indices = {chunk.get('label'): i for i, chunk in enumerate(chart_data)}
+        mapped: Dict[int, str] = {}
+        for label, result in self.chunks.items():
+            if label not in indices:
+                indices[label] = len(chart_data)
+                chart_data.append({'label': label, 'isAsset': True, 'statSize': result['size'],
+                                   'parsedSize': result['size'], 'gzipSize': result['gzip']})
+            mapped[indices[label]] = label
+
+        trie = table.trie
+        stat: Dict[Tuple[int, str], int] = {}
+        for node, chunk, size in zip(table.nodes.tolist(), table.chunks.tolist(), table.stat.tolist()):
+            if chunk in mapped:
+                key = (chunk, trie.module_key(node))
+                stat[key] = stat.get(key, 0) + size
+
+        result = ModuleTable(trie)
+        emitted = set()
+        for row, chunk in enumerate(table.chunks.tolist()):
+            if chunk not in mapped:
+                result.append_row(table, row)
+            elif chunk not in emitted:
+                self._append_sources(result, chunk, mapped[chunk], stat)
+                emitted.add(chunk)
+        for chunk, label in mapped.items():
+            if chunk not in emitted:
+                self._append_sources(result, chunk, label, stat)
+        return result.freeze()
+
+    def _append_sources(self, table: ModuleTable, chunk: int, label: str,
+                        stat: Dict[Tuple[int, str], int]) -> None:
+        result = self.chunks[label]
+        sizes = dict(result['sources'])
+        unmapped = result['size'] - sum(sizes.values())
+        if unmapped > 0:
+            sizes[f"{self.UNMAPPED}/{normalize_chunk_name(label)}"] = unmapped
+
+        parent = table.trie.add(0, label)
+        size, gzip = result['size'] or 1, result['gzip']
+        for key, parsed in sizes.items():
+            table.append(table.trie.add_leaf(parent, f"./{key}"), chunk, {
+                'statSize': stat.get((chunk, key), parsed),
+                'parsedSize': parsed,
+                'gzipSize': round(gzip * parsed / size),
+                'label': key.rsplit('/', 1)[-1],
+            })
+
+    def totals(self) -> Tuple[int, int]:
+        """Return ``(mapped bytes, total bytes)`` over every attributed chunk."""
+        total = sum(result['size'] for result in self.chunks.values())
+        return sum(sum(result['sources'].values()) for result in self.chunks.values()), total
+
+
+PARSE_CACHE_VERSION = 2
+PARSE_CACHE_MAGIC = b'AHMTABLE'
+DEFAULT_CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'analyze-hot-modules'
+
+
+class ParseCache:
+    """Bounded on-disk cache of flattened module tables (opt-in with ``--cache``).
+
+    Entries are named by the content hash of the report plus the parse mode
+    and format version. ``index.json`` remembers each report's size, mtime
+    and hash, so an untouched file is looked up without rehashing, and a
+    touched or copied one only costs a hash. Each entry is a small JSON
+    header followed by the raw column buffers. A hit bumps the entry's
+    mtime, and the least recently used entries are evicted once the
+    directory grows past ``max_bytes``; index records of evicted entries
+    go with them. Files are replaced atomically through unique temporary
+    names, so concurrent processes can share the directory.
+    """
+
+    # export_results writes the first asset chunks with their groups
+    KEEP_GROUPS = 10
+
+    def __init__(self, directory: Path = DEFAULT_CACHE_DIR, max_bytes: int = 512 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.index_file = self.directory / 'index.json'
+
+    def _load_index(self) -> Dict[str, List[Any]]:
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def digest(self, path: Path) -> str:
+        """Content hash of ``path``, reusing the indexed one while size and mtime match."""
+        st = path.stat()
+        key = str(path.resolve())
+        index = self._load_index()
+        entry = index.get(key)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return entry[2]
+
+        digest = file_digest(path)
+        index[key] = [st.st_size, st.st_mtime_ns, digest]
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            write_atomic(self.index_file, json.dumps(index).encode('utf-8'))
+        except OSError:
+            pass
+        return digest
+
+    def entry(self, digest: str, mode: str) -> Path:
+        return self.directory / f"{digest}-{mode}-v{PARSE_CACHE_VERSION}.table"
+
+    def load(self, entry: Path, analyzer: 'BundleAnalyzer') -> bool:
+        """Restore ``chart_data`` and the frozen module table from ``entry``."""
+        try:
+            with open(entry, 'rb') as f:
+                blob = f.read()
+        except OSError:
+            return False
+        if not self.deserialize(blob, analyzer):
+            return False
+        try:
+            os.utime(entry)
+            self.evict()
+        except OSError:
+            pass
+        return True
+
+    @staticmethod
+    def deserialize(blob: bytes, analyzer: 'BundleAnalyzer') -> bool:
+        """Restore an analyzer from bytes produced by :meth:`serialize`."""
+        if not blob.startswith(PARSE_CACHE_MAGIC):
+            return False
+
+        offset = len(PARSE_CACHE_MAGIC)
+        header_len = int.from_bytes(blob[offset:offset + 8], 'little')
+        offset += 8
+        header = json.loads(blob[offset:offset + header_len])
+        offset += header_len
+
+        buffers = {}
+        for name, typecode, itemsize, start, length in header['columns']:
+            column = array(typecode)
+            if column.itemsize != itemsize:
+                return False  # written on a platform with other C type sizes
+            column.frombytes(blob[offset + start:offset + start + length])
+            buffers[name] = column
+
+        def strings(span: List[int]) -> List[str]:
+            return blob[offset + span[0]:offset + span[0] + span[1]].decode('utf-8', 'surrogatepass').split('\0')
+
+        trie = ModuleTrie()
+        trie.segments = strings(header['segments'])
+        trie.parents = buffers['parents']
+        trie.flags = buffers['flags']
+
+        table = ModuleTable(trie)
+        for name in ('stat', 'parsed', 'gzip', 'nodes', 'chunks'):
+            setattr(table, name, buffers[name])
+        table.ids = buffers['ids'].tolist() if 'ids' in buffers else header['ids']
+        table.labels = strings(header['labels']) if table.stat else []
+        table.extras = {row: (is_asset, initial) for row, is_asset, initial in header['extras']}
+        table.freeze()
+
+        analyzer.chart_data = header['chart_data']
+        analyzer.modules = table
+        analyzer._modules_flattened = True
+        return True
+
+    def store(self, entry: Path, analyzer: 'BundleAnalyzer') -> None:
+        """Write the analyzer's chart headers and module table to ``entry``."""
+        blob = self.serialize(analyzer)
+        if blob is None:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            write_atomic(entry, blob)
+            self.evict()
+        except OSError as e:
+            print(f"Warning: could not write parse cache: {e}")
+
+    @classmethod
+    def serialize(cls, analyzer: 'BundleAnalyzer') -> Optional[bytes]:
+        """Pack chart headers and the module table; None if a string holds a NUL."""
+        table = analyzer.modules
+        trie = table.trie
+        chart_data = []
+        kept = 0
+        for chunk in analyzer.chart_data:
+            if chunk.get('isAsset') and kept < cls.KEEP_GROUPS:
+                kept += 1
+                chart_data.append(chunk)
+            else:
+                chart_data.append({k: v for k, v in chunk.items() if k != 'groups'})
+
+        # Integer module ids (the usual case) are stored as a column too
+        numeric_ids = all(type(i) is int for i in table.ids)
+        arrays = [('stat', table.stat), ('parsed', table.parsed), ('gzip', table.gzip),
+                  ('nodes', table.nodes), ('chunks', table.chunks),
+                  ('parents', trie.parents), ('flags', trie.flags)]
+        if numeric_ids:
+            arrays.append(('ids', array('q', table.ids)))
+
+        columns = []
+        blobs = []
+        position = 0
+        for name, values in arrays:
+            typecode = values.typecode if isinstance(values, array) else values.dtype.char
+            data = values.tobytes()
+            columns.append((name, typecode, array(typecode).itemsize, position, len(data)))
+            blobs.append(data)
+            position += len(data)
+
+        spans = {}
+        for name, values in (('segments', trie.segments), ('labels', table.labels)):
+            data = '\0'.join(values).encode('utf-8', 'surrogatepass')
+            if data.count(b'\0') != max(len(values) - 1, 0):
+                return None  # a string contains NUL; not representable
+            spans[name] = [position, len(data)]
+            blobs.append(data)
+            position += len(data)
+
+        header = json.dumps({
+            'columns': columns,
+            'segments': spans['segments'],
+            'labels': spans['labels'],
+            'ids': None if numeric_ids else table.ids,
+            'extras': [[row, is_asset, initial] for row, (is_asset, initial) in table.extras.items()],
+            'chart_data': chart_data,
+        }).encode('ascii')
+        return b''.join([PARSE_CACHE_MAGIC, len(header).to_bytes(8, 'little'), header] + blobs)
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits ``max_bytes``."""
+        entries = []
+        for path in self.directory.glob('*.table'):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        evicted = False
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+                evicted = True
+            except OSError:
+                pass
+        if evicted:
+            self._prune_index()
+
+    def _prune_index(self) -> None:
+        """Drop index records whose report has no cached entry left."""
+        cached = {path.name.split('-', 1)[0] for path in self.directory.glob('*.table')}
+        index = self._load_index()
+        kept = {key: entry for key, entry in index.items() if entry[2] in cached}
+        if len(kept) != len(index):
+            try:
+                write_atomic(self.index_file, json.dumps(kept).encode('utf-8'))
+            except OSError:
+                pass
+
+
+COMPACT_EXPORT_MAGIC = b'AHMEXP01'
+
+
+class CompactExport:
+    """Memory-mappable export of the full module table.
+
+    Layout (little-endian): the 8-byte magic, a section count, and a
+    directory of ``(name[8], offset u64, length u64)`` entries. Sections
+    start on 8-byte boundaries so they can be viewed in place:
+
+    ``strings`` + ``stroff``   deduplicated UTF-8 string table and u64 offsets
+    ``trpar``/``trseg``/``trflg``  path trie: parent i32, segment string u32, flags u8
+    ``mstat``/``mparsed``/``mgzip``  module sizes, i64 per row
+    ``mnode``/``mchunk``       trie leaf and chunk index, i32 per row
+    ``mlabel``/``mid``         label and JSON-encoded id, string u32 per row
+    ``crows``/``cstart``       chunk -> rows index (rows grouped by chunk, u32 starts)
+    ``clabel``                 chunk label, string u32 per chunk
+    ``oparsed``                rows by parsed size, largest first (u32)
+    ``meta``                   JSON: summary, chunk headers, report sections
+
+    Readers answer top-N, per-chunk and path lookups from the mapping and
+    only decode the strings they touch.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        self.mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mm[:8] != COMPACT_EXPORT_MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a compact export")
+        count = int.from_bytes(self.mm[8:12], 'little')
+        self.sections: Dict[str, Tuple[int, int]] = {}
+        for i in range(count):
+            name, offset, length = struct.unpack_from('<8sQQ', self.mm, 16 + i * 24)
+            self.sections[name.rstrip(b'\0').decode('ascii')] = (offset, length)
+        self._meta: Optional[Dict[str, Any]] = None
+        self._string_offsets = self.column('stroff', 'Q')
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        """The JSON section, decoded on first use."""
+        if self._meta is None:
+            self._meta = json.loads(bytes(self.section('meta')))
+        return self._meta
+
+    def section(self, name: str) -> memoryview:
+        offset, length = self.sections[name]
+        return memoryview(self.mm)[offset:offset + length]
+
+    def column(self, name: str, typecode: str) -> memoryview:
+        """A typed view of one section, without copying it."""
+        return self.section(name).cast(typecode)
+
+    def string(self, i: int) -> str:
+        offset, _ = self.sections['strings']
+        return self.mm[offset + self._string_offsets[i]:offset + self._string_offsets[i + 1]].decode(
+            'utf-8', 'surrogatepass')
+
+    def module_path(self, node: int) -> str:
+        parents, segments = self.column('trpar', 'i'), self.column('trseg', 'I')
+        parts = []
+        while node > 0:
+            parts.append(self.string(segments[node]))
+            node = parents[node]
+        return '/'.join(reversed(parts))
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """One module row in the classic module dict shape."""
+        return {
+            'path': self.module_path(self.column('mnode', 'i')[i]),
+            'statSize': self.column('mstat', 'q')[i],
+            'parsedSize': self.column('mparsed', 'q')[i],
+            'gzipSize': self.column('mgzip', 'q')[i],
+            'id': json.loads(self.string(self.column('mid', 'I')[i])),
+            'label': self.string(self.column('mlabel', 'I')[i]),
+            'chunk': self.string(self.column('clabel', 'I')[self.column('mchunk', 'i')[i]]),
+        }
+
+    def top(self, top_n: int = 20) -> List[Dict[str, Any]]:
+        return [self.row(i) for i in self.column('oparsed', 'I')[:top_n]]
+
+    def chunk_rows(self, chunk: int) -> Sequence[int]:
+        start = self.column('cstart', 'I')
+        return self.column('crows', 'I')[start[chunk]:start[chunk + 1]]
+
+    def close(self) -> None:
+        """Unmap the file; views returned by :meth:`column` must be released first."""
+        if hasattr(self, '_string_offsets'):
+            self._string_offsets.release()
+        self.mm.close()
+        self._file.close()
+
+    @staticmethod
+    def _pack(values: Any, typecode: str) -> bytes:
+        if np is not None and isinstance(values, np.ndarray):
+            return values.astype(np.dtype(typecode).newbyteorder('<')).tobytes()
+        column = array(typecode, values)
+        if sys.byteorder != 'little':
+            column.byteswap()
+        return column.tobytes()
+
+    @classmethod
+    def write(cls, filename: str, table: 'ModuleTable', chart_data: List[Dict[str, Any]],
+              meta: Dict[str, Any]) -> None:
+        """Write ``table`` and ``chart_data`` headers plus ``meta`` to ``filename``."""
+        trie = table.trie
+        strings: Dict[str, int] = {}
+
+        def intern(value: str) -> int:
+            index = strings.get(value)
+            if index is None:
+                index = strings[value] = len(strings)
+            return index
+
+        segments = [intern(segment) for segment in trie.segments]
+        labels = [intern(label) for label in table.labels]
+        ids = [intern(json.dumps(i)) for i in table.ids]
+        chunk_labels = [intern(chunk.get('label', '')) for chunk in chart_data]
+
+        chunks = table.chunks.tolist()
+        rows_by_chunk = sorted(range(len(chunks)), key=chunks.__getitem__)
+        starts = [0] * (len(chart_data) + 1)
+        for chunk in chunks:
+            starts[chunk + 1] += 1
+        for i in range(len(chart_data)):
+            starts[i + 1] += starts[i]
+        parsed = table.parsed.tolist()
+        by_parsed = sorted(range(len(parsed)), key=lambda i: -parsed[i])
+
+        blob = bytearray()
+        offsets = [0]
+        for value in strings:
+            blob += value.encode('utf-8', 'surrogatepass')
+            offsets.append(len(blob))
+
+        if meta.get('duplicates'):
+            # Copies are plain rows of the table; keep counts and chunk indices only
+            chunk_index = {chunk.get('label', ''): i for i, chunk in enumerate(chart_data)}
+            meta = dict(meta, duplicates=[
+                {**{k: v for k, v in d.items() if k not in ('copies', 'chunks')},
+                 'copies': len(d['copies']),
+                 'chunks': [chunk_index.get(label, -1) for label in d['chunks']]}
+                for d in meta['duplicates']])
+        meta = dict(meta, chunks=[{k: v for k, v in chunk.items() if k != 'groups'}
+                                  for chunk in chart_data],
+                    extras=[[row, is_asset, initial] for row, (is_asset, initial) in table.extras.items()])
+        sections = [
+            ('meta', json.dumps(meta, ensure_ascii=False).encode('utf-8')),
+            ('strings', bytes(blob)),
+            ('stroff', cls._pack(offsets, 'Q')),
+            ('trpar', cls._pack(trie.parents, 'i')),
+            ('trseg', cls._pack(segments, 'I')),
+            ('trflg', trie.flags.tobytes()),
+            ('mstat', cls._pack(table.stat, 'q')),
+            ('mparsed', cls._pack(table.parsed, 'q')),
+            ('mgzip', cls._pack(table.gzip, 'q')),
+            ('mnode', cls._pack(table.nodes, 'i')),
+            ('mchunk', cls._pack(table.chunks, 'i')),
+            ('mlabel', cls._pack(labels, 'I')),
+            ('mid', cls._pack(ids, 'I')),
+            ('crows', cls._pack(rows_by_chunk, 'I')),
+            ('cstart', cls._pack(starts, 'I')),
+            ('clabel', cls._pack(chunk_labels, 'I')),
+            ('oparsed', cls._pack(by_parsed, 'I')),
+        ]
+
+        directory = bytearray(COMPACT_EXPORT_MAGIC + len(sections).to_bytes(4, 'little') + b'\0' * 4)
+        position = len(directory) + 24 * len(sections)
+        layout = []
+        for name, data in sections:
+            position += -position % 8
+            directory += struct.pack('<8sQQ', name.encode('ascii'), position, len(data))
+            layout.append((position, data))
+            position += len(data)
+
+        with open(filename, 'wb') as f:
+            f.write(directory)
+            for offset, data in layout:
+                f.write(b'\0' * (offset - f.tell()))
+                f.write(data)
+
+    def to_analyzer(self, analyzer: 'BundleAnalyzer') -> None:
+        """Load the whole export into ``analyzer`` (used for ``--input x.ahm``)."""
+        count = len(self._string_offsets) - 1
+        strings = [self.string(i) for i in range(count)]
+
+        trie = ModuleTrie()
+        trie.segments = [strings[i] for i in self.column('trseg', 'I')]
+        trie.parents = array('l', self.column('trpar', 'i'))
+        trie.flags = array('B', self.section('trflg'))
+
+        table = ModuleTable(trie)
+        table.stat = array('q', self.column('mstat', 'q'))
+        table.parsed = array('q', self.column('mparsed', 'q'))
+        table.gzip = array('q', self.column('mgzip', 'q'))
+        table.nodes = array('l', self.column('mnode', 'i'))
+        table.chunks = array('l', self.column('mchunk', 'i'))
+        table.labels = [strings[i] for i in self.column('mlabel', 'I')]
+        table.ids = [json.loads(strings[i]) for i in self.column('mid', 'I')]
+        table.extras = {row: (is_asset, initial) for row, is_asset, initial in self.meta['extras']}
+
+        analyzer.chart_data = self.meta['chunks']
+        analyzer.modules = table
+        analyzer._modules_flattened = True
+
+
+class StatsJsonSource:
+    """Streams a webpack/Next ``stats.json`` into the analyzer's module model.
+
+    Only ``modules``, ``chunks``, ``assets`` and ``entrypoints`` are read, one
+    array element at a time, keeping just ids, names, sizes, chunk ids and
+    reasons. Chunks are then emitted as chart-data nodes (the same shape as
+    ``window.chartData``) so every existing report works on either source.
+
+    stats.json carries module source sizes only, so parsed sizes are the
+    emitted asset size distributed over the chunk's modules by source size,
+    and gzip sizes are distributed the same way from the measured chunk file
+    when ``measure_gzip`` is set and the build directory is available (0
+    otherwise).
+    """
+
+    def __init__(self, stats_file: Path, build_dir: Optional[Path] = None,
+                 window: int = STREAM_WINDOW, measure_gzip: bool = False):
+        self.stats_file = Path(stats_file)
+        self.build_dir = Path(build_dir) if build_dir else None
+        self.measure_gzip = measure_gzip
+        self.window = window
+        # (id, name, size, chunk ids, concatenated inner modules)
+        self.modules: List[Tuple[Any, str, int, List[Any], List[Tuple[str, int]]]] = []
+        self.chunks: List[Dict[str, Any]] = []
+        self.asset_sizes: Dict[str, int] = {}
+        self.entrypoints: Dict[str, List[Any]] = {}
+        # Module graph: module id -> issuer module ids, entrypoint -> entry module ids
+        self.reasons: Dict[Any, List[Any]] = {}
+        self.entry_modules: Dict[str, List[Any]] = {}
+        # Estimated parsed/gzip bytes per module (summed over its chunks)
+        self.module_parsed: List[int] = []
+        self.module_gzip: List[int] = []
+
+    @staticmethod
+    def is_stats_file(path: Path) -> bool:
+        """Tell a stats.json (a top-level ``modules`` or ``chunks`` array) from other JSON.
+
+        Top-level members before the first of those arrays are skipped without
+        being decoded, so exports and chartData dumps are cheap to reject; the
+        first element must carry an ``id`` like webpack's module/chunk objects
+        (``--cache-churn`` exports have a ``chunks`` array too).
+        """
+        with open(path, 'rb') as f:
+            if not f.read(4096).lstrip().startswith(b'{'):
+                return False
+            found = []
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    reader = JsonStreamReader(mm)
+
+                    def array(pos: int) -> Optional[int]:
+                        if mm[pos:pos + 1] != b'[':
+                            return reader.skip_value(pos)
+                        for _, _, first in iter_json_array(mm, pos):
+                            found.append(isinstance(first, dict) and 'id' in first)
+                            break
+                        return None
+
+                    reader.read_object(reader.skip_ws(0), {'modules': array, 'chunks': array})
+            except json.JSONDecodeError:
+                return False
+        return any(found)
+
+    def load(self) -> None:
+        """Stream the stats file, keeping only the fields the reports need."""
+        with open(self.stats_file, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            reader = JsonStreamReader(mm, self.window)
+            reader.read_object(reader.skip_ws(0), {
+                'modules': lambda pos: reader.read_array(pos, self._add_module),
+                'chunks': lambda pos: reader.read_array(pos, self._add_chunk),
+                'assets': lambda pos: reader.read_array(pos, self._add_asset),
+                'entrypoints': lambda pos: self._read_entrypoints(reader, pos),
+            })
+
+    def _add_module(self, module: Dict[str, Any]) -> None:
+        module_id = module.get('id')
+        name = module.get('name') or module.get('identifier') or str(module_id)
+        inner = [(m.get('name') or '', m.get('size') or 0) for m in module.get('modules') or []]
+        self.modules.append((module_id, name, module.get('size') or 0,
+                             module.get('chunks') or [], inner))
+
+        issuers = []
+        for reason in module.get('reasons') or []:
+            issuer = reason.get('resolvedModuleId', reason.get('moduleId'))
+            if issuer is not None:
+                issuers.append(issuer)
+            elif reason.get('type') in ('entry', 'single entry', 'multi entry') and reason.get('loc'):
+                self.entry_modules.setdefault(reason['loc'], []).append(module_id)
+        if issuers:
+            self.reasons[module_id] = issuers
+
+    def _add_chunk(self, chunk: Dict[str, Any]) -> None:
+        self.chunks.append({
+            'id': chunk.get('id'),
+            'names': chunk.get('names') or [],
+            'files': chunk.get('files') or [],
+            'initial': chunk.get('initial', False),
+        })
+
+    def _add_asset(self, asset: Dict[str, Any]) -> None:
+        if asset.get('name'):
+            self.asset_sizes[asset['name']] = asset.get('size') or 0
+
+    def _read_entrypoints(self, reader: JsonStreamReader, pos: int) -> int:
+        entrypoints, end = reader.decode_value(pos)
+        for name, entry in (entrypoints or {}).items():
+            self.entrypoints[name] = (entry or {}).get('chunks') or []
+        return end
+
+    def _chunk_label(self, chunk: Dict[str, Any]) -> str:
+        scripts = [name for name in chunk['files'] if name.endswith('.js')]
+        if scripts:
+            return scripts[0]
+        if chunk['files']:
+            return chunk['files'][0]
+        return chunk['names'][0] if chunk['names'] else str(chunk['id'])
+
+    def iter_chart_nodes(self) -> Iterator[Dict[str, Any]]:
+        """Yield one chart-data chunk node (with module ``groups``) per chunk."""
+        modules_by_chunk: Dict[Any, List[int]] = {}
+        for index, module in enumerate(self.modules):
+            for chunk_id in module[3]:
+                modules_by_chunk.setdefault(chunk_id, []).append(index)
+
+        initial_by_chunk: Dict[Any, Dict[str, bool]] = {}
+        for entrypoint, chunk_ids in self.entrypoints.items():
+            for chunk_id in chunk_ids:
+                initial_by_chunk.setdefault(chunk_id, {})[entrypoint] = True
+
+        self.module_parsed = [0] * len(self.modules)
+        self.module_gzip = [0] * len(self.modules)
+
+        labels = [self._chunk_label(chunk) for chunk in self.chunks]
+        measured: Dict[str, Dict[str, int]] = {}
+        if self.measure_gzip and self.build_dir is not None:
+            files = [self.build_dir / label for label in labels if (self.build_dir / label).is_file()]
+            measured = ChunkSizeMeasurer(self.build_dir, ['gzip-6']).measure(files)
+
+        for chunk, label in zip(self.chunks, labels):
+            indices = modules_by_chunk.get(chunk['id'], [])
+            stat_total = sum(self.modules[i][2] for i in indices)
+            parsed_total = self.asset_sizes.get(label, stat_total)
+            gzip_total = measured.get(label, {}).get('gzip-6', 0)
+            parsed_ratio = parsed_total / stat_total if stat_total else 0
+            gzip_ratio = gzip_total / stat_total if stat_total else 0
+
+            groups = []
+            for i in indices:
+                module_id, name, size, _, inner = self.modules[i]
+                node = {
+                    'id': module_id,
+                    'label': name.rsplit('/', 1)[-1],
+                    'path': name,
+                    'statSize': size,
+                    'parsedSize': round(size * parsed_ratio),
+                    'gzipSize': round(size * gzip_ratio),
+                }
+                self.module_parsed[i] += node['parsedSize']
+                self.module_gzip[i] += node['gzipSize']
+                if inner:
+                    node['groups'] = [{
+                        'label': inner_name.rsplit('/', 1)[-1],
+                        'path': f"{name}/{inner_name[2:] if inner_name.startswith('./') else inner_name}",
+                        'statSize': inner_size,
+                        'parsedSize': round(inner_size * parsed_ratio),
+                        'gzipSize': round(inner_size * gzip_ratio),
+                    } for inner_name, inner_size in inner]
+                groups.append(node)
+
+            yield {
+                'label': label,
+                'isAsset': True,
+                'statSize': stat_total,
+                'parsedSize': parsed_total,
+                'gzipSize': gzip_total,
+                'groups': groups,
+                'isInitialByEntrypoint': initial_by_chunk.get(chunk['id'], {}),
+            }
+
+
+def immediate_dominators(successors: List[List[int]], root: int = 0) -> Tuple[List[int], List[int]]:
+    """Compute immediate dominators with the Lengauer–Tarjan algorithm.
+
+    Uses the simple variant (path compression without balancing, near-linear
+    in practice) with an iterative DFS and an iterative ``eval``, so large
+    graphs with cycles never hit the recursion limit. Returns ``(idom,
+    order)`` where ``order`` lists reachable vertices in DFS pre-order and
+    unreachable vertices have ``idom == -1``.
+    """
+    n = len(successors)
+    dfnum = [-1] * n
+    parent = [-1] * n
+    order = [root]
+    dfnum[root] = 0
+    stack = [(root, iter(successors[root]))]
+    while stack:
+        v, children = stack[-1]
+        for w in children:
+            if dfnum[w] < 0:
+                dfnum[w] = len(order)
+                order.append(w)
+                parent[w] = v
+                stack.append((w, iter(successors[w])))
+                break
+        else:
+            stack.pop()
+
+    predecessors: List[List[int]] = [[] for _ in range(n)]
+    for v in order:
+        for w in successors[v]:
+            predecessors[w].append(v)
+
+    semi = dfnum[:]
+    label = list(range(n))
+    ancestor = [-1] * n
+    idom = [-1] * n
+    bucket: List[List[int]] = [[] for _ in range(n)]
+
+    def evaluate(v: int) -> int:
+        if ancestor[v] < 0:
+            return v
+        path = []
+        u = v
+        while ancestor[ancestor[u]] >= 0:
+            path.append(u)
+            u = ancestor[u]
+        for u in reversed(path):
+            a = ancestor[u]
+            if semi[label[a]] < semi[label[u]]:
+                label[u] = label[a]
+            ancestor[u] = ancestor[a]
+        return label[v]
+
+    for i in range(len(order) - 1, 0, -1):
+        w = order[i]
+        for v in predecessors[w]:
+            u = evaluate(v)
+            if semi[u] < semi[w]:
+                semi[w] = semi[u]
+        bucket[order[semi[w]]].append(w)
+        p = parent[w]
+        ancestor[w] = p
+        for v in bucket[p]:
+            u = evaluate(v)
+            idom[v] = u if semi[u] < semi[v] else p
+        bucket[p] = []
+
+    for w in order[1:]:
+        if idom[w] != order[semi[w]]:
+            idom[w] = idom[idom[w]]
+    idom[root] = root
+    return idom, order
+
+
+class RetainedSizeAnalyzer:
+    """Retained-size ranking over the module import graph of a stats.json.
+
+    A module's retained size is the bytes of every module it dominates, i.e.
+    what would disappear from the bundle if the imports of that module went
+    away. A virtual root links to the entry modules (all entrypoints, or one)
+    and, for the global view, to modules nothing imports.
+    """
+
+    def __init__(self, source: StatsJsonSource):
+        self.source = source
+        self.retained: Dict[Any, Tuple[int, int]] = {}
+        self.modules: List[Dict[str, Any]] = []
+        self.packages: List[Dict[str, Any]] = []
+        # Dominator tree over graph vertices (0 is the virtual root, module i is i + 1)
+        self.idom: List[int] = []
+        self.order: List[int] = []
+
+    def compute(self, entrypoint: Optional[str] = None) -> None:
+        """Build the graph, its dominator tree and retained parsed/gzip bytes."""
+        source = self.source
+        index = {module[0]: i + 1 for i, module in enumerate(source.modules)}
+        successors: List[List[int]] = [[] for _ in range(len(source.modules) + 1)]
+
+        for module_id, issuers in source.reasons.items():
+            target = index.get(module_id)
+            if target is None:
+                continue
+            for issuer in set(issuers):
+                origin = index.get(issuer)
+                if origin is not None and origin != target:
+                    successors[origin].append(target)
+
+        if entrypoint is not None:
+            entries = source.entry_modules.get(entrypoint, [])
+        else:
+            entries = [m for modules in source.entry_modules.values() for m in modules]
+            entries += [module[0] for module in source.modules if module[0] not in source.reasons]
+        successors[0] = sorted({index[m] for m in entries if m in index})
+
+        idom, order = immediate_dominators(successors)
+        self.idom, self.order = idom, order
+
+        parsed = [0] + list(source.module_parsed or [0] * len(source.modules))
+        gzip = [0] + list(source.module_gzip or [0] * len(source.modules))
+        retained_parsed = [0] * len(successors)
+        retained_gzip = [0] * len(successors)
+        for v in reversed(order):
+            retained_parsed[v] += parsed[v]
+            retained_gzip[v] += gzip[v]
+            if v:
+                retained_parsed[idom[v]] += retained_parsed[v]
+                retained_gzip[idom[v]] += retained_gzip[v]
+
+        packages_of = [None] + [package_name(normalize_module_path(m[1])) for m in source.modules]
+        package_totals: Dict[str, List[int]] = {}
+        self.retained = {}
+        self.modules = []
+        for v in order[1:]:
+            module_id, name = source.modules[v - 1][:2]
+            self.retained[module_id] = (retained_parsed[v], retained_gzip[v])
+            self.modules.append({
+                'id': module_id,
+                'module': normalize_module_path(name),
+                'parsedSize': parsed[v],
+                'gzipSize': gzip[v],
+                'retainedParsedSize': retained_parsed[v],
+                'retainedGzipSize': retained_gzip[v],
+            })
+            # A package retains the subtrees of its modules not dominated by itself
+            package = packages_of[v]
+            if package is not None and packages_of[idom[v]] != package:
+                totals = package_totals.setdefault(package, [0, 0])
+                totals[0] += retained_parsed[v]
+                totals[1] += retained_gzip[v]
+
+        self.modules.sort(key=lambda m: m['retainedParsedSize'], reverse=True)
+        self.packages = sorted(
+            ({'package': name, 'retainedParsedSize': p, 'retainedGzipSize': g}
+             for name, (p, g) in package_totals.items()),
+            key=lambda p: p['retainedParsedSize'], reverse=True)
+
+    def iter_stacks(self, column: str = 'parsed', filter_type: str = 'all') -> Iterator[Tuple[str, int]]:
+        """Yield ``(dominator chain, own bytes)`` for every reachable module.
+
+        Frames run from the outermost dominator down to the module, so in a
+        flame graph each frame is as wide as the module's retained size. The
+        dominator tree is walked iteratively with a single frame stack.
+        ``filter_type`` keeps the stacks of ``node_modules`` or ``local``
+        modules only, judged by the module's own key.
+        """
+        modules = self.source.modules
+        sizes = (self.source.module_gzip if column == 'gzip' else self.source.module_parsed) \
+            or [0] * len(modules)
+        children: List[List[int]] = [[] for _ in self.idom]
+        for v in self.order[1:]:
+            children[self.idom[v]].append(v)
+
+        frames: List[str] = []
+        stack = [iter(children[0])]
+        while stack:
+            v = next(stack[-1], None)
+            if v is None:
+                stack.pop()
+                if frames:
+                    frames.pop()
+                continue
+            key = normalize_module_path(modules[v - 1][1])
+            frames.append(stack_frame(key))
+            if sizes[v - 1] and (filter_type == 'all'
+                                 or (package_name(key) is None) == (filter_type == 'local')):
+                yield ';'.join(frames), sizes[v - 1]
+            stack.append(iter(children[v]))
+
+
+class LockfileIndex:
+    """``package-lock.json`` indexed once into ``install path -> (version, deps)``.
+
+    Install paths are the lockfile v2/v3 ``packages`` keys
+    (``node_modules/a/node_modules/b``); v1 lockfiles are flattened into the
+    same shape. Dependency names are resolved to install paths the way Node
+    does, walking up the nested ``node_modules`` directories.
+    """
+
+    def __init__(self, lockfile: Path):
+        self.lockfile = Path(lockfile)
+        self.packages: Dict[str, Tuple[str, List[str]]] = {}
+        self._resolved: Dict[Tuple[str, str], Optional[str]] = {}
+
+    def load(self) -> bool:
+        """Read and index the lockfile."""
+        try:
+            with open(self.lockfile, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error reading lockfile {self.lockfile}: {e}")
+            return False
+
+        if 'packages' in data:
+            for path, info in data['packages'].items():
+                if not path:
+                    continue
+                # Peer dependencies are supplied by the dependent, not pulled in
+                deps = [name for field in ('dependencies', 'optionalDependencies')
+                        for name in (info.get(field) or {})]
+                self.packages[path] = (info.get('version', ''), deps)
+        else:
+            # v1: nested "dependencies" objects mirror the node_modules tree
+            stack = [('', data.get('dependencies') or {})]
+            while stack:
+                prefix, dependencies = stack.pop()
+                for name, info in dependencies.items():
+                    path = f"{prefix}node_modules/{name}"
+                    self.packages[path] = (info.get('version', ''), list(info.get('requires') or {}))
+                    if info.get('dependencies'):
+                        stack.append((path + '/', info['dependencies']))
+        return True
+
+    def version(self, install_path: str) -> Optional[str]:
+        entry = self.packages.get(install_path)
+        return entry[0] if entry else None
+
+    def resolve(self, from_path: str, name: str) -> Optional[str]:
+        """Install path ``require(name)`` resolves to from the package at ``from_path``."""
+        cache_key = (from_path, name)
+        if cache_key in self._resolved:
+            return self._resolved[cache_key]
+
+        resolved = None
+        base = from_path
+        while True:
+            candidate = f"{base}/node_modules/{name}" if base else f"node_modules/{name}"
+            if candidate in self.packages:
+                resolved = candidate
+                break
+            if not base:
+                break
+            cut = base.rfind('/node_modules/')
+            base = base[:cut] if cut >= 0 else ''
+        self._resolved[cache_key] = resolved
+        return resolved
+
+    def closure(self, install_path: str) -> set:
+        """All install paths reachable from ``install_path`` (inclusive)."""
+        seen = {install_path}
+        stack = [install_path]
+        while stack:
+            path = stack.pop()
+            for name in self.packages.get(path, ('', []))[1]:
+                dep = self.resolve(path, name)
+                if dep is not None and dep not in seen:
+                    seen.add(dep)
+                    stack.append(dep)
+        return seen
+
+
+_INSTALL_PATH = re.compile(r'.*node_modules/(?:@[^/]+/)?[^/]+')
+_INSTALL_PREFIX = re.compile(r'(?:\([^)/]*\)/|\.\./)*')
+
+
+def install_path(key: str) -> Optional[str]:
+    """Innermost ``node_modules/...`` install directory of a module key.
+
+    Workspace directories are kept (``packages/ui/node_modules/react``, as
+    in lockfile keys); webpack layers (``(app-pages-browser)/``) and ``../``
+    segments leading out of the project are dropped.
+    """
+    if 'node_modules/' not in key:
+        return None
+    match = _INSTALL_PATH.match(key, _INSTALL_PREFIX.match(key).end())
+    return match.group() if match else None
+
+
+class PackageRollup:
+    """Per-package byte rollup attributed to direct dependencies.
+
+    Module keys resolve to their install directory and, through the
+    lockfile index, to ``package@version``; packages vendored inside another
+    one (``next/dist/compiled/*``) keep their own name but belong to the
+    shipping package's install. Every direct dependency from
+    ``package.json`` is credited with the bytes of its lockfile closure, as
+    a total and as the part no other direct dependency pulls in.
+    """
+
+    def __init__(self, analyzer: 'BundleAnalyzer', lock: LockfileIndex,
+                 manifest: Optional[Dict[str, Any]] = None):
+        self.analyzer = analyzer
+        self.lock = lock
+        self.manifest = manifest or {}
+        self.packages: List[Dict[str, Any]] = []
+        self.direct: List[Dict[str, Any]] = []
+        self.unattributed: Dict[str, int] = {'parsed_size': 0, 'gzip_size': 0, 'packages': 0}
+
+    def compute(self) -> None:
+        """Aggregate module bytes per package and per direct dependency."""
+        rollup: Dict[Tuple[str, str], List[int]] = {}
+        for key, (parsed, gzip, _, count) in self.analyzer.modules.key_index().items():
+            path = install_path(key)
+            if path is None:
+                continue
+            name, _ = package_relative_path(key)
+            entry = rollup.setdefault((path, name), [0, 0, 0])
+            entry[0] += parsed
+            entry[1] += gzip
+            entry[2] += count
+
+        by_install: Dict[str, List[int]] = {}
+        self.packages = []
+        for (path, name), (parsed, gzip, count) in rollup.items():
+            installed = package_name(path)
+            version = self.lock.version(path)
+            record = {
+                'package': f"{name}@{version}" if version and name == installed else name,
+                'name': name,
+                'version': version if name == installed else None,
+                'install_path': path,
+                'vendored_by': f"{installed}@{version}" if name != installed else None,
+                'parsed_size': parsed,
+                'gzip_size': gzip,
+                'modules': count,
+                'required_by': [],
+            }
+            self.packages.append(record)
+            totals = by_install.setdefault(path, [0, 0])
+            totals[0] += parsed
+            totals[1] += gzip
+
+        owners: Dict[str, List[str]] = {}
+        closures = {}
+        for field in ('dependencies', 'optionalDependencies', 'devDependencies'):
+            for name in self.manifest.get(field) or {}:
+                root = self.lock.resolve('', name)
+                if root is None or name in closures:
+                    continue
+                paths = self.lock.closure(root) & by_install.keys()
+                if field == 'devDependencies':
+                    # Tooling only gets the bytes no runtime dependency explains
+                    paths -= {p for p in paths if any(closures[o][0] != field for o in owners.get(p, []))}
+                closures[name] = (field, paths)
+                for path in closures[name][1]:
+                    owners.setdefault(path, []).append(name)
+
+        self.direct = []
+        for name, (field, paths) in closures.items():
+            if not paths:
+                continue
+            exclusive = [path for path in paths if len(owners[path]) == 1]
+            root = self.lock.resolve('', name)
+            self.direct.append({
+                'dependency': name,
+                'version': self.lock.version(root),
+                'type': field,
+                'own_parsed_size': by_install.get(root, [0, 0])[0],
+                'total_parsed_size': sum(by_install[p][0] for p in paths),
+                'total_gzip_size': sum(by_install[p][1] for p in paths),
+                'exclusive_parsed_size': sum(by_install[p][0] for p in exclusive),
+                'exclusive_gzip_size': sum(by_install[p][1] for p in exclusive),
+                'packages': len(paths),
+            })
+        self.direct.sort(key=lambda d: d['total_parsed_size'], reverse=True)
+
+        for record in self.packages:
+            record['required_by'] = sorted(owners.get(record['install_path'], []))
+            if not record['required_by']:
+                self.unattributed['parsed_size'] += record['parsed_size']
+                self.unattributed['gzip_size'] += record['gzip_size']
+                self.unattributed['packages'] += 1
+        self.packages.sort(key=lambda p: p['parsed_size'], reverse=True)
+
+
+# Categories for --compact-tree, in display order. Package patterns are
+# globs over npm package names; path patterns are regexes over local paths.
+DEFAULT_CATEGORY_RULES = {
+    'default': 'Other Dependencies',
+    'categories': [
+        {'name': 'React Ecosystem',
+         'packages': ['react', 'react-dom', 'react-is', 'scheduler', 'next', '@next/*',
+                      'react-server-dom-webpack']},
+        {'name': 'UI Components',
+         'packages': ['@radix-ui/*', 'lucide-react', '@heroicons/*', '@headlessui/*'],
+         'paths': [r'(^|/)components/ui/']},
+        {'name': 'Forms & Validation',
+         'packages': ['react-hook-form', '@hookform/*', 'zod', 'yup', 'formik']},
+        {'name': 'State Management',
+         'packages': ['zustand', 'redux', '@reduxjs/*', 'react-redux', 'jotai', 'recoil']},
+        {'name': 'Utilities', 'packages': ['lodash', 'lodash-es', 'ramda', 'date-fns', 'clsx']},
+        {'name': 'Styling', 'packages': ['tailwind*', 'styled-components', '@emotion/*']},
+        {'name': 'Other Dependencies'},
+        {'name': 'Local Components', 'paths': [r'(^|/)src/']},
+    ],
+}
+
+
+class ModuleCategorizer:
+    """Classify module keys into categories with precompiled rules.
+
+    All package globs are combined into a single alternation with one named
+    group per category, matched against the npm package name (vendored
+    copies count as the vendored package) and memoized per package. Local
+    modules are tested against each category's compiled path regex in
+    order, so user patterns keep their own groups. The first category
+    listed wins; unmatched modules fall into ``default``.
+    """
+
+    def __init__(self, rules: Optional[Dict[str, Any]] = None):
+        rules = rules or DEFAULT_CATEGORY_RULES
+        self.order: List[str] = []
+        self.default = rules.get('default', 'Other Dependencies')
+        groups: Dict[str, str] = {}
+        package_alternatives: List[str] = []
+        self._path_rules: List[Tuple[Any, str]] = []
+
+        for i, category in enumerate(rules.get('categories', [])):
+            name = category['name']
+            if name not in self.order:
+                self.order.append(name)
+            group = f"c{i}"
+            groups[group] = name
+            packages = [re.escape(glob).replace(r'\*', '[^/]*') for glob in category.get('packages', [])]
+            if packages:
+                package_alternatives.append(f"(?P<{group}>^(?:{'|'.join(packages)})$)")
+            paths = category.get('paths', [])
+            if paths:
+                self._path_rules.append((re.compile('|'.join(f'(?:{p})' for p in paths), re.IGNORECASE), name))
+        if self.default not in self.order:
+            self.order.append(self.default)
+
+        self._groups = groups
+        self._package_rule = re.compile('|'.join(package_alternatives)) if package_alternatives else None
+        self._packages: Dict[str, str] = {}
+
+    @classmethod
+    def from_file(cls, path: str) -> 'ModuleCategorizer':
+        """Load rules from a JSON file shaped like ``DEFAULT_CATEGORY_RULES``."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def categorize(self, key: str) -> str:
+        """Return the category of a module key."""
+        package, _ = package_relative_path(key)
+        if package is not None:
+            category = self._packages.get(package)
+            if category is None:
+                match = self._package_rule.match(package) if self._package_rule else None
+                category = self._groups[match.lastgroup] if match else self.default
+                self._packages[package] = category
+            return category
+
+        for rule, name in self._path_rules:
+            if rule.search(key):
+                return name
+        return self.default
+
+
+TREEMAP_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+  body { margin: 0; font: 12px -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif; }
+  header { padding: 6px 10px; background: #222; color: #eee; white-space: nowrap; overflow: hidden; }
+  header span { cursor: pointer; text-decoration: underline; }
+  #tip { position: fixed; pointer-events: none; background: #fff; border: 1px solid #888;
+         padding: 4px 6px; display: none; max-width: 60em; word-break: break-all; }
+  canvas { display: block; }
+</style>
+</head>
+<body>
+<header id="crumbs"></header>
+<canvas id="map"></canvas>
+<div id="tip"></div>
+<pre id="stacks" hidden><!--stacks--></pre>
+<script>
+(function () {
+  var unit = '{unit}';
+  var root = { name: document.title, value: 0, kids: new Map(), parent: null };
+  document.getElementById('stacks').textContent.split('\\n').forEach(function (line) {
+    var space = line.lastIndexOf(' ');
+    if (space < 0) return;
+    var value = +line.slice(space + 1), node = root;
+    root.value += value;
+    line.slice(0, space).split(';').forEach(function (frame) {
+      var child = node.kids.get(frame);
+      if (!child) node.kids.set(frame, child = { name: frame, value: 0, kids: new Map(), parent: node });
+      child.value += value;
+      node = child;
+    });
+  });
+
+  function size(bytes) {
+    if (bytes >= 1048576) return (bytes / 1048576).toFixed(1) + ' MB';
+    if (bytes >= 1024) return (bytes / 1024).toFixed(1) + ' KB';
+    return bytes + ' B';
+  }
+  function pathOf(node) {
+    var names = [];
+    for (; node; node = node.parent) names.unshift(node.name);
+    return names;
+  }
+
+  // Squarified layout of one level into out[] as [node, x, y, w, h]
+  function squarify(nodes, x, y, w, h, out) {
+    var total = 0, i = 0;
+    nodes.forEach(function (n) { total += n.value; });
+    while (i < nodes.length && w > 0 && h > 0 && total > 0) {
+      var scale = w * h / total, side = Math.min(w, h), row = [], sum = 0, worst = Infinity;
+      for (; i < nodes.length; i++) {
+        var area = nodes[i].value * scale, next = sum + area;
+        var min = row.length ? Math.min(row[row.length - 1].value * scale, area) : area;
+        var max = row.length ? Math.max(row[0].value * scale, area) : area;
+        var ratio = Math.max(side * side * max / (next * next), next * next / (side * side * min));
+        if (row.length && ratio > worst) break;
+        row.push(nodes[i]); sum = next; worst = ratio;
+      }
+      var thick = sum / side, offset = 0;
+      row.forEach(function (n) {
+        var length = n.value * scale / thick;
+        if (w >= h) out.push([n, x, y + offset, thick, length]);
+        else out.push([n, x + offset, y, length, thick]);
+        offset += length;
+      });
+      if (w >= h) { x += thick; w -= thick; } else { y += thick; h -= thick; }
+      total -= sum / scale;
+    }
+  }
+
+  var canvas = document.getElementById('map'), ctx = canvas.getContext('2d');
+  var crumbs = document.getElementById('crumbs'), tip = document.getElementById('tip');
+  var current = root, rects = [];
+
+  function draw() {
+    canvas.width = window.innerWidth;
+    canvas.height = window.innerHeight - crumbs.offsetHeight;
+    ctx.font = '11px sans-serif';
+    ctx.textBaseline = 'top';
+    rects = [];
+    var pending = [[current, 0, 0, canvas.width, canvas.height, 0, 0]];
+    while (pending.length) {
+      var item = pending.pop(), node = item[0], x = item[1], y = item[2], w = item[3], h = item[4];
+      var depth = item[5], hue = item[6];
+      if (node !== current) {
+        ctx.fillStyle = 'hsl(' + hue + ',' + Math.max(25, 65 - depth * 8) + '%,' + Math.min(88, 45 + depth * 8) + '%)';
+        ctx.fillRect(x, y, w, h);
+        ctx.strokeStyle = '#fff';
+        ctx.strokeRect(x + 0.5, y + 0.5, w - 1, h - 1);
+        rects.push([node, x, y, w, h]);
+        if (w > 40 && h > 14) {
+          ctx.fillStyle = '#000';
+          ctx.fillText(node.name + ' ' + size(node.value), x + 3, y + 2, w - 6);
+        }
+      }
+      if (!node.kids.size || w < 6 || h < 6) continue;
+      var top = node === current ? 0 : (h > 30 ? 14 : 0), pad = node === current ? 0 : 1;
+      var kids = Array.from(node.kids.values()).filter(function (n) { return n.value > 0; });
+      kids.sort(function (a, b) { return b.value - a.value; });
+      var out = [];
+      squarify(kids, x + pad, y + top + pad, w - 2 * pad, h - top - 2 * pad, out);
+      out.forEach(function (r, k) {
+        var childHue = node === current ? (k * 137.5) % 360 : hue;
+        pending.push([r[0], r[1], r[2], r[3], r[4], depth + 1, childHue]);
+      });
+    }
+
+    crumbs.textContent = '';
+    pathOf(current).forEach(function (name, k, names) {
+      var link = document.createElement('span'), target = current;
+      for (var up = names.length - 1 - k; up > 0; up--) target = target.parent;
+      link.textContent = name;
+      link.onclick = function () { current = target; draw(); };
+      crumbs.appendChild(link);
+      crumbs.appendChild(document.createTextNode(' / '));
+    });
+    crumbs.appendChild(document.createTextNode(size(current.value) + ' ' + unit));
+  }
+
+  function hit(event) {
+    var box = canvas.getBoundingClientRect(), px = event.clientX - box.left, py = event.clientY - box.top;
+    for (var k = rects.length - 1; k >= 0; k--) {
+      var r = rects[k];
+      if (px >= r[1] && px < r[1] + r[3] && py >= r[2] && py < r[2] + r[4]) return r[0];
+    }
+    return null;
+  }
+  canvas.onmousemove = function (event) {
+    var node = hit(event);
+    if (!node) { tip.style.display = 'none'; return; }
+    tip.textContent = pathOf(node).slice(1).join(' / ') + ' \\u2014 ' + size(node.value) +
+      ' (' + (100 * node.value / root.value).toFixed(2) + '%)';
+    tip.style.display = 'block';
+    tip.style.left = Math.min(event.clientX + 12, window.innerWidth - tip.offsetWidth - 4) + 'px';
+    tip.style.top = (event.clientY + 12) + 'px';
+  };
+  canvas.onmouseleave = function () { tip.style.display = 'none'; };
+  canvas.onclick = function (event) {
+    // Zoom one level: into the clicked node's ancestor just below the current root
+    var node = hit(event);
+    while (node && node.parent !== current) node = node.parent;
+    if (node && node.kids.size) { current = node; draw(); }
+  };
+  window.onresize = draw;
+  draw();
+})();
+</script>
+</body>
+</html>
+"""
+
+
+def stack_frame(name: str) -> str:
+    """Make a name safe as one frame of a collapsed stack line."""
+    if ';' in name or '\n' in name:
+        name = name.replace(';', ':').replace('\n', ' ')
+    return name
+
+
+class TreeWriter:
+    """Buffered, iterative writer for module hierarchies.
+
+    Used for the terminal trees and for the collapsed-stack and treemap
+    exports. Lines are collected and written in blocks of ``buffer_size``
+    characters instead of one ``print()`` per node, and trees are walked
+    with an explicit stack so depth is only bounded by memory.
+    """
+
+    def __init__(self, stream: Any = None, buffer_size: int = STREAM_WINDOW):
+        self.stream = stream if stream is not None else sys.stdout
+        self.buffer_size = buffer_size
+        self._parts: List[str] = []
+        self._size = 0
+
+    def __enter__(self) -> 'TreeWriter':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.flush()
+
+    def write(self, text: str) -> None:
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._parts:
+            self.stream.write(''.join(self._parts))
+            self._parts = []
+            self._size = 0
+
+    def tree(self, items: Sequence[Tuple[str, Any]], describe: Any, children: Any,
+             prefix: str = '') -> None:
+        """Write ``items`` and their descendants as a box-drawing tree.
+
+        ``describe(name, node)`` returns a node's text and ``children(node)``
+        its ``(name, node)`` children, or nothing for a leaf.
+        """
+        stack = [(items, 0, prefix)]
+        while stack:
+            siblings, i, prefix = stack[-1]
+            if i == len(siblings):
+                stack.pop()
+                continue
+            stack[-1] = (siblings, i + 1, prefix)
+            name, node = siblings[i]
+            is_last = i == len(siblings) - 1
+            self.write(f"{prefix}{'└── ' if is_last else '├── '}{describe(name, node)}\n")
+            kids = children(node)
+            if kids:
+                stack.append((kids, 0, prefix + ('    ' if is_last else '│   ')))
+
+    def stacks(self, stacks: Iterator[Tuple[str, int]]) -> int:
+        """Write ``(frames, weight)`` pairs as collapsed-stack lines."""
+        count = 0
+        for frames, weight in stacks:
+            self.write(f"{frames} {weight}\n")
+            count += 1
+        return count
+
+    def treemap(self, stacks: Iterator[Tuple[str, int]], title: str, unit: str) -> int:
+        """Write a self-contained HTML treemap around the collapsed stacks."""
+        head, tail = TREEMAP_HTML.split('<!--stacks-->')
+        escape = {'&': '&amp;', '<': '&lt;', '>': '&gt;', "'": '&#39;'}
+        title = ''.join(escape.get(c, c) for c in title)
+        self.write(head.replace('{title}', title))
+        count = 0
+        for frames, weight in stacks:
+            if '&' in frames or '<' in frames or '>' in frames:
+                frames = ''.join(escape.get(c, c) for c in frames)
+            self.write(f"{frames} {weight}\n")
+            count += 1
+        self.write(tail.replace('{unit}', unit))
+        return count
+
+
+class BundleAnalyzer:
+    """Analyzes bundle analyzer data from Next.js webpack-bundle-analyzer."""
+
+    def __init__(self, html_file: str, build_dir: Optional[str] = None):
+        self.html_file = Path(html_file)
+        # Emitted chunk files live next to the analyze/ directory (.next/static/...),
+        # or next to the input itself for a stats.json written into .next/
+        if build_dir:
+            self.build_dir = Path(build_dir)
+        elif (self.html_file.parent / 'static').is_dir():
+            self.build_dir = self.html_file.parent
+        else:
+            self.build_dir = self.html_file.parent.parent
+        self.chart_data: List[Dict[str, Any]] = []
+        self.modules = ModuleTable()
+        self.duplicates: Optional[List[Dict[str, Any]]] = None
+        self.entrypoint_costs: Optional[List[Dict[str, Any]]] = None
+        self.measured_sizes: Dict[str, Dict[str, int]] = {}
+        self.stats_source: Optional[StatsJsonSource] = None
+        self.retained: Optional[RetainedSizeAnalyzer] = None
+        self.package_rollup: Optional[PackageRollup] = None
+        # ``analysis_timestamp`` of a loaded --export file (JSON or .ahm)
+        self.analysis_timestamp: Optional[str] = None
+        self.categorizer = ModuleCategorizer()
+        self.parse_cache: Optional[ParseCache] = None
+        # Compress stats.json chunk files for gzip sizes (--measure)
+        self.measure_gzip = False
+        self.profiler = PhaseProfiler(enabled=False)
+        self._cache_entry: Optional[Path] = None
+        self._modules_flattened = False
+
+    @profiled('extract_chart_data', lambda self, _: len(self.chart_data))
+    def extract_chart_data(self, streaming: bool = False) -> bool:
+        """Extract chartData from the HTML file.
+
+        In streaming mode the file is memory-mapped and every top-level chunk
+        is flattened as soon as it is decoded; ``chart_data`` then only keeps
+        the chunk headers (without their ``groups``). JSON files produced by
+        ``--export`` are accepted as well (their ``top_chunks`` are used), as
+        are webpack ``stats.json`` files (see :class:`StatsJsonSource`).
+
+        With a :class:`ParseCache` set, a previously flattened table for the
+        same file content is restored instead (stats.json inputs keep their
+        module graph and are not cached).
+        """
+        try:
+            is_stats = self.html_file.suffix == '.json' and StatsJsonSource.is_stats_file(self.html_file)
+            if self.parse_cache is not None and not is_stats:
+                self._cache_entry = self.parse_cache.entry(self.parse_cache.digest(self.html_file),
+                                                           'stream' if streaming else 'full')
+                with self.profiler.phase('cache.load'):
+                    hit = self.parse_cache.load(self._cache_entry, self)
+                if hit:
+                    self._cache_entry = None
+                    return True
+
+            if self.html_file.suffix == '.ahm':
+                export = CompactExport(self.html_file)
+                try:
+                    export.to_analyzer(self)
+                    self.analysis_timestamp = export.meta.get('summary', {}).get('analysis_timestamp')
+                finally:
+                    export.close()
+                return True
+            if self.html_file.suffix == '.json':
+                if is_stats:
+                    return self._load_stats_json(streaming)
+                return self._load_json_report()
+            if streaming:
+                return self._stream_chart_data()
+
+            with self.profiler.phase('read') as record:
+                with open(self.html_file, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                record['items'] = len(content)
+
+            # Find the chartData assignment
+            with self.profiler.phase('regex'):
+                chart_data_match = re.search(r'window\.chartData\s*=\s*(\[.*?\]);', content, re.DOTALL)
+
+            if not chart_data_match:
+                print("Error: Could not find chartData in HTML file")
+                return False
+
+            chart_data_json = chart_data_match.group(1)
+
+            # Parse the JSON data
+            with self.profiler.phase('json.loads', len(chart_data_json)):
+                self.chart_data = json.loads(chart_data_json)
+            return True
+
+        except FileNotFoundError:
+            print(f"Error: File {self.html_file} not found")
+            return False
+        except json.JSONDecodeError as e:
+            print(f"Error parsing JSON data: {e}")
+            return False
+        except Exception as e:
+            print(f"Error extracting chart data: {e}")
+            return False
+
+    def _load_json_report(self) -> bool:
+        """Load chart data from a previous ``--export`` file or a raw chartData dump."""
+        with open(self.html_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        if isinstance(data, dict) and 'top_chunks' in data:
+            self.chart_data = data['top_chunks']
+            self.analysis_timestamp = data.get('summary', {}).get('analysis_timestamp')
+        elif isinstance(data, list):
+            self.chart_data = data
+        else:
+            print(f"Error: Unrecognized JSON report format in {self.html_file}")
+            return False
+        return True
+
+    @profiled('stats.load', lambda self, _: len(self.modules))
+    def _load_stats_json(self, streaming: bool = False) -> bool:
+        """Build the module model from a webpack stats.json file."""
+        source = StatsJsonSource(self.html_file, self.build_dir, measure_gzip=self.measure_gzip)
+        source.load()
+        if not source.modules:
+            print(f"Error: No modules found in stats file {self.html_file}")
+            return False
+
+        self.stats_source = source
+        self.chart_data = []
+        self.modules = ModuleTable()
+        for chunk in source.iter_chart_nodes():
+            self.flatten_modules([chunk], first_chunk=len(self.chart_data))
+            if streaming:
+                chunk.pop('groups', None)
+            self.chart_data.append(chunk)
+
+        self._modules_flattened = True
+        return True
+
+    @profiled('stream+flatten', lambda self, _: len(self.modules))
+    def _stream_chart_data(self) -> bool:
+        """Decode and flatten chartData chunk by chunk from a memory map."""
+        self.chart_data = []
+        self.modules = ModuleTable()
+
+        with open(self.html_file, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = find_chart_data(mm)
+            if start < 0:
+                print("Error: Could not find chartData in HTML file")
+                return False
+
+            for _, _, chunk in iter_json_array(mm, start):
+                self.flatten_modules([chunk], first_chunk=len(self.chart_data))
+                chunk.pop('groups', None)
+                self.chart_data.append(chunk)
+
+        self._modules_flattened = True
+        return True
+
+    def flatten_modules(self, data: List[Dict[str, Any]], parent: int = 0,
+                        first_chunk: int = 0) -> None:
+        """Flatten the nested module structure into the module table.
+
+        Traversal is iterative (pre-order, same order as the chart data) so
+        arbitrarily deep trees never hit the recursion limit. Leaves keep a
+        trie node reference instead of their own copy of the full path, and
+        the index of the top-level chunk they were found in.
+        """
+        table = self.modules
+        trie = table.trie
+        chunk = first_chunk - 1
+        stack = [(iter(data), parent)]
+        while stack:
+            items, parent = stack[-1]
+            item = next(items, None)
+            if item is None:
+                stack.pop()
+                continue
+            if len(stack) == 1:
+                chunk += 1
+
+            # Use path if available, otherwise use label
+            item_path = item.get('path') or item.get('label', 'unknown')
+
+            # If it has groups, it's a directory/folder
+            if item.get('groups'):
+                stack.append((iter(item['groups']), trie.add(parent, item_path)))
+            else:
+                # This is a leaf module
+                table.append(trie.add_leaf(parent, item_path), chunk, item)
+
+    @profiled('analyze_modules', lambda self, _: len(self.modules))
+    def analyze_modules(self) -> None:
+        """Analyze all modules and extract key information."""
+        if not self._modules_flattened:
+            with self.profiler.phase('flatten') as record:
+                self.modules = ModuleTable()
+                self.flatten_modules(self.chart_data)
+                record['items'] = len(self.modules)
+
+        # Columns are queried by parsed size (most relevant for runtime
+        # performance) with a partial top-N selection instead of a full sort
+        with self.profiler.phase('freeze', len(self.modules)):
+            self.modules.freeze()
+
+        if self._cache_entry is not None:
+            with self.profiler.phase('cache.store'):
+                self.parse_cache.store(self._cache_entry, self)
+            self._cache_entry = None
+
+    @profiled('top', lambda self, result: len(result))
+    def get_top_modules(self, top_n: int = 20, min_size_kb: int = 50,
+                        filter_type: str = 'all') -> List[Dict[str, Any]]:
+        """Get top N modules above minimum size with optional filtering.
+
+        Rows carry their module ``key`` besides the full chunk-relative path.
+        """
+        rows = self.modules.top(top_n, 'parsed', min_size_kb * 1024, filter_type)
+        keys = self.modules.module_keys()
+        return [dict(self.modules.row(i), key=keys[i]) for i in rows]
+
+    def format_size(self, size_bytes: int) -> str:
+        """Format bytes to human readable format."""
+        if size_bytes >= 1024 * 1024:
+            return f"{size_bytes / (1024 * 1024):.1f} MB"
+        elif size_bytes >= 1024:
+            return f"{size_bytes / 1024:.1f} KB"
+        else:
+            return f"{size_bytes} B"
+
+    def format_delta(self, delta_bytes: int) -> str:
+        """Format a signed byte delta."""
+        sign = '+' if delta_bytes > 0 else '-' if delta_bytes < 0 else '±'
+        return sign + self.format_size(abs(delta_bytes))
+
+    @profiled('print_summary')
+    def print_summary(self) -> None:
+        """Print bundle summary."""
+        if not self.modules:
+            return
+
+        total_stat_size = self.modules.total('stat')
+        total_parsed_size = self.modules.total('parsed')
+        total_gzip_size = self.modules.total('gzip')
+
+        print("📊 Bundle Analysis Summary")
+        print("=" * 50)
+        print(f"Total modules: {len(self.modules)}")
+        print(f"Total stat size: {self.format_size(total_stat_size)}")
+        print(f"Total parsed size: {self.format_size(total_parsed_size)}")
+        print(f"Total gzip size: {self.format_size(total_gzip_size)}")
+        print()
+
+    @profiled('print_hot_modules')
+    def print_hot_modules(self, top_n: int = 20, min_size_kb: int = 50, filter_type: str = 'all') -> None:
+        """Print the hottest modules (largest ones)."""
+        top_modules = self.get_top_modules(top_n, min_size_kb, filter_type)
+
+        if not top_modules:
+            print(f"No modules found above {min_size_kb}KB")
+            return
+
+        print(f"🔥 Top {len(top_modules)} Hot Modules (> {min_size_kb}KB)")
+        print("=" * 80)
+        print(f"{'#':<3} {'Module':<50} {'Parsed':<10} {'Gzip':<10}")
+        print("-" * 80)
+
+        for i, module in enumerate(top_modules, 1):
+            path = module['path']
+            # Truncate very long paths
+            if len(path) > 50:
+                path = "..." + path[-47:]
+
+            parsed_size = self.format_size(module['parsedSize'])
+            gzip_size = self.format_size(module['gzipSize'])
+
+            print(f"{i:<3} {path:<50} {parsed_size:<10} {gzip_size:<10}")
+
+    @profiled('print_chunk_analysis', lambda self, _: len(self.chart_data))
+    def print_chunk_analysis(self) -> None:
+        """Analyze and print chunk-level information."""
+        chunks = [item for item in self.chart_data if item.get('isAsset')]
+
+        if not chunks:
+            return
+
+        print("\n📦 Chunk Analysis")
+        print("=" * 50)
+
+        # Sort chunks by parsed size
+        chunks.sort(key=lambda x: x['parsedSize'], reverse=True)
+
+        for i, chunk in enumerate(chunks[:10], 1):  # Top 10 chunks
+            entrypoints = [k for k, v in chunk.get('isInitialByEntrypoint', {}).items() if v]
+            entrypoint_str = f" ({', '.join(entrypoints)})" if entrypoints else ""
+
+            label = chunk.get('label', 'unknown')
+            if len(label) > 40:
+                label = label[:37] + "..."
+
+            parsed_size = self.format_size(chunk['parsedSize'])
+            gzip_size = self.format_size(chunk['gzipSize'])
+
+            measured = self.measured_sizes.get(chunk.get('label'))
+            measured_str = ""
+            if measured:
+                sizes = ', '.join(f"{codec}: {self.format_size(size)}" for codec, size in measured.items())
+                measured_str = f" [{sizes}]"
+
+            print(f"{i:2d}. {label:<40} {parsed_size:<10} {gzip_size:<10}{measured_str}{entrypoint_str}")
+
+    @profiled('measure_chunk_sizes', lambda self, result: len(result))
+    def measure_chunk_sizes(self, codecs_: Optional[Sequence[str]] = None,
+                            workers: Optional[int] = None) -> Dict[str, Dict[str, int]]:
+        """Measure the emitted chunk files and attach sizes to chunk rows by label."""
+        measurer = ChunkSizeMeasurer(self.build_dir, codecs_, workers)
+        self.measured_sizes = measurer.measure()
+        return self.measured_sizes
+
+    @profiled('source_maps', lambda self, result: len(result.chunks))
+    def apply_source_maps(self, workers: Optional[int] = None) -> SourceMapAttribution:
+        """Attribute emitted chunks to their original sources through source maps.
+
+        Chunks with a map are re-rowed in ``self.modules`` so the hot-module,
+        tree and category reports list original files and packages.
+        """
+        attribution = SourceMapAttribution(self.build_dir, workers)
+        if attribution.compute():
+            self.modules = attribution.apply(self.modules, self.chart_data)
+            self.duplicates = None
+        return attribution
+
+    def print_merge_what_if(self, labels: Sequence[str], codecs_: Optional[Sequence[str]] = None,
+                            workers: Optional[int] = None) -> None:
+        """Print how the compressed size changes if the given chunks were merged."""
+        files = []
+        for label in labels:
+            matches = [chunk.get('label', '') for chunk in self.chart_data
+                       if label in chunk.get('label', '')]
+            path = self.chunk_file(matches[0]) if len(matches) == 1 else self.chunk_file(label)
+            if path is None:
+                print(f"Error: no single emitted chunk file matches '{label}'")
+                return
+            files.append(path)
+
+        measurer = ChunkSizeMeasurer(self.build_dir, codecs_, workers)
+        result = measurer.measure_merged(files)
+
+        print("\n🧪 Merge What-If")
+        print("=" * 50)
+        for path in files:
+            print(f"  + {path.relative_to(self.build_dir).as_posix()}")
+        for codec in measurer.codecs:
+            separate, merged = result['separate'][codec], result['merged'][codec]
+            print(f"{codec:<10} separate {self.format_size(separate):>10}  merged "
+                  f"{self.format_size(merged):>10}  ({self.format_delta(merged - separate)})")
+
+    @profiled('print_optimization_suggestions')
+    def print_optimization_suggestions(self) -> None:
+        """Print optimization suggestions based on analysis."""
+        if not self.modules:
+            return
+
+        print("\n💡 Optimization Suggestions")
+        print("=" * 50)
+
+        # Find large node_modules
+        table = self.modules
+        node_modules = table.indices('parsed', 100 * 1024 + 1, 'node_modules')
+
+        if len(node_modules):
+            print(f"• Found {len(node_modules)} large node_modules modules")
+            total_nm_size = table.total('parsed', node_modules)
+            print(f"  Total node_modules size: {self.format_size(total_nm_size)}")
+
+            # Check for common heavy packages
+            heavy_packages = []
+            for row in table.top(5, 'parsed', 100 * 1024 + 1, 'node_modules'):
+                module = table.row(row)
+                if 'react' in module['path'].lower() and 'dom' in module['path'].lower():
+                    heavy_packages.append("React DOM")
+                elif 'lodash' in module['path'].lower():
+                    heavy_packages.append("Lodash")
+                elif 'moment' in module['path'].lower():
+                    heavy_packages.append("Moment.js")
+
+            if heavy_packages:
+                print(f"  Consider tree-shaking: {', '.join(set(heavy_packages))}")
+
+        # Check for large assets
+        large_assets = table.indices('stat', 50 * 1024 + 1, 'asset')
+
+        if len(large_assets):
+            print(f"• Found {len(large_assets)} large asset files")
+            total_asset_size = table.total('stat', large_assets)
+            print(f"  Total asset size: {self.format_size(total_asset_size)}")
+            print("  Consider optimizing/compressing large assets")
+
+        # Check for modules shipped more than once; chunk files are only
+        # hashed when --duplicates asked for them
+        duplicates = self.duplicates if self.duplicates is not None else self._module_duplicates()
+        if duplicates:
+            wasted_parsed, divergent_parsed = self.duplicate_totals(duplicates, 'parsed')
+            print(f"• Found {len(duplicates)} duplicated modules")
+            print(f"  Deduplication would save: {self.format_size(wasted_parsed)}")
+            if divergent_parsed:
+                print(f"  Divergent copies (different versions): {self.format_size(divergent_parsed)}")
+            print("  Run with --duplicates for details")
+
+    def chunk_file(self, label: str) -> Optional[Path]:
+        """Return the emitted file for a chunk label if it exists in the build dir."""
+        path = self.build_dir / label
+        return path if path.is_file() else None
+
+    @profiled('find_duplicates', lambda self, result: len(result))
+    def find_duplicates(self) -> List[Dict[str, Any]]:
+        """Find modules shipped more than once, with the bytes deduplication saves.
+
+        Leaves are hash-grouped in one pass by package-relative path and
+        label; sets whose copies share a statSize are reported as identical,
+        others as divergent (different versions of the same file). Emitted
+        chunk files that are byte-identical are reported as well when the
+        build directory is available.
+        """
+        if self.duplicates is not None:
+            return self.duplicates
+
+        duplicates = self._module_duplicates()
+
+        # Byte-identical chunk files emitted under different names
+        by_digest: Dict[str, List[int]] = {}
+        for index, chunk in enumerate(self.chart_data):
+            path = self.chunk_file(chunk.get('label', ''))
+            if path is not None:
+                by_digest.setdefault(file_digest(path), []).append(index)
+        for digest, indices in by_digest.items():
+            if len(indices) < 2:
+                continue
+            copies = [{
+                'path': self.chart_data[i].get('label', 'unknown'),
+                'chunk': self.chart_data[i].get('label', 'unknown'),
+                'statSize': self.chart_data[i].get('statSize', 0),
+                'parsedSize': self.chart_data[i].get('parsedSize', 0),
+                'gzipSize': self.chart_data[i].get('gzipSize', 0),
+            } for i in indices]
+            duplicates.append(self._duplicate_set('chunk', digest, copies))
+
+        duplicates.sort(key=lambda d: d['wasted_parsed'], reverse=True)
+        self.duplicates = duplicates
+        return duplicates
+
+    def _module_duplicates(self) -> List[Dict[str, Any]]:
+        """Duplicate module sets from the table alone, without touching the build dir."""
+        table = self.modules
+        groups: Dict[Tuple[str, str, str], List[int]] = {}
+        for row, (package, relative) in enumerate(table.package_paths()):
+            groups.setdefault((package or '', relative, table.labels[row]), []).append(row)
+
+        duplicates = []
+        for (package, relative, label), rows in groups.items():
+            if len(rows) < 2:
+                continue
+            copies = [self._duplicate_copy(row) for row in rows]
+            duplicates.append(self._duplicate_set(
+                'module', f"{package}/{relative}" if package else relative, copies))
+        duplicates.sort(key=lambda d: d['wasted_parsed'], reverse=True)
+        return duplicates
+
+    @staticmethod
+    def duplicate_totals(duplicates: List[Dict[str, Any]], size: str = 'parsed') -> Tuple[int, int]:
+        """Return ``(wasted, divergent)`` bytes: identical copies vs. different versions."""
+        wasted = divergent = 0
+        for dup in duplicates:
+            if dup['match'] == 'identical':
+                wasted += dup[f'wasted_{size}']
+            else:
+                divergent += dup[f'wasted_{size}']
+        return wasted, divergent
+
+    def _duplicate_copy(self, row: int) -> Dict[str, Any]:
+        table = self.modules
+        chunk = table.chunks[row]
+        return {
+            'path': table.trie.path(int(table.nodes[row])),
+            'chunk': self.chart_data[chunk].get('label', 'unknown') if chunk < len(self.chart_data) else 'unknown',
+            'statSize': int(table.stat[row]),
+            'parsedSize': int(table.parsed[row]),
+            'gzipSize': int(table.gzip[row]),
+        }
+
+    @staticmethod
+    def _duplicate_set(kind: str, key: str, copies: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Summarize one duplicate set; keeping the largest copy saves the rest."""
+        parsed = [c['parsedSize'] for c in copies]
+        gzip = [c['gzipSize'] for c in copies]
+        identical = kind == 'chunk' or len({c['statSize'] for c in copies}) == 1
+        return {
+            'kind': kind,
+            'key': key,
+            'match': 'identical' if identical else 'divergent',
+            'copies': copies,
+            'chunks': sorted({c['chunk'] for c in copies}),
+            'wasted_parsed': sum(parsed) - max(parsed),
+            'wasted_gzip': sum(gzip) - max(gzip),
+        }
+
+    def print_duplicates(self, top_n: int = 20) -> None:
+        """Print duplicate module sets ranked by wasted parsed bytes."""
+        duplicates = self.find_duplicates()
+
+        print("\n♻️  Duplicate Modules")
+        print("=" * 50)
+        if not duplicates:
+            print("No duplicated modules found")
+            return
+
+        wasted_parsed, divergent_parsed = self.duplicate_totals(duplicates, 'parsed')
+        wasted_gzip, divergent_gzip = self.duplicate_totals(duplicates, 'gzip')
+        print(f"Duplicate sets: {len(duplicates)}")
+        print(f"Wasted (identical copies): {self.format_size(wasted_parsed)} parsed, "
+              f"{self.format_size(wasted_gzip)} gzipped")
+        if divergent_parsed or divergent_gzip:
+            print(f"Divergent copies (different versions): {self.format_size(divergent_parsed)} parsed, "
+                  f"{self.format_size(divergent_gzip)} gzipped")
+        print()
+
+        for i, dup in enumerate(duplicates[:top_n], 1):
+            key = dup['key']
+            if len(key) > 50:
+                key = "..." + key[-47:]
+            print(f"{i:2d}. {key} ×{len(dup['copies'])} [{dup['match']}] "
+                  f"{'wasted' if dup['match'] == 'identical' else 'extra'} {self.format_size(dup['wasted_parsed'])} "
+                  f"(gz: {self.format_size(dup['wasted_gzip'])})")
+
+            for j, copy in enumerate(dup['copies']):
+                branch = "└── " if j == len(dup['copies']) - 1 else "├── "
+                path = self._simplify_module_path(copy['path'])
+                if len(path) > 60:
+                    path = "..." + path[-57:]
+                print(f"    {branch}{path} ({self.format_size(copy['parsedSize'])}) in {copy['chunk']}")
+
+    def entrypoint_index(self) -> Dict[str, int]:
+        """Map each entrypoint to a bitset of the chunk indices it loads initially."""
+        index: Dict[str, int] = {}
+        for i, chunk in enumerate(self.chart_data):
+            for entrypoint, initial in (chunk.get('isInitialByEntrypoint') or {}).items():
+                if initial:
+                    index[entrypoint] = index.get(entrypoint, 0) | (1 << i)
+        return index
+
+    @profiled('compute_entrypoint_costs', lambda self, result: len(result))
+    def compute_entrypoint_costs(self, network: str = 'fast-3g',
+                                 cpu: str = 'mid-mobile') -> List[Dict[str, Any]]:
+        """Compute per-entrypoint initial JavaScript cost.
+
+        Chunks loaded by more than one entrypoint count as shared, the rest as
+        unique to the route. Transfer time assumes the initial chunks are
+        multiplexed over one connection (one RTT plus gzip bytes over the
+        bandwidth); parse time divides parsed bytes by the CPU throughput.
+        """
+        net = resolve_profile(network, NETWORK_PROFILES, ('bandwidth_kbps', 'rtt_ms'))
+        proc = resolve_profile(cpu, CPU_PROFILES, ('parse_bytes_per_ms',))
+        index = self.entrypoint_index()
+
+        # Chunks referenced by two or more entrypoints form the shared bitset
+        seen = shared = 0
+        for mask in index.values():
+            shared |= seen & mask
+            seen |= mask
+
+        parsed = [chunk.get('parsedSize', 0) for chunk in self.chart_data]
+        gzip = [chunk.get('gzipSize', 0) for chunk in self.chart_data]
+
+        costs = []
+        for entrypoint, mask in index.items():
+            chunks = list(iter_bits(mask))
+            shared_chunks = list(iter_bits(mask & shared))
+            total_parsed = sum(parsed[i] for i in chunks)
+            total_gzip = sum(gzip[i] for i in chunks)
+            shared_parsed = sum(parsed[i] for i in shared_chunks)
+            shared_gzip = sum(gzip[i] for i in shared_chunks)
+            transfer_ms = net['rtt_ms'] + total_gzip * 8 / net['bandwidth_kbps']
+            parse_ms = total_parsed / proc['parse_bytes_per_ms']
+            costs.append({
+                'entrypoint': entrypoint,
+                'chunks': [self.chart_data[i].get('label', 'unknown') for i in chunks],
+                'parsed_size': total_parsed,
+                'gzip_size': total_gzip,
+                'shared_parsed_size': shared_parsed,
+                'shared_gzip_size': shared_gzip,
+                'unique_parsed_size': total_parsed - shared_parsed,
+                'unique_gzip_size': total_gzip - shared_gzip,
+                'transfer_ms': round(transfer_ms, 1),
+                'parse_ms': round(parse_ms, 1),
+                'total_ms': round(transfer_ms + parse_ms, 1),
+            })
+
+        costs.sort(key=lambda c: c['gzip_size'], reverse=True)
+        self.entrypoint_costs = costs
+        return costs
+
+    def print_entrypoint_costs(self, top_n: int = 20, network: str = 'fast-3g',
+                               cpu: str = 'mid-mobile') -> None:
+        """Print the initial JavaScript each route downloads before it is interactive."""
+        costs = self.compute_entrypoint_costs(network, cpu)
+
+        print(f"\n🚦 Entrypoint Initial JS Cost (network: {network}, cpu: {cpu})")
+        print("=" * 100)
+        if not costs:
+            print("No entrypoint information found in chart data")
+            return
+
+        print(f"{'#':<3} {'Entrypoint':<40} {'Chunks':>6} {'Gzip':>10} {'Shared':>10} "
+              f"{'Unique':>10} {'Load':>9}")
+        print("-" * 100)
+        for i, cost in enumerate(costs[:top_n], 1):
+            name = cost['entrypoint']
+            if len(name) > 40:
+                name = "..." + name[-37:]
+            print(f"{i:<3} {name:<40} {len(cost['chunks']):>6} "
+                  f"{self.format_size(cost['gzip_size']):>10} "
+                  f"{self.format_size(cost['shared_gzip_size']):>10} "
+                  f"{self.format_size(cost['unique_gzip_size']):>10} "
+                  f"{cost['total_ms']:>7.0f}ms")
+
+    @profiled('compute_retained_sizes')
+    def compute_retained_sizes(self, entrypoint: Optional[str] = None) -> Optional[RetainedSizeAnalyzer]:
+        """Compute retained sizes from the stats.json module graph, if loaded."""
+        if self.stats_source is None:
+            return None
+        self.retained = RetainedSizeAnalyzer(self.stats_source)
+        self.retained.compute(entrypoint)
+        return self.retained
+
+    def print_retained_sizes(self, top_n: int = 20, entrypoint: Optional[str] = None) -> None:
+        """Print modules and packages ranked by retained (dominated) bytes."""
+        scope = f"entrypoint: {entrypoint}" if entrypoint else "all entrypoints"
+        print(f"\n🧲 Retained Size ({scope})")
+        print("=" * 80)
+
+        retained = self.compute_retained_sizes(entrypoint)
+        if retained is None:
+            print("Retained sizes need the module graph; use --input with a webpack stats.json")
+            return
+
+        print(f"{'#':<3} {'Module':<50} {'Retained':<12} {'Gzip':<12}")
+        print("-" * 80)
+        for i, module in enumerate(retained.modules[:top_n], 1):
+            name = module['module']
+            if len(name) > 50:
+                name = "..." + name[-47:]
+            print(f"{i:<3} {name:<50} {self.format_size(module['retainedParsedSize']):<12} "
+                  f"{self.format_size(module['retainedGzipSize']):<12}")
+
+        if retained.packages:
+            print(f"\n{'#':<3} {'Package':<50} {'Retained':<12} {'Gzip':<12}")
+            print("-" * 80)
+            for i, package in enumerate(retained.packages[:top_n], 1):
+                print(f"{i:<3} {package['package']:<50} "
+                      f"{self.format_size(package['retainedParsedSize']):<12} "
+                      f"{self.format_size(package['retainedGzipSize']):<12}")
+
+    @profiled('compute_package_rollup')
+    def compute_package_rollup(self, lockfile: Optional[str] = None) -> Optional[PackageRollup]:
+        """Roll module bytes up to packages using ``package-lock.json``.
+
+        Without an explicit lockfile, the project root (the parent of the
+        build directory) and the working directory are searched.
+        """
+        candidates = [Path(lockfile)] if lockfile else [
+            self.build_dir.parent / 'package-lock.json', Path('package-lock.json')]
+        path = next((c for c in candidates if c.is_file()), None)
+        if path is None:
+            print(f"No package-lock.json found (looked in: {', '.join(map(str, candidates))})")
+            return None
+
+        lock = LockfileIndex(path)
+        if not lock.load():
+            return None
+        manifest = {}
+        try:
+            with open(path.parent / 'package.json', 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        self.package_rollup = PackageRollup(self, lock, manifest)
+        self.package_rollup.compute()
+        return self.package_rollup
+
+    def print_package_rollup(self, top_n: int = 20, lockfile: Optional[str] = None) -> None:
+        """Print package@version sizes and the bytes each direct dependency pulls in."""
+        print("\n📦 Package Rollup")
+        print("=" * 90)
+
+        rollup = self.compute_package_rollup(lockfile)
+        if rollup is None:
+            return
+
+        print(f"{'#':<3} {'Package':<44} {'Parsed':<12} {'Gzip':<12} {'Required by':<20}")
+        print("-" * 90)
+        for i, package in enumerate(rollup.packages[:top_n], 1):
+            name = package['package']
+            if package['vendored_by']:
+                name = f"{name} (in {package['vendored_by']})"
+            if len(name) > 44:
+                name = name[:41] + "..."
+            owners = ', '.join(package['required_by']) or '-'
+            if len(owners) > 20:
+                owners = owners[:17] + "..."
+            print(f"{i:<3} {name:<44} {self.format_size(package['parsed_size']):<12} "
+                  f"{self.format_size(package['gzip_size']):<12} {owners:<20}")
+
+        if rollup.direct:
+            print(f"\n{'#':<3} {'Direct dependency':<40} {'Total':<11} {'Exclusive':<11} "
+                  f"{'Gzip':<11} {'Pkgs':>5}")
+            print("-" * 90)
+            for i, dep in enumerate(rollup.direct[:top_n], 1):
+                name = f"{dep['dependency']}@{dep['version']}"
+                if len(name) > 40:
+                    name = name[:37] + "..."
+                print(f"{i:<3} {name:<40} {self.format_size(dep['total_parsed_size']):<11} "
+                      f"{self.format_size(dep['exclusive_parsed_size']):<11} "
+                      f"{self.format_size(dep['total_gzip_size']):<11} {dep['packages']:>5}")
+
+        if rollup.unattributed['packages']:
+            print(f"\nNot reachable from package.json: {rollup.unattributed['packages']} packages, "
+                  f"{self.format_size(rollup.unattributed['parsed_size'])}")
+
+    @profiled('print_module_tree')
+    def print_module_tree(self, top_n: int = 20, min_size_kb: int = 50,
+                          filter_type: str = 'all', stream: Any = None) -> None:
+        """Print a hierarchical tree view of large modules to ``stream`` (default: stdout)."""
+        top_modules = self.get_top_modules(top_n, min_size_kb, filter_type)
+
+        with TreeWriter(stream) as writer:
+            if not top_modules:
+                writer.write(f"No modules found above {min_size_kb}KB for tree view\n")
+                return
+
+            writer.write(f"\n🌳 Module Hierarchy Tree (> {min_size_kb}KB, filtered: {filter_type})\n")
+            writer.write("=" * 80 + "\n")
+
+            # Build tree structure
+            tree = self._build_module_tree(top_modules)
+
+            # Every top-level entry is drawn as a last branch
+            for name, data in tree.items():
+                writer.tree([(name, data)], self._describe_tree_item, self._tree_item_children)
+
+    def _build_module_tree(self, modules: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build a hierarchical tree structure from module paths."""
+        tree = {}
+
+        for module in modules:
+            # Clean and simplify the path
+            path = self._simplify_module_path(module['path'])
+            path_parts = path.split('/')
+
+            # Skip empty parts
+            path_parts = [p for p in path_parts if p]
+
+            current = tree
+
+            # Navigate/create the path in the tree
+            for i, part in enumerate(path_parts):
+                if part not in current:
+                    if i == len(path_parts) - 1:
+                        # This is a leaf node (the actual module)
+                        current[part] = {
+                            'type': 'module',
+                            'data': module
+                        }
+                    else:
+                        # This is an intermediate directory
+                        current[part] = {
+                            'type': 'directory',
+                            'children': {}
+                        }
+
+                if current[part]['type'] == 'directory':
+                    current = current[part]['children']
+                else:
+                    # If we encounter a module where we expected a directory, stop
+                    break
+
+        return tree
+
+    def _simplify_module_path(self, path: str) -> str:
+        """Simplify complex webpack paths for better readability."""
+        # Remove repetitive concatenated paths
+        if ' (concatenated)' in path:
+            # Extract the main file path from concatenated modules
+            parts = path.split(' (concatenated)')
+            if len(parts) > 1:
+                # Use the first meaningful part
+                path = parts[0]
+
+        # Clean up webpack chunk references
+        path = path.replace('static/chunks/', 'chunks/')
+
+        # Simplify deep node_modules nesting
+        import re
+        # Replace multiple node_modules with single one
+        path = re.sub(r'node_modules/[^/]+/node_modules/', 'node_modules/', path)
+        path = re.sub(r'node_modules/[^/]+/node_modules/', 'node_modules/', path)  # Run twice for nested cases
+
+        # Simplify src directory repetition
+        path = re.sub(r'src/\./src/', 'src/', path)
+        path = re.sub(r'src/\./src/', 'src/', path)
+
+        return path
+
+    def _describe_tree_item(self, name: str, data: Dict[str, Any]) -> str:
+        """Text of one tree item: a directory, or a module with its sizes."""
+        if data['type'] != 'module':
+            return f"{name}/"
+
+        module = data['data']
+        parsed_size = self.format_size(module['parsedSize'])
+        gzip_size = self.format_size(module['gzipSize'])
+
+        # Truncate long names
+        display_name = name
+        if len(display_name) > 40:
+            display_name = display_name[:37] + "..."
+
+        retained = self.retained.retained.get(module['id']) if self.retained else None
+        retained_str = f", retained: {self.format_size(retained[0])}" if retained else ""
+
+        return f"{display_name} ({parsed_size}, gz: {gzip_size}{retained_str})"
+
+    @staticmethod
+    def _tree_item_children(data: Dict[str, Any]) -> Optional[List[Tuple[str, Dict[str, Any]]]]:
+        """Children of a directory item, modules before subdirectories."""
+        if data['type'] != 'directory':
+            return None
+        children = list(data['children'].items())
+        children.sort(key=lambda x: x[1]['type'] == 'directory')
+        return children
+
+    @profiled('print_compact_tree')
+    def print_compact_tree(self, top_n: int = 20, min_size_kb: int = 50,
+                           filter_type: str = 'all', stream: Any = None) -> None:
+        """Print a compact tree view grouped by logical categories to ``stream`` (default: stdout)."""
+        top_modules = self.get_top_modules(top_n, min_size_kb, filter_type)
+
+        with TreeWriter(stream) as writer:
+            if not top_modules:
+                writer.write(f"No modules found above {min_size_kb}KB for compact tree view\n")
+                return
+
+            writer.write(f"\n🌲 Compact Module Tree (> {min_size_kb}KB, filtered: {filter_type})\n")
+            writer.write("=" * 80 + "\n")
+
+            # Group modules by categories
+            categories = self._categorize_modules(top_modules)
+
+            for i, (category, modules) in enumerate(categories.items()):
+                is_last_category = i == len(categories) - 1
+                self._write_category_tree(writer, category, modules, is_last_category)
+
+    def _categorize_modules(self, modules: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Categorize modules into logical groups."""
+        categories: Dict[str, List[Dict[str, Any]]] = {name: [] for name in self.categorizer.order}
+
+        for module in modules:
+            category = self.categorizer.categorize(module['key'])
+            categories[category].append(module)
+
+        # Remove empty categories
+        return {k: v for k, v in categories.items() if v}
+
+    def _write_category_tree(self, writer: TreeWriter, category: str,
+                             modules: List[Dict[str, Any]], is_last_category: bool) -> None:
+        """Write a category and its modules in tree format."""
+        if not modules:
+            return
+
+        # Category header
+        branch = "└── " if is_last_category else "├── "
+        writer.write(f"{branch}{category}/\n")
+
+        # Calculate total size for category
+        total_parsed = sum(m['parsedSize'] for m in modules)
+        total_gzip = sum(m['gzipSize'] for m in modules)
+
+        # Sort modules by size within category
+        modules.sort(key=lambda x: x['parsedSize'], reverse=True)
+
+        next_prefix = "    " if is_last_category else "│   "
+
+        items = []
+        for module in modules:
+            # Extract just the filename/library name for cleaner display,
+            # from the same key the category came from
+            package, path = package_relative_path(module['key'])
+            if package:
+                # For npm packages, show package name
+                name = package
+            else:
+                # For local files, show the file name
+                name = path.split('/')[-1]
+                if len(name) > 30:
+                    name = name[:27] + "..."
+            items.append((name, module))
+
+        writer.tree(items, self._describe_category_module, lambda module: None, next_prefix)
+
+        # Show category total
+        total_parsed_fmt = self.format_size(total_parsed)
+        total_gzip_fmt = self.format_size(total_gzip)
+        writer.write(f"{next_prefix}💾 Total: {total_parsed_fmt} parsed, {total_gzip_fmt} gzipped\n\n")
+
+    def _describe_category_module(self, name: str, module: Dict[str, Any]) -> str:
+        parsed_size = self.format_size(module['parsedSize'])
+        gzip_size = self.format_size(module['gzipSize'])
+        return f"{name} ({parsed_size}, gz: {gzip_size})"
+
+    @profiled('export_results')
+    def export_results(self, filename: str, top_n: int = 20, min_size_kb: int = 50,
+                       filter_type: str = 'all', export_format: Optional[str] = None) -> None:
+        """Export analysis results to a JSON file or a compact binary export.
+
+        The format follows ``export_format``, or the file suffix (``.ahm`` is
+        compact). JSON is written incrementally (see :func:`iter_json_object`)
+        into a large write buffer, with the module rows generated as they are
+        encoded; the compact format (see :class:`CompactExport`) holds every
+        module, not just the top ones.
+        """
+        compact = export_format == 'compact' or (export_format is None and filename.endswith('.ahm'))
+        summary = {
+            'total_modules': len(self.modules),
+            'total_stat_size': self.modules.total('stat'),
+            'total_parsed_size': self.modules.total('parsed'),
+            'total_gzip_size': self.modules.total('gzip'),
+            'analysis_timestamp': utc_timestamp()
+        }
+        sections: Dict[str, Any] = {}
+        if self.duplicates is not None:
+            sections['duplicates'] = self.duplicates
+        if self.entrypoint_costs is not None:
+            sections['entrypoints'] = self.entrypoint_costs
+        if self.retained is not None:
+            sections['retained'] = {
+                'modules': self.retained.modules[:top_n],
+                'packages': self.retained.packages[:top_n],
+            }
+        if self.package_rollup is not None:
+            sections['packages'] = {
+                'packages': self.package_rollup.packages,
+                'direct_dependencies': self.package_rollup.direct,
+                'unattributed': self.package_rollup.unattributed,
+            }
+
+        if compact:
+            CompactExport.write(filename, self.modules, self.chart_data, {
+                'summary': summary, 'filter_applied': filter_type, 'min_size_kb': min_size_kb, **sections})
+            return
+
+        chunks = [item for item in self.chart_data if item.get('isAsset')][:10]
+        chunks.sort(key=lambda x: x['parsedSize'], reverse=True)
+        if self.measured_sizes:
+            chunks = [dict(chunk, measuredSizes=self.measured_sizes[chunk['label']])
+                      if chunk.get('label') in self.measured_sizes else chunk
+                      for chunk in chunks]
+
+        # Module rows are materialized one at a time while they are encoded
+        rows = self.modules.top(top_n, 'parsed', min_size_kb * 1024, filter_type)
+        members = [
+            ('summary', summary),
+            ('top_modules', (self.modules.row(i) for i in rows)),
+            ('top_chunks', chunks),
+            ('filter_applied', filter_type),
+            ('min_size_kb', min_size_kb),
+        ] + list(sections.items())
+
+        encoder = json.JSONEncoder(indent=2, ensure_ascii=False)
+        with open(filename, 'w', encoding='utf-8', buffering=STREAM_WINDOW) as f:
+            for piece in iter_json_object(members, encoder):
+                f.write(piece)
+
+    def iter_stacks(self, weight: str = 'parsed', filter_type: str = 'all') -> Iterator[Tuple[str, int]]:
+        """Yield ``(frames, bytes)`` for every module of the whole hierarchy.
+
+        Frames are the chunk label followed by the directories and file of
+        the module key. ``retained`` weights follow the dominator tree of a
+        stats.json instead (see :meth:`RetainedSizeAnalyzer.iter_stacks`).
+        """
+        if weight == 'retained':
+            yield from self.retained.iter_stacks(filter_type=filter_type)
+            return
+
+        table = self.modules
+        rows = table.indices(weight, 1, filter_type)
+        labels = [stack_frame(chunk.get('label', 'unknown')) for chunk in self.chart_data]
+        module_key = table.trie.module_key
+        nodes, chunks, sizes = table.nodes.tolist(), table.chunks.tolist(), getattr(table, weight).tolist()
+        for i in (rows.tolist() if np is not None else rows):
+            chunk = chunks[i]
+            label = labels[chunk] if chunk < len(labels) else 'unknown'
+            key = stack_frame(module_key(nodes[i])).replace('/', ';')
+            yield (f"{label};{key}" if key else label), sizes[i]
+
+    @profiled('export_stacks', lambda self, result: result)
+    def export_stacks(self, filename: str, weight: str = 'parsed', filter_type: str = 'all',
+                      treemap: bool = False) -> int:
+        """Write the whole module hierarchy as collapsed stacks or an HTML treemap.
+
+        Collapsed stacks (``frame;frame;module bytes``) load into
+        flamegraph.pl and speedscope; the treemap is a single HTML file
+        that builds its hierarchy from the same lines. Both are written in
+        one pass through a :class:`TreeWriter`. Returns the number of stacks.
+        """
+        if weight == 'retained' and self.retained is None and self.compute_retained_sizes() is None:
+            print("Retained sizes need the module graph; use --input with a webpack stats.json")
+            return 0
+
+        stacks = self.iter_stacks(weight, filter_type)
+        with open(filename, 'w', encoding='utf-8') as f, TreeWriter(f) as writer:
+            if treemap:
+                return writer.treemap(stacks, f"{self.html_file.name} ({weight} bytes)", weight)
+            return writer.stacks(stacks)
+
+
+# Starting point for the split-chunk search: roughly Next.js' own client defaults
+DEFAULT_SPLIT_POLICY = {
+    'minSize': 20000,
+    'maxInitialRequests': 25,
+    'cacheGroups': [
+        {'name': 'framework', 'test': '^(react|react-dom|scheduler|next)$', 'priority': 40},
+        {'name': 'lib', 'test': '.', 'priority': 30, 'splitBy': 'entrypoints'},
+    ],
+}
+
+
+class SplitChunkSimulator:
+    """In-memory what-if simulator for webpack ``splitChunks`` policies.
+
+    Every module is reduced to the set of entrypoints that load it initially
+    (a bitmask) and its npm package; modules sharing both are merged into
+    one atom, so evaluating a policy touches atoms rather than modules and
+    takes milliseconds. A policy is ``minSize`` (parsed bytes), the
+    ``maxInitialRequests`` per route and ``cacheGroups`` matched by package
+    name regex and priority; groups form one chunk (``splitBy: name``) or one
+    chunk per entrypoint combination (``splitBy: entrypoints``). Modules not
+    claimed by a group are split into shared chunks when two or more routes
+    need them and stay in the route's own chunk otherwise. Chunks below
+    ``minSize`` are duplicated into each route; routes exceeding
+    ``maxInitialRequests`` inline their smallest chunks into the route chunk.
+
+    The search minimizes the weighted route payload: gzip bytes plus a fixed
+    byte cost per request, weighted per entrypoint. Duplicated bytes are
+    charged once more per extra copy (weighted by the route carrying it),
+    for what a visitor moving between those routes downloads again; without
+    that, inlining would always look free.
+    """
+
+    def __init__(self, analyzer: 'BundleAnalyzer', weights: Optional[Dict[str, float]] = None,
+                 request_cost: int = 1024):
+        self.analyzer = analyzer
+        self.request_cost = request_cost
+
+        index = analyzer.entrypoint_index()
+        self.entrypoints = sorted(index)
+        weights = weights or {}
+        self.weights = [float(weights.get(name, 1.0)) for name in self.entrypoints]
+
+        chunk_masks = [0] * len(analyzer.chart_data)
+        for bit, name in enumerate(self.entrypoints):
+            for chunk in iter_bits(index[name]):
+                chunk_masks[chunk] |= 1 << bit
+
+        # One copy per module key, needed by the union of its chunks' routes
+        table = analyzer.modules
+        module_key = table.trie.module_key
+        modules: Dict[str, List[int]] = {}
+        for node, chunk, parsed, gzip in zip(table.nodes.tolist(), table.chunks.tolist(),
+                                             table.parsed.tolist(), table.gzip.tolist()):
+            mask = chunk_masks[chunk] if chunk < len(chunk_masks) else 0
+            if not mask:
+                continue  # only loaded lazily
+            entry = modules.setdefault(module_key(node), [0, 0, 0])
+            entry[0] |= mask
+            entry[1] = max(entry[1], parsed)
+            entry[2] = max(entry[2], gzip)
+
+        packages: Dict[str, int] = {}
+        atoms: Dict[Tuple[int, int], List[int]] = {}
+        for key, (mask, parsed, gzip) in modules.items():
+            package = package_name(key)
+            package_id = -1 if package is None else packages.setdefault(package, len(packages))
+            atom = atoms.setdefault((package_id, mask), [0, 0])
+            atom[0] += parsed
+            atom[1] += gzip
+
+        self.packages = sorted(packages, key=packages.get)
+        self.atoms = [(package_id, mask, sizes[0], sizes[1])
+                      for (package_id, mask), sizes in atoms.items()]
+
+    def compile_policy(self, policy: Dict[str, Any]) -> Tuple[int, int, List[Tuple[str, bool]], List[int]]:
+        """Resolve cache group regexes once into a package -> group assignment."""
+        groups = sorted(policy.get('cacheGroups', []), key=lambda g: g.get('priority', 0), reverse=True)
+        tests = [re.compile(group.get('test', '.')) for group in groups]
+        assignment = []
+        for package in self.packages:
+            match = next((i for i, test in enumerate(tests) if test.search(package)), -1)
+            assignment.append(match)
+        specs = [(group.get('name', f'group{i}'), group.get('splitBy', 'name') == 'name')
+                 for i, group in enumerate(groups)]
+        return (int(policy.get('minSize', 0)), int(policy.get('maxInitialRequests', 30)),
+                specs, assignment)
+
+    def evaluate(self, compiled: Tuple[int, int, List[Tuple[str, bool]], List[int]]) -> Dict[str, Any]:
+        """Simulate one compiled policy and return per-route initial bytes."""
+        min_size, max_requests, specs, assignment = compiled
+        n = len(self.entrypoints)
+        base_parsed = [0] * n
+        base_gzip = [0] * n
+
+        chunks: Dict[Any, List[int]] = {}
+        for package_id, mask, parsed, gzip in self.atoms:
+            group = assignment[package_id] if package_id >= 0 else -1
+            if group >= 0:
+                key = group if specs[group][1] else (group, mask)
+            elif mask & (mask - 1):
+                key = ('shared', mask)
+            else:
+                bit = mask.bit_length() - 1
+                base_parsed[bit] += parsed
+                base_gzip[bit] += gzip
+                continue
+            chunk = chunks.get(key)
+            if chunk is None:
+                chunks[key] = [mask, parsed, gzip]
+            else:
+                chunk[0] |= mask
+                chunk[1] += parsed
+                chunk[2] += gzip
+
+        weights = self.weights
+        objective = 0.0
+        duplicated = 0
+        route_chunks: List[List[Tuple[int, int, int]]] = [[] for _ in range(n)]
+        split: List[Tuple[int, int]] = []
+        for mask, parsed, gzip in chunks.values():
+            if parsed < min_size:
+                # Too small to split out: duplicated into every route chunk
+                copies = []
+                for bit in iter_bits(mask):
+                    base_parsed[bit] += parsed
+                    base_gzip[bit] += gzip
+                    copies.append(weights[bit])
+                objective += gzip * (sum(copies) - max(copies))
+                duplicated += gzip * (len(copies) - 1)
+                continue
+            for bit in iter_bits(mask):
+                route_chunks[bit].append((gzip, parsed, len(split)))
+            split.append((mask, gzip))
+
+        # Routes over maxInitialRequests inline their smallest chunks
+        limit = max(1, max_requests) - 1
+        inlined: Dict[int, int] = {}
+        for bit in range(n):
+            shared = route_chunks[bit]
+            if len(shared) <= limit:
+                continue
+            shared.sort()
+            for gzip, parsed, chunk in shared[:len(shared) - limit]:
+                base_parsed[bit] += parsed
+                base_gzip[bit] += gzip
+                inlined[chunk] = inlined.get(chunk, 0) | (1 << bit)
+            route_chunks[bit] = shared[len(shared) - limit:]
+
+        emitted = len(split)
+        for chunk, inlined_mask in inlined.items():
+            mask, gzip = split[chunk]
+            copies = [weights[bit] for bit in iter_bits(inlined_mask)]
+            loaded = mask & ~inlined_mask
+            if loaded:
+                # The split chunk itself is still one copy
+                copies.append(max(weights[bit] for bit in iter_bits(loaded)))
+            else:
+                emitted -= 1
+            objective += gzip * (sum(copies) - max(copies))
+            duplicated += gzip * (len(copies) - 1)
+
+        routes = []
+        for bit, name in enumerate(self.entrypoints):
+            shared = route_chunks[bit]
+            requests = 1 + len(shared)
+            gzip = base_gzip[bit] + sum(size for size, _, _ in shared)
+            parsed = base_parsed[bit] + sum(size for _, size, _ in shared)
+            objective += weights[bit] * (gzip + self.request_cost * requests)
+            routes.append({'entrypoint': name, 'gzip_size': gzip, 'parsed_size': parsed,
+                           'requests': requests})
+
+        return {'objective': round(objective), 'chunks': emitted + n,
+                'duplicated_gzip': duplicated, 'routes': routes}
+
+    def simulate(self, policy: Dict[str, Any]) -> Dict[str, Any]:
+        """Evaluate a policy given in splitChunks-like JSON form."""
+        return self.evaluate(self.compile_policy(policy))
+
+    def search(self, iterations: int = 2000, seed: int = 0,
+               start: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Hill-climb the policy space from ``start`` and return the best policy found.
+
+        Each step mutates ``minSize``, ``maxInitialRequests`` or the group of
+        one package (none, shared vendor chunk, per-route vendor chunks or a
+        dedicated chunk), keeping the change when the objective improves.
+        """
+        rng = random.Random(seed)
+        min_size, max_requests, specs, assignment = self.compile_policy(start or DEFAULT_SPLIT_POLICY)
+        specs = specs + [('vendors', True), ('vendors-split', False)]
+
+        best = (min_size, max_requests, list(specs), list(assignment))
+        best_result = self.evaluate(best)
+        if not self.packages:
+            return self.to_policy(best), best_result
+
+        # Spend most mutations on the packages that carry the most bytes
+        weight_by_package = [0] * len(self.packages)
+        for package_id, _, _, gzip in self.atoms:
+            if package_id >= 0:
+                weight_by_package[package_id] += gzip
+        candidates = sorted(range(len(self.packages)), key=lambda i: -weight_by_package[i])[:200]
+
+        for _ in range(iterations):
+            min_size, max_requests, specs, assignment = best[0], best[1], list(best[2]), list(best[3])
+            move = rng.random()
+            if move < 0.15:
+                min_size = rng.choice((0, 5000, 10000, 20000, 50000, 100000))
+            elif move < 0.25:
+                max_requests = rng.choice((3, 5, 10, 15, 25, 30))
+            else:
+                package = rng.choice(candidates)
+                choice = rng.randrange(4)
+                if choice == 0:
+                    assignment[package] = -1
+                elif choice == 1:
+                    assignment[package] = specs.index(('vendors', True))
+                elif choice == 2:
+                    assignment[package] = specs.index(('vendors-split', False))
+                else:
+                    spec = (self.packages[package], True)
+                    if spec not in specs:
+                        specs.append(spec)
+                    assignment[package] = specs.index(spec)
+
+            candidate = (min_size, max_requests, specs, assignment)
+            result = self.evaluate(candidate)
+            if result['objective'] < best_result['objective']:
+                best, best_result = candidate, result
+
+        return self.to_policy(best), best_result
+
+    def to_policy(self, compiled: Tuple[int, int, List[Tuple[str, bool]], List[int]]) -> Dict[str, Any]:
+        """Express a compiled assignment as a splitChunks-like JSON policy."""
+        min_size, max_requests, specs, assignment = compiled
+        members: Dict[int, List[str]] = {}
+        for package_id, group in enumerate(assignment):
+            if group >= 0:
+                members.setdefault(group, []).append(self.packages[package_id])
+
+        groups = []
+        for priority, group in enumerate(sorted(members), 1):
+            name, single = specs[group]
+            names = '|'.join(re.escape(package) for package in sorted(members[group]))
+            groups.append({
+                'name': name,
+                'test': f'^({names})$',
+                'priority': len(members) - priority + 1,
+                'splitBy': 'name' if single else 'entrypoints',
+            })
+        return {'minSize': min_size, 'maxInitialRequests': max_requests, 'cacheGroups': groups}
+
+    def current(self) -> Dict[str, Dict[str, int]]:
+        """Per-route initial bytes and requests of the analyzed build.
+
+        Sizes are summed over modules like the simulation, so both sides of
+        the comparison are in the same (pre-concatenation gzip) units.
+        """
+        table = self.analyzer.modules
+        count = len(self.analyzer.chart_data)
+        chunk_parsed = [0] * count
+        chunk_gzip = [0] * count
+        for chunk, parsed, gzip in zip(table.chunks.tolist(), table.parsed.tolist(), table.gzip.tolist()):
+            if chunk < count:
+                chunk_parsed[chunk] += parsed
+                chunk_gzip[chunk] += gzip
+
+        index = self.analyzer.entrypoint_index()
+        return {name: {
+            'gzip_size': sum(chunk_gzip[i] for i in iter_bits(mask)),
+            'parsed_size': sum(chunk_parsed[i] for i in iter_bits(mask)),
+            'requests': bin(mask).count('1'),
+        } for name, mask in index.items()}
+
+
+def print_split_simulation(analyzer: 'BundleAnalyzer', simulator: SplitChunkSimulator,
+                           result: Dict[str, Any], title: str, top_n: int = 20) -> None:
+    """Print simulated per-route initial bytes next to the current build."""
+    current = simulator.current()
+    fmt = analyzer.format_size
+    print(f"\n{title}")
+    print("=" * 100)
+    print(f"Objective (weighted gzip + request cost + duplication): {result['objective']:,}   "
+          f"initial chunks: {result['chunks']}   duplicated: {fmt(result['duplicated_gzip'])}")
+    print(f"{'#':<3} {'Entrypoint':<44} {'Now':>10} {'Simulated':>10} {'Delta':>10} {'Reqs':>9}")
+    print("-" * 100)
+    routes = sorted(result['routes'], key=lambda r: r['gzip_size'], reverse=True)
+    for i, route in enumerate(routes[:top_n], 1):
+        name = route['entrypoint']
+        if len(name) > 44:
+            name = "..." + name[-41:]
+        now = current.get(route['entrypoint'], {'gzip_size': 0, 'requests': 0})
+        print(f"{i:<3} {name:<44} {fmt(now['gzip_size']):>10} {fmt(route['gzip_size']):>10} "
+              f"{analyzer.format_delta(route['gzip_size'] - now['gzip_size']):>10} "
+              f"{now['requests']:>3} → {route['requests']:<3}")
+
+
+def load_analyzer(path: str, streaming: bool = False) -> Optional[BundleAnalyzer]:
+    """Extract and analyze one report, returning None if it cannot be read."""
+    analyzer = BundleAnalyzer(path)
+    if not analyzer.extract_chart_data(streaming=streaming):
+        return None
+    analyzer.analyze_modules()
+    return analyzer
+
+
+class BundleDiff:
+    """Build-to-build comparison keyed by hash-insensitive module identity.
+
+    Both sides are indexed by :meth:`ModuleTable.key_index` and joined with
+    plain dict lookups, so the comparison is linear in the module count.
+    """
+
+    def __init__(self, base: BundleAnalyzer, head: BundleAnalyzer):
+        self.base = base
+        self.head = head
+        self.modules: List[Dict[str, Any]] = []
+        self.packages: List[Dict[str, Any]] = []
+
+    def compute(self) -> None:
+        """Join both builds by module key and by package."""
+        base_index = self.base.modules.key_index()
+        head_index = self.head.modules.key_index()
+        self.modules = self._join(base_index, head_index, 'module')
+        self.packages = self._join(self._package_index(base_index),
+                                   self._package_index(head_index), 'package')
+
+    @staticmethod
+    def _package_index(index: Dict[str, List[int]]) -> Dict[str, List[int]]:
+        """Roll a module key index up to npm packages."""
+        packages: Dict[str, List[int]] = {}
+        for key, (parsed, gzip, stat, count) in index.items():
+            package = package_name(key)
+            if package is None:
+                continue
+            entry = packages.setdefault(package, [0, 0, 0, 0])
+            entry[0] += parsed
+            entry[1] += gzip
+            entry[2] += stat
+            entry[3] += count
+        return packages
+
+    @staticmethod
+    def _join(base: Dict[str, List[int]], head: Dict[str, List[int]],
+              field: str) -> List[Dict[str, Any]]:
+        """Return one record per key whose size differs between the builds."""
+        empty = (0, 0, 0, 0)
+        changes = []
+        for key, head_entry in head.items():
+            base_entry = base.get(key)
+            changes.append(BundleDiff._change(field, key, base_entry or empty, head_entry,
+                                              'added' if base_entry is None else None))
+        for key, base_entry in base.items():
+            if key not in head:
+                changes.append(BundleDiff._change(field, key, base_entry, empty, 'removed'))
+        return [c for c in changes if c['status'] != 'unchanged']
+
+    @staticmethod
+    def _change(field: str, key: str, base: Sequence[int], head: Sequence[int],
+                status: Optional[str]) -> Dict[str, Any]:
+        parsed_delta = head[0] - base[0]
+        gzip_delta = head[1] - base[1]
+        if status is None:
+            if parsed_delta > 0 or (parsed_delta == 0 and gzip_delta > 0):
+                status = 'grown'
+            elif parsed_delta < 0 or gzip_delta < 0:
+                status = 'shrunk'
+            else:
+                status = 'unchanged'
+        return {
+            field: key,
+            'status': status,
+            'base_parsed': base[0],
+            'head_parsed': head[0],
+            'parsed_delta': parsed_delta,
+            'base_gzip': base[1],
+            'head_gzip': head[1],
+            'gzip_delta': gzip_delta,
+        }
+
+    def ranked(self, changes: List[Dict[str, Any]], status: str,
+               metric: str = 'parsed', top_n: int = 20) -> List[Dict[str, Any]]:
+        """Return the ``top_n`` changes with ``status`` ranked by absolute delta."""
+        delta = f'{metric}_delta'
+        selected = [c for c in changes if c['status'] == status]
+        return heapq.nlargest(top_n, selected, key=lambda c: abs(c[delta]))
+
+    def print_report(self, top_n: int = 20, metric: str = 'parsed') -> None:
+        """Print totals plus added, removed and grown modules and packages."""
+        fmt = self.base.format_size
+        delta = self.base.format_delta
+        base_parsed, head_parsed = self.base.modules.total('parsed'), self.head.modules.total('parsed')
+        base_gzip, head_gzip = self.base.modules.total('gzip'), self.head.modules.total('gzip')
+        counts = {status: sum(1 for c in self.modules if c['status'] == status)
+                  for status in ('added', 'removed', 'grown', 'shrunk')}
+
+        print("🔀 Bundle Diff")
+        print("=" * 50)
+        print(f"Modules: {len(self.base.modules)} → {len(self.head.modules)}")
+        print(f"Parsed size: {fmt(base_parsed)} → {fmt(head_parsed)} ({delta(head_parsed - base_parsed)})")
+        print(f"Gzip size: {fmt(base_gzip)} → {fmt(head_gzip)} ({delta(head_gzip - base_gzip)})")
+        print(f"Changes: {counts['added']} added, {counts['removed']} removed, "
+              f"{counts['grown']} grown, {counts['shrunk']} shrunk")
+
+        sections = [
+            ("➕ Added Modules", self.modules, 'added', 'module'),
+            ("➖ Removed Modules", self.modules, 'removed', 'module'),
+            ("📈 Grown Modules", self.modules, 'grown', 'module'),
+            ("📦 Added Packages", self.packages, 'added', 'package'),
+            ("📦 Removed Packages", self.packages, 'removed', 'package'),
+            ("📦 Grown Packages", self.packages, 'grown', 'package'),
+        ]
+        for title, changes, status, field in sections:
+            rows = self.ranked(changes, status, metric, top_n)
+            if not rows:
+                continue
+
+            print(f"\n{title} (by {metric} delta)")
+            print("=" * 80)
+            print(f"{'#':<3} {field.capitalize():<50} {'Parsed':<12} {'Gzip':<12}")
+            print("-" * 80)
+            for i, change in enumerate(rows, 1):
+                name = change[field]
+                if len(name) > 50:
+                    name = "..." + name[-47:]
+                print(f"{i:<3} {name:<50} {delta(change['parsed_delta']):<12} "
+                      f"{delta(change['gzip_delta']):<12}")
+
+    def to_dict(self, top_n: int = 20, metric: str = 'parsed') -> Dict[str, Any]:
+        """Return the ranked diff as a JSON-serializable dict."""
+        return {
+            'base': str(self.base.html_file),
+            'head': str(self.head.html_file),
+            'summary': {
+                'base_parsed_size': self.base.modules.total('parsed'),
+                'head_parsed_size': self.head.modules.total('parsed'),
+                'base_gzip_size': self.base.modules.total('gzip'),
+                'head_gzip_size': self.head.modules.total('gzip'),
+            },
+            'metric': metric,
+            'modules': {status: self.ranked(self.modules, status, metric, top_n)
+                        for status in ('added', 'removed', 'grown', 'shrunk')},
+            'packages': {status: self.ranked(self.packages, status, metric, top_n)
+                         for status in ('added', 'removed', 'grown', 'shrunk')},
+        }
+
+    def export(self, filename: str, top_n: int = 20, metric: str = 'parsed') -> None:
+        """Export the ranked diff to a JSON file."""
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(top_n, metric), f, indent=2, ensure_ascii=False)
+
+
+class CacheChurn:
+    """Returning-visitor cache invalidation between two builds.
+
+    Chunks are paired by hash-insensitive file name; chunks whose name is
+    not stable (numeric split chunks get new ids) are paired through a
+    module key -> base chunk index with the base chunk holding most of
+    their bytes. A paired chunk whose file name changed is invalidated and
+    re-fetched in full, and the module-level join of the pair names the
+    modules that triggered it.
+    """
+
+    # Minimum share of a chunk's parsed bytes a base chunk must hold to pair by content
+    CONTENT_MATCH = 0.5
+
+    def __init__(self, base: BundleAnalyzer, head: BundleAnalyzer):
+        self.base = base
+        self.head = head
+        self.chunks: List[Dict[str, Any]] = []
+        self.entrypoints: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def _chunk_modules(analyzer: BundleAnalyzer) -> List[Dict[str, List[int]]]:
+        """Index each chunk's modules as ``{key: [parsed, gzip]}`` in one table pass."""
+        table = analyzer.modules
+        module_key = table.trie.module_key
+        chunks: List[Dict[str, List[int]]] = [{} for _ in analyzer.chart_data]
+        for node, chunk, parsed, gzip in zip(table.nodes.tolist(), table.chunks.tolist(),
+                                             table.parsed.tolist(), table.gzip.tolist()):
+            if chunk >= len(chunks):
+                continue
+            entry = chunks[chunk].setdefault(module_key(node), [0, 0])
+            entry[0] += parsed
+            entry[1] += gzip
+        return chunks
+
+    def _pair(self, base_modules: List[Dict[str, List[int]]],
+              head_modules: List[Dict[str, List[int]]]) -> List[Tuple[Optional[int], str]]:
+        """Return ``(base chunk index or None, how)`` for every head chunk."""
+        by_name: Dict[str, List[int]] = {}
+        for i, chunk in enumerate(self.base.chart_data):
+            by_name.setdefault(normalize_chunk_name(chunk.get('label', '')), []).append(i)
+
+        pairs: List[Tuple[Optional[int], str]] = []
+        used = set()
+        for chunk in self.head.chart_data:
+            candidates = by_name.get(normalize_chunk_name(chunk.get('label', '')))
+            if candidates:
+                base = candidates.pop(0)
+                used.add(base)
+                pairs.append((base, 'name'))
+            else:
+                pairs.append((None, ''))
+
+        # Fall back to content for the rest: which unpaired base chunk holds
+        # the most of this chunk's bytes, looked up per module key
+        owner: Dict[str, int] = {}
+        for i, modules in enumerate(base_modules):
+            if i not in used:
+                for key in modules:
+                    owner.setdefault(key, i)
+        for i, (base, _) in enumerate(pairs):
+            if base is not None or not owner:
+                continue
+            overlap: Dict[int, int] = {}
+            total = 0
+            for key, (parsed, _) in head_modules[i].items():
+                total += parsed
+                j = owner.get(key)
+                if j is not None and j not in used:
+                    overlap[j] = overlap.get(j, 0) + parsed
+            if overlap:
+                j = max(overlap, key=overlap.get)
+                if total and overlap[j] >= self.CONTENT_MATCH * total:
+                    used.add(j)
+                    pairs[i] = (j, 'content')
+        return pairs
+
+    def compute(self) -> None:
+        """Classify head chunks and sum re-fetched gzip bytes per entrypoint."""
+        base_modules = self._chunk_modules(self.base)
+        head_modules = self._chunk_modules(self.head)
+        self.chunks = []
+        for i, (base, how) in enumerate(self._pair(base_modules, head_modules)):
+            chunk = self.head.chart_data[i]
+            record = {
+                'chunk': chunk.get('label', ''),
+                'base_chunk': None,
+                'paired_by': how or None,
+                'gzip_size': chunk.get('gzipSize', 0),
+                'status': 'new',
+                'triggers': [],
+            }
+            if base is not None:
+                base_label = self.base.chart_data[base].get('label', '')
+                record['base_chunk'] = base_label
+                triggers = self._triggers(base_modules[base], head_modules[i])
+                # Unhashed names (exports, dev builds) change whenever content does
+                changed = (base_label != record['chunk']
+                           or (normalize_chunk_name(base_label) == base_label and bool(triggers)))
+                record['status'] = 'invalidated' if changed else 'stable'
+                record['triggers'] = triggers
+            self.chunks.append(record)
+
+        refetch = [c['status'] != 'stable' for c in self.chunks]
+        self.entrypoints = []
+        for name, mask in self.head.entrypoint_index().items():
+            total = stale = count = 0
+            for i in iter_bits(mask):
+                size = self.chunks[i]['gzip_size']
+                total += size
+                if refetch[i]:
+                    stale += size
+                    count += 1
+            self.entrypoints.append({
+                'entrypoint': name,
+                'initial_gzip': total,
+                'refetch_gzip': stale,
+                'refetch_chunks': count,
+                'refetch_ratio': round(stale / total, 4) if total else 0.0,
+            })
+        self.entrypoints.sort(key=lambda e: e['refetch_gzip'], reverse=True)
+
+    @staticmethod
+    def _triggers(base: Dict[str, List[int]], head: Dict[str, List[int]]) -> List[Dict[str, Any]]:
+        """Modules added, removed or resized between two paired chunks, largest first."""
+        triggers = []
+        for key, (parsed, gzip) in head.items():
+            old = base.get(key)
+            if old is None:
+                triggers.append({'module': key, 'status': 'added', 'parsed_delta': parsed,
+                                 'gzip_delta': gzip})
+            elif old[0] != parsed or old[1] != gzip:
+                triggers.append({'module': key, 'status': 'changed', 'parsed_delta': parsed - old[0],
+                                 'gzip_delta': gzip - old[1]})
+        for key, (parsed, gzip) in base.items():
+            if key not in head:
+                triggers.append({'module': key, 'status': 'removed', 'parsed_delta': -parsed,
+                                 'gzip_delta': -gzip})
+        triggers.sort(key=lambda t: abs(t['parsed_delta']), reverse=True)
+        return triggers
+
+    def print_report(self, top_n: int = 20) -> None:
+        """Print invalidated chunks with their triggers and per-entrypoint re-fetch bytes."""
+        fmt = self.base.format_size
+        delta = self.base.format_delta
+        counts = {status: sum(1 for c in self.chunks if c['status'] == status)
+                  for status in ('stable', 'invalidated', 'new')}
+        stale = sum(c['gzip_size'] for c in self.chunks if c['status'] != 'stable')
+        total = sum(c['gzip_size'] for c in self.chunks)
+
+        print("♻️  Cache Churn")
+        print("=" * 50)
+        print(f"Chunks: {counts['stable']} stable, {counts['invalidated']} invalidated, {counts['new']} new")
+        print(f"Re-fetched gzip bytes: {fmt(stale)} of {fmt(total)}")
+
+        if self.entrypoints:
+            print("\n🚪 Re-fetch per Entrypoint (returning visitor)")
+            print("=" * 90)
+            print(f"{'#':<3} {'Entrypoint':<50} {'Re-fetch':>10} {'Initial':>10} {'Share':>7} {'Chunks':>6}")
+            print("-" * 90)
+            for i, entry in enumerate(self.entrypoints[:top_n], 1):
+                name = entry['entrypoint']
+                if len(name) > 50:
+                    name = "..." + name[-47:]
+                print(f"{i:<3} {name:<50} {fmt(entry['refetch_gzip']):>10} "
+                      f"{fmt(entry['initial_gzip']):>10} {entry['refetch_ratio'] * 100:>6.1f}% "
+                      f"{entry['refetch_chunks']:>6}")
+
+        churned = sorted((c for c in self.chunks if c['status'] != 'stable'),
+                         key=lambda c: c['gzip_size'], reverse=True)
+        if churned:
+            print("\n🔥 Invalidated Chunks (by gzip size)")
+            print("=" * 90)
+            for i, chunk in enumerate(churned[:top_n], 1):
+                print(f"{i:<3} {chunk['chunk']} ({fmt(chunk['gzip_size'])}, {chunk['status']})")
+                if chunk['base_chunk'] and chunk['base_chunk'] != chunk['chunk']:
+                    print(f"      was {chunk['base_chunk']}")
+                if chunk['status'] == 'invalidated' and not chunk['triggers']:
+                    print("      no module size changed (module ids or content only)")
+                for trigger in chunk['triggers'][:5]:
+                    module = trigger['module']
+                    if len(module) > 60:
+                        module = "..." + module[-57:]
+                    print(f"      {trigger['status']:<8} {module:<60} {delta(trigger['parsed_delta']):>10}")
+                if len(chunk['triggers']) > 5:
+                    print(f"      ... and {len(chunk['triggers']) - 5} more")
+
+    def export(self, filename: str, top_n: int = 20) -> None:
+        """Export the churn report to a JSON file."""
+        results = {
+            'base': str(self.base.html_file),
+            'head': str(self.head.html_file),
+            'summary': {
+                'stable_chunks': sum(1 for c in self.chunks if c['status'] == 'stable'),
+                'invalidated_chunks': sum(1 for c in self.chunks if c['status'] == 'invalidated'),
+                'new_chunks': sum(1 for c in self.chunks if c['status'] == 'new'),
+                'refetch_gzip': sum(c['gzip_size'] for c in self.chunks if c['status'] != 'stable'),
+                'total_gzip': sum(c['gzip_size'] for c in self.chunks),
+            },
+            'entrypoints': self.entrypoints,
+            'chunks': [dict(c, triggers=c['triggers'][:top_n]) for c in self.chunks],
+        }
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+_SIZE_VALUE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([kmg]?)i?b?\s*$', re.IGNORECASE)
+
+
+def parse_size(value: Any) -> int:
+    """Parse a byte count given as a number or as text like ``170KB`` or ``1.5 MB``."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    match = _SIZE_VALUE.match(str(value))
+    if match is None:
+        raise ValueError(f"Invalid size '{value}'")
+    scale = {'': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}[match.group(2).lower()]
+    return int(float(match.group(1)) * scale)
+
+
+class BudgetGate:
+    """Size budgets over entrypoints, chunks, packages and categories.
+
+    A budgets file lists rules; each selects subjects of one kind with a
+    glob (or a ``re:`` regex) and limits their parsed, gzip, initial_parsed
+    or initial_gzip bytes, or the ``delta_`` of those against a baseline
+    report (in bytes or as a percentage)::
+
+        {"baseline": "reports/main.json",
+         "budgets": [
+            {"entrypoint": "app/*", "initial_gzip": "170KB", "delta_initial_gzip": "5%"},
+            {"chunk": "static/chunks/framework.js", "gzip": "60KB"},
+            {"package": "re:^@mui/", "parsed": "300KB", "severity": "warn"},
+            {"category": "UI Components", "gzip": "120KB", "total": true}]}
+
+    Chunks are matched by hash-insensitive name. Every limit applies to
+    each matched subject, or to their sum with ``"total": true``. The build
+    is aggregated into a per-kind index in one pass over the module table,
+    so each rule only matches names and compares numbers.
+
+    A rule that matches nothing fails the build unless its severity is
+    ``warn``, so a mistyped pattern cannot pass silently. Percentage deltas
+    of subjects absent from the baseline have no base to scale and are
+    reported as ``new`` instead of being checked.
+    """
+
+    KINDS = ('entrypoint', 'chunk', 'package', 'category')
+    METRICS = ('parsed', 'gzip', 'initial_parsed', 'initial_gzip')
+
+    def __init__(self, budgets: Dict[str, Any], base_dir: Optional[Path] = None):
+        self.rules = [self._compile(i, rule) for i, rule in enumerate(budgets.get('budgets', []))]
+        baseline = budgets.get('baseline')
+        self.baseline = str((base_dir or Path('.')) / baseline) if baseline else None
+
+    @classmethod
+    def from_file(cls, path: str) -> 'BudgetGate':
+        """Load budgets from a JSON file; a relative ``baseline`` is resolved next to it."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), Path(path).parent)
+
+    @classmethod
+    def _compile(cls, i: int, rule: Dict[str, Any]) -> Dict[str, Any]:
+        kinds = [kind for kind in cls.KINDS if kind in rule]
+        if len(kinds) != 1:
+            raise ValueError(f"Budget {i} needs exactly one of {', '.join(cls.KINDS)}")
+        kind = kinds[0]
+        pattern = rule[kind]
+        if pattern.startswith('re:'):
+            matcher = re.compile(pattern[3:]).search
+        else:
+            matcher = re.compile(fnmatch.translate(pattern)).match
+
+        limits = []
+        for name, value in rule.items():
+            if name in (kind, 'name', 'severity', 'total'):
+                continue
+            delta = name.startswith('delta_')
+            metric = name[len('delta_'):] if delta else name
+            if metric not in cls.METRICS:
+                raise ValueError(f"Unknown limit '{name}' in budget {i}")
+            percent = delta and isinstance(value, str) and value.strip().endswith('%')
+            limits.append((metric, delta, float(value.strip()[:-1]) if percent else parse_size(value), percent))
+        if not limits:
+            raise ValueError(f"Budget {i} sets no limits")
+
+        severity = rule.get('severity', 'error')
+        if severity not in ('error', 'warn'):
+            raise ValueError(f"Budget {i}: severity must be 'error' or 'warn'")
+        return {
+            'name': rule.get('name') or f"{kind} {pattern}",
+            'kind': kind,
+            'matches': matcher,
+            'limits': limits,
+            'severity': severity,
+            'total': bool(rule.get('total')),
+        }
+
+    @property
+    def needs_baseline(self) -> bool:
+        return any(delta for rule in self.rules for _, delta, _, _ in rule['limits'])
+
+    @classmethod
+    def index(cls, analyzer: 'BundleAnalyzer', kinds: Sequence[str],
+              categorizer: Optional[ModuleCategorizer] = None) -> Dict[str, Dict[str, List[int]]]:
+        """Aggregate a build into ``kind -> name -> [parsed, gzip, initial_parsed, initial_gzip]``.
+
+        Chunk sums come from the module table; packages and categories are
+        only aggregated (in a single pass over the rows) when a rule needs them.
+        """
+        table = analyzer.modules
+        chart = analyzer.chart_data
+        entrypoints = analyzer.entrypoint_index()
+        initial_chunks = 0
+        for mask in entrypoints.values():
+            initial_chunks |= mask
+
+        count = len(chart)
+        if len(table):
+            count = max(count, int(table.chunks.max() if np is not None else max(table.chunks)) + 1)
+        if np is not None:
+            chunk_parsed = np.bincount(table.chunks, weights=table.parsed, minlength=count).astype(np.int64).tolist()
+            chunk_gzip = np.bincount(table.chunks, weights=table.gzip, minlength=count).astype(np.int64).tolist()
+        else:
+            chunk_parsed, chunk_gzip = [0] * count, [0] * count
+            for chunk, parsed, gzip in zip(table.chunks, table.parsed, table.gzip):
+                chunk_parsed[chunk] += parsed
+                chunk_gzip[chunk] += gzip
+
+        index: Dict[str, Dict[str, List[int]]] = {kind: {} for kind in cls.KINDS}
+        for i in range(count):
+            label = chart[i].get('label', 'unknown') if i < len(chart) else 'unknown'
+            initial = initial_chunks >> i & 1
+            sizes = index['chunk'].setdefault(normalize_chunk_name(label), [0, 0, 0, 0])
+            sizes[0] += chunk_parsed[i]
+            sizes[1] += chunk_gzip[i]
+            sizes[2] += chunk_parsed[i] * initial
+            sizes[3] += chunk_gzip[i] * initial
+        for entrypoint, mask in entrypoints.items():
+            parsed = sum(chunk_parsed[i] for i in iter_bits(mask) if i < count)
+            gzip = sum(chunk_gzip[i] for i in iter_bits(mask) if i < count)
+            index['entrypoint'][entrypoint] = [parsed, gzip, parsed, gzip]
+
+        if 'package' in kinds or 'category' in kinds:
+            categorize = (categorizer or analyzer.categorizer).categorize if 'category' in kinds else None
+            # Rows are labelled with package/category ids, then summed per id
+            package_ids: Dict[Optional[str], int] = {}
+            category_ids: Dict[str, int] = {}
+            package_categories: List[int] = []
+            row_packages: List[int] = []
+            row_categories: List[int] = []
+            for key, (package, _) in zip(table.module_keys(), table.package_paths()):
+                package_id = package_ids.get(package)
+                if package_id is None:
+                    package_id = package_ids[package] = len(package_ids)
+                    # Packages always fall into the same category
+                    package_categories.append(-1)
+                    if package is not None and categorize is not None:
+                        package_categories[package_id] = category_ids.setdefault(
+                            categorize(key), len(category_ids))
+                row_packages.append(package_id)
+                if categorize is not None:
+                    category_id = package_categories[package_id]
+                    if category_id < 0:
+                        category_id = category_ids.setdefault(categorize(key), len(category_ids))
+                    row_categories.append(category_id)
+
+            initial = [initial_chunks >> i & 1 for i in range(count)]
+            for kind, ids, row_ids in (('package', package_ids, row_packages),
+                                       ('category', category_ids, row_categories)):
+                if kind not in kinds:
+                    continue
+                totals = cls._sum_by_id(row_ids, len(ids), table, initial)
+                for name, i in ids.items():
+                    if name is not None:
+                        index[kind][name] = totals[i]
+        return index
+
+    @staticmethod
+    def _sum_by_id(row_ids: List[int], count: int, table: ModuleTable,
+                   initial: List[int]) -> List[List[int]]:
+        """Sum ``[parsed, gzip, initial_parsed, initial_gzip]`` of rows per id."""
+        if np is not None:
+            ids = np.array(row_ids, dtype=np.int64)
+            row_initial = np.array(initial, dtype=bool)[table.chunks]
+            columns = [np.bincount(ids, weights=values, minlength=count).astype(np.int64)
+                       for values in (table.parsed, table.gzip,
+                                      np.where(row_initial, table.parsed, 0),
+                                      np.where(row_initial, table.gzip, 0))]
+            return np.stack(columns, axis=1).tolist()
+
+        totals = [[0, 0, 0, 0] for _ in range(count)]
+        for i, chunk, parsed, gzip in zip(row_ids, table.chunks, table.parsed, table.gzip):
+            sizes = totals[i]
+            sizes[0] += parsed
+            sizes[1] += gzip
+            if initial[chunk]:
+                sizes[2] += parsed
+                sizes[3] += gzip
+        return totals
+
+    def evaluate(self, analyzer: 'BundleAnalyzer',
+                 baseline: Optional['BundleAnalyzer'] = None) -> Dict[str, Any]:
+        """Check every rule and return the verdict as a JSON-serializable dict."""
+        kinds = {rule['kind'] for rule in self.rules}
+        current = self.index(analyzer, kinds)
+        base = self.index(baseline, kinds, analyzer.categorizer) if baseline is not None else None
+
+        results = []
+        unmatched = []
+        unmatched_errors = 0
+        skipped = 0
+        for rule in self.rules:
+            sizes = current[rule['kind']]
+            names = [name for name in sizes if rule['matches'](name)]
+            if not names:
+                unmatched.append(rule['name'])
+                unmatched_errors += rule['severity'] == 'error'
+                continue
+
+            if rule['total']:
+                subjects = [(rule['name'], names)]
+            else:
+                subjects = [(name, [name]) for name in names]
+            for subject, members in subjects:
+                for metric, delta, limit, percent in rule['limits']:
+                    column = self.METRICS.index(metric)
+                    actual = sum(sizes[name][column] for name in members)
+                    check = {
+                        'budget': rule['name'],
+                        'kind': rule['kind'],
+                        'subject': subject,
+                        'metric': f"delta_{metric}" if delta else metric,
+                        'actual': actual,
+                    }
+                    if delta:
+                        if base is None:
+                            skipped += 1
+                            continue
+                        base_sizes = base[rule['kind']]
+                        base_names = ([name for name in base_sizes if rule['matches'](name)]
+                                      if rule['total'] else members)
+                        present = [name for name in base_names if name in base_sizes]
+                        before = sum(base_sizes[name][column] for name in present)
+                        if percent and not present:
+                            check.update(baseline=None, limit=None, limit_percent=limit, status='new')
+                            results.append(check)
+                            continue
+                        allowed = int(before * limit / 100) if percent else limit
+                        check.update(baseline=before, actual=actual - before, limit=allowed)
+                        if percent:
+                            check['limit_percent'] = limit
+                    else:
+                        check['limit'] = limit
+                    if check['actual'] <= check['limit']:
+                        check['status'] = 'pass'
+                    else:
+                        check['status'] = 'fail' if rule['severity'] == 'error' else 'warn'
+                    results.append(check)
+
+        failed = sum(1 for check in results if check['status'] == 'fail')
+        return {
+            'passed': failed == 0 and unmatched_errors == 0,
+            'summary': {
+                'budgets': len(self.rules),
+                'checks': len(results),
+                'failed': failed,
+                'warnings': sum(1 for check in results if check['status'] == 'warn'),
+                'new': sum(1 for check in results if check['status'] == 'new'),
+                'skipped_delta_checks': skipped,
+                'unmatched_budgets': len(unmatched),
+                'unmatched_errors': unmatched_errors,
+            },
+            'checks': results,
+            'unmatched': unmatched,
+        }
+
+    def combine(self, verdicts: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Merge per-target verdicts into one verdict for the whole build.
+
+        Checks are tagged with their ``target``; a rule is unmatched only if
+        it matched nothing in every target.
+        """
+        checks = [dict(check, target=target) for target, verdict in verdicts.items()
+                  for check in verdict['checks']]
+        unmatched = [rule for rule in self.rules
+                     if all(rule['name'] in verdict['unmatched'] for verdict in verdicts.values())]
+        unmatched_errors = sum(1 for rule in unmatched if rule['severity'] == 'error')
+        failed = sum(1 for check in checks if check['status'] == 'fail')
+        return {
+            'passed': failed == 0 and unmatched_errors == 0,
+            'targets': list(verdicts),
+            'summary': {
+                'budgets': len(self.rules),
+                'checks': len(checks),
+                'failed': failed,
+                'warnings': sum(1 for check in checks if check['status'] == 'warn'),
+                'new': sum(1 for check in checks if check['status'] == 'new'),
+                'skipped_delta_checks': sum(v['summary']['skipped_delta_checks'] for v in verdicts.values()),
+                'unmatched_budgets': len(unmatched),
+                'unmatched_errors': unmatched_errors,
+            },
+            'checks': checks,
+            'unmatched': [rule['name'] for rule in unmatched],
+        }
+
+    @staticmethod
+    def print_report(verdict: Dict[str, Any], formatter: 'BundleAnalyzer', top_n: int = 20) -> None:
+        """Print failing and warning checks, then the overall verdict."""
+        summary = verdict['summary']
+        print("\n🚦 Performance Budgets")
+        print("=" * 80)
+
+        over = [check for check in verdict['checks'] if check['status'] in ('fail', 'warn')]
+        over.sort(key=lambda c: (c['status'] != 'fail', c['limit'] - c['actual']))
+        for check in over[:top_n]:
+            icon = '❌' if check['status'] == 'fail' else '⚠️ '
+            size = formatter.format_delta if check['metric'].startswith('delta_') else formatter.format_size
+            if 'limit_percent' in check:
+                limit = f"{check['limit_percent']:g}%"
+            else:
+                limit = formatter.format_size(check['limit'])
+            subject = f"{check['target']}:{check['subject']}" if 'target' in check else check['subject']
+            if len(subject) > 40:
+                subject = "..." + subject[-37:]
+            print(f"{icon} {check['kind']:<10} {subject:<40} {check['metric']:<20} "
+                  f"{size(check['actual'])} > {limit}")
+        if len(over) > top_n:
+            print(f"   ... and {len(over) - top_n} more")
+        for name in verdict['unmatched']:
+            print(f"⚠️  Budget '{name}' matched nothing")
+        if summary['new']:
+            print(f"ℹ️  {summary['new']} percentage delta checks skipped: subject not in the baseline")
+        if summary['skipped_delta_checks']:
+            print(f"⚠️  {summary['skipped_delta_checks']} delta checks skipped: no baseline report "
+                  f"(--budget-baseline)")
+
+        if verdict['passed']:
+            print(f"✅ Budgets passed: {summary['checks']} checks, {summary['warnings']} warnings")
+        elif summary['unmatched_errors']:
+            print(f"❌ Budgets failed: {summary['failed']} of {summary['checks']} checks, "
+                  f"{summary['unmatched_errors']} error budgets matched nothing")
+        else:
+            print(f"❌ Budgets failed: {summary['failed']} of {summary['checks']} checks")
+
+
+def _load_target(path: str, build_dir: Optional[str], streaming: bool,
+                 cache_dir: Optional[str], cache_size: int
+                 ) -> Optional[Tuple[bytes, List[str], array, float, Optional[str]]]:
+    """Parse and flatten one report in a worker process for :class:`TargetSet`.
+
+    Returns the frozen table packed like a parse cache entry, the module key
+    index (keys plus a flat ``[parsed, gzip, stat, count]`` column), the
+    seconds spent and the export's ``analysis_timestamp``, or None if the
+    report cannot be read.
+    """
+    start = time.perf_counter()
+    analyzer = BundleAnalyzer(path, build_dir)
+    if cache_dir:
+        analyzer.parse_cache = ParseCache(Path(cache_dir), cache_size)
+    if not analyzer.extract_chart_data(streaming=streaming):
+        return None
+    analyzer.analyze_modules()
+    blob = ParseCache.serialize(analyzer)
+    if blob is None:
+        return None
+    index = analyzer.modules.key_index()
+    sizes = array('q', [value for entry in index.values() for value in entry])
+    return blob, list(index), sizes, time.perf_counter() - start, analyzer.analysis_timestamp
+
+
+class TargetSet:
+    """The reports of one build (``client``, ``nodejs``, ``edge``) analyzed together.
+
+    Each report is parsed and flattened in its own worker process, largest
+    first, so the wall time approaches that of the largest report. Workers
+    send back the frozen table in the parse cache format plus their module
+    key index, which leaves only deserialization and the merge to the parent.
+    The merged index maps every hash-insensitive module key to its
+    ``[parsed, gzip, stat, count]`` sizes per target.
+    """
+
+    def __init__(self, inputs: Sequence[str], build_dir: Optional[str] = None):
+        self.reports = self.discover(inputs)
+        self.build_dir = build_dir
+        self.analyzers: Dict[str, BundleAnalyzer] = {}
+        self.seconds: Dict[str, float] = {}
+        self.index: Dict[str, Dict[str, List[int]]] = {}
+        self.wall_seconds = 0.0
+        self.profiler = PhaseProfiler(enabled=False)
+
+    @staticmethod
+    def discover(inputs: Sequence[str]) -> Dict[str, Path]:
+        """Map target names (report file stems) to reports; directories contribute their ``*.html``."""
+        paths: List[Path] = []
+        for item in inputs:
+            path = Path(item)
+            paths.extend(sorted(path.glob('*.html')) if path.is_dir() else [path])
+
+        reports: Dict[str, Path] = {}
+        for path in paths:
+            name = path.stem
+            if name in reports:
+                name = f"{path.parent.name}/{path.stem}"
+            reports[name] = path
+        return reports
+
+    def load(self, streaming: bool = False, parse_cache: Optional[ParseCache] = None,
+             workers: Optional[int] = None) -> bool:
+        """Parse every report concurrently; False if none could be loaded."""
+        names = sorted(self.reports, key=lambda name: self.reports[name].stat().st_size
+                       if self.reports[name].is_file() else 0, reverse=True)
+        cache_args = (str(parse_cache.directory), parse_cache.max_bytes) if parse_cache else (None, 0)
+        jobs = [(str(self.reports[name]), self.build_dir, streaming) + cache_args for name in names]
+        workers = min(len(jobs), workers or os.cpu_count() or 1)
+
+        start = time.perf_counter()
+        with self.profiler.phase('targets.parse', len(jobs)):
+            if workers <= 1:
+                results = [_load_target(*job) for job in jobs]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    results = list(pool.map(_load_target, *zip(*jobs)))
+
+        with self.profiler.phase('targets.merge') as record:
+            for name, result in zip(names, results):
+                if result is None:
+                    print(f"Warning: skipping target {name} ({self.reports[name]})")
+                    continue
+                blob, keys, sizes, seconds, _ = result
+                analyzer = BundleAnalyzer(str(self.reports[name]), self.build_dir)
+                ParseCache.deserialize(blob, analyzer)
+                self.analyzers[name] = analyzer
+                self.seconds[name] = seconds
+                for i, key in enumerate(keys):
+                    self.index.setdefault(key, {})[name] = sizes[i * 4:i * 4 + 4].tolist()
+            record['items'] = len(self.index)
+        self.wall_seconds = time.perf_counter() - start
+        return bool(self.analyzers)
+
+    def _matches(self, key: str, filter_type: str) -> bool:
+        if filter_type == 'node_modules':
+            return package_name(key) is not None
+        if filter_type == 'local':
+            return package_name(key) is None
+        return True
+
+    def top_modules(self, top_n: int = 20, min_size_kb: int = 0,
+                    filter_type: str = 'all') -> List[Tuple[str, Dict[str, List[int]]]]:
+        """Module keys with the most parsed bytes summed over all targets."""
+        min_size = min_size_kb * 1024
+        candidates = ((key, sizes) for key, sizes in self.index.items()
+                      if self._matches(key, filter_type)
+                      and max(entry[0] for entry in sizes.values()) >= min_size)
+        return heapq.nlargest(top_n, candidates, key=lambda item: sum(e[0] for e in item[1].values()))
+
+    def shared_modules(self) -> List[Tuple[str, Dict[str, List[int]]]]:
+        """Modules present in more than one target, by parsed bytes over all targets."""
+        shared = [(key, sizes) for key, sizes in self.index.items() if len(sizes) > 1]
+        shared.sort(key=lambda item: sum(e[0] for e in item[1].values()), reverse=True)
+        return shared
+
+    def overlaps(self) -> List[Dict[str, Any]]:
+        """Per pair of targets: shared module count and the bytes each side carries."""
+        names = list(self.analyzers)
+        pairs: Dict[Tuple[str, str], List[int]] = {}
+        for _, sizes in self.shared_modules():
+            present = [name for name in names if name in sizes]
+            for i, a in enumerate(present):
+                for b in present[i + 1:]:
+                    entry = pairs.setdefault((a, b), [0, 0, 0])
+                    entry[0] += 1
+                    entry[1] += sizes[a][0]
+                    entry[2] += sizes[b][0]
+        return [{'targets': [a, b], 'modules': count, 'parsed': {a: parsed_a, b: parsed_b}}
+                for (a, b), (count, parsed_a, parsed_b) in
+                sorted(pairs.items(), key=lambda item: item[1][1] + item[1][2], reverse=True)]
+
+    def summary(self) -> List[Dict[str, Any]]:
+        return [{
+            'target': name,
+            'report': str(self.reports[name]),
+            'modules': len(analyzer.modules),
+            'parsed': analyzer.modules.total('parsed'),
+            'gzip': analyzer.modules.total('gzip'),
+            'stat': analyzer.modules.total('stat'),
+            'seconds': round(self.seconds[name], 3),
+        } for name, analyzer in self.analyzers.items()]
+
+    def print_report(self, top_n: int = 20, min_size_kb: int = 0, filter_type: str = 'all') -> None:
+        """Print per-target totals, the hottest modules per target and cross-target modules."""
+        fmt = next(iter(self.analyzers.values())).format_size
+        names = list(self.analyzers)
+        column = max(10, *(len(name) + 1 for name in names))
+
+        print("🎯 Targets")
+        print("=" * 80)
+        print(f"{'Target':<16} {'Modules':>9} {'Parsed':>12} {'Gzip':>12} {'Parse time':>12}")
+        print("-" * 80)
+        for row in self.summary():
+            print(f"{row['target']:<16} {row['modules']:>9} {fmt(row['parsed']):>12} "
+                  f"{fmt(row['gzip']):>12} {row['seconds']:>11.2f}s")
+        print(f"Wall time: {self.wall_seconds:.2f}s (targets summed: {sum(self.seconds.values()):.2f}s)")
+
+        width = 44
+        header = ''.join(f"{name:>{column}}" for name in names)
+        print(f"\n🔥 Hot Modules Across Targets (parsed size, > {min_size_kb}KB, filtered: {filter_type})")
+        print("=" * (4 + width + column * len(names)))
+        print(f"{'#':<3} {'Module':<{width}}{header}")
+        for i, (key, sizes) in enumerate(self.top_modules(top_n, min_size_kb, filter_type), 1):
+            self._print_row(i, key, sizes, names, width, column, fmt)
+
+        shared = self.shared_modules()
+        print(f"\n🔁 Modules in More Than One Target ({len(shared)})")
+        print("=" * (4 + width + column * len(names)))
+        if not shared:
+            print("No module appears in more than one target")
+            return
+        for pair in self.overlaps():
+            a, b = pair['targets']
+            print(f"{a} & {b}: {pair['modules']} modules, {fmt(pair['parsed'][a])} in {a}, "
+                  f"{fmt(pair['parsed'][b])} in {b}")
+        print(f"\n{'#':<3} {'Module':<{width}}{header}")
+        for i, (key, sizes) in enumerate(shared[:top_n], 1):
+            self._print_row(i, key, sizes, names, width, column, fmt)
+
+    @staticmethod
+    def _print_row(i: int, key: str, sizes: Dict[str, List[int]], names: List[str],
+                   width: int, column: int, fmt: Any) -> None:
+        if len(key) > width - 1:
+            key = "..." + key[-(width - 4):]
+        cells = ''.join(f"{fmt(sizes[name][0]) if name in sizes else '-':>{column}}" for name in names)
+        print(f"{i:<3} {key:<{width}}{cells}")
+
+    def to_dict(self, top_n: int = 20, min_size_kb: int = 0, filter_type: str = 'all') -> Dict[str, Any]:
+        def module(key: str, sizes: Dict[str, List[int]]) -> Dict[str, Any]:
+            return {'module': key, 'targets': {name: {'parsed': entry[0], 'gzip': entry[1], 'stat': entry[2],
+                                                      'copies': entry[3]}
+                                               for name, entry in sizes.items()}}
+
+        return {
+            'targets': self.summary(),
+            'wall_seconds': round(self.wall_seconds, 3),
+            'top_modules': [module(*item) for item in self.top_modules(top_n, min_size_kb, filter_type)],
+            'overlaps': self.overlaps(),
+            'shared_modules': [module(*item) for item in self.shared_modules()],
+        }
+
+    def export(self, filename: str, top_n: int = 20, min_size_kb: int = 0, filter_type: str = 'all') -> None:
+        """Export per-target totals, top modules and every cross-target module to JSON."""
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(top_n, min_size_kb, filter_type), f, indent=2, ensure_ascii=False)
+
+
+class HistoryStore:
+    """Local SQLite history of analyzed builds.
+
+    One ``builds`` row per build, commit and target, plus per-build module,
+    package and chunk sizes. Module keys are interned into ``modules``
+    (indexed by key and by package), and every size table is keyed by
+    ``(item, build_id)`` without a rowid, so the history of one package,
+    module or chunk is a single index range scan regardless of how many
+    builds are stored. Builds are ordered by ``created_at``, then by
+    insertion order.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS builds (
+            id INTEGER PRIMARY KEY,
+            build TEXT NOT NULL,
+            commit_sha TEXT,
+            target TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            report TEXT,
+            digest TEXT,
+            modules INTEGER NOT NULL,
+            parsed INTEGER NOT NULL,
+            gzip INTEGER NOT NULL,
+            stat INTEGER NOT NULL,
+            UNIQUE (build, target)
+        );
+        CREATE INDEX IF NOT EXISTS builds_by_target ON builds (target, created_at);
+        CREATE INDEX IF NOT EXISTS builds_by_digest ON builds (digest);
+        CREATE TABLE IF NOT EXISTS modules (
+            id INTEGER PRIMARY KEY,
+            key TEXT NOT NULL UNIQUE,
+            package TEXT
+        );
+        CREATE INDEX IF NOT EXISTS modules_by_package ON modules (package);
+        CREATE TABLE IF NOT EXISTS module_sizes (
+            module_id INTEGER NOT NULL,
+            build_id INTEGER NOT NULL,
+            parsed INTEGER NOT NULL,
+            gzip INTEGER NOT NULL,
+            stat INTEGER NOT NULL,
+            copies INTEGER NOT NULL,
+            PRIMARY KEY (module_id, build_id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS package_sizes (
+            package TEXT NOT NULL,
+            build_id INTEGER NOT NULL,
+            parsed INTEGER NOT NULL,
+            gzip INTEGER NOT NULL,
+            stat INTEGER NOT NULL,
+            modules INTEGER NOT NULL,
+            PRIMARY KEY (package, build_id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS chunk_sizes (
+            chunk TEXT NOT NULL,
+            build_id INTEGER NOT NULL,
+            label TEXT NOT NULL,
+            parsed INTEGER NOT NULL,
+            gzip INTEGER NOT NULL,
+            stat INTEGER NOT NULL,
+            PRIMARY KEY (chunk, build_id)
+        ) WITHOUT ROWID;
+    """
+
+    # The last N builds of a target, joined against one size table by (item, build_id)
+    RECENT_BUILDS = ('SELECT id, build, commit_sha, created_at FROM builds WHERE target = ? '
+                     'ORDER BY created_at DESC, id DESC LIMIT ?')
+    # Report files a backfill picks up
+    REPORT_SUFFIXES = ('.html', '.json', '.ahm')
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(self.SCHEMA)
+        self._module_ids: Optional[Dict[str, int]] = None
+
+    def close(self) -> None:
+        self.db.close()
+
+    def module_ids(self) -> Dict[str, int]:
+        if self._module_ids is None:
+            self._module_ids = {key: i for i, key in self.db.execute('SELECT id, key FROM modules')}
+        return self._module_ids
+
+    def has_report(self, digest: str, target: str) -> bool:
+        return self.db.execute('SELECT 1 FROM builds WHERE digest = ? AND target = ?',
+                               (digest, target)).fetchone() is not None
+
+    def record(self, build: str, target: str, analyzer: BundleAnalyzer,
+               index: Optional[Dict[str, List[int]]] = None, commit: Optional[str] = None,
+               created_at: Optional[str] = None, digest: Optional[str] = None) -> Optional[int]:
+        """Insert one analyzed build/target; returns its id, or None if already stored.
+
+        Runs inside the caller's transaction when there is one, so a backfill
+        commits all of its builds at once.
+        """
+        table = analyzer.modules
+        index = index if index is not None else table.key_index()
+        cursor = self.db.execute(
+            'INSERT OR IGNORE INTO builds (build, commit_sha, target, created_at, report, digest,'
+            ' modules, parsed, gzip, stat) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (build, commit, target, created_at or utc_timestamp(), str(analyzer.html_file), digest,
+             len(table), table.total('parsed'), table.total('gzip'), table.total('stat')))
+        if not cursor.rowcount:
+            return None
+        build_id = cursor.lastrowid
+
+        # Module ids are dense and assigned here, so new keys continue from len(ids)
+        ids = self.module_ids()
+        new_modules = []
+        for key in index:
+            if key not in ids:
+                ids[key] = len(ids) + 1
+                new_modules.append((ids[key], key, package_name(key)))
+        self.db.executemany('INSERT INTO modules (id, key, package) VALUES (?, ?, ?)', new_modules)
+
+        self.db.executemany(
+            'INSERT INTO module_sizes (module_id, build_id, parsed, gzip, stat, copies) VALUES (?, ?, ?, ?, ?, ?)',
+            [(ids[key], build_id, *entry) for key, entry in index.items()])
+        self.db.executemany(
+            'INSERT INTO package_sizes (package, build_id, parsed, gzip, stat, modules) VALUES (?, ?, ?, ?, ?, ?)',
+            [(package, build_id, *entry) for package, entry in BundleDiff._package_index(index).items()])
+
+        chunks: Dict[str, List[Any]] = {}
+        for chunk in analyzer.chart_data:
+            label = chunk.get('label', '')
+            entry = chunks.setdefault(normalize_chunk_name(label), [label, 0, 0, 0])
+            entry[1] += chunk.get('parsedSize') or 0
+            entry[2] += chunk.get('gzipSize') or 0
+            entry[3] += chunk.get('statSize') or 0
+        self.db.executemany(
+            'INSERT INTO chunk_sizes (chunk, build_id, label, parsed, gzip, stat) VALUES (?, ?, ?, ?, ?, ?)',
+            [(name, build_id, *entry) for name, entry in chunks.items()])
+        return build_id
+
+    @classmethod
+    def discover(cls, directory: Path) -> List[Tuple[str, str, Path]]:
+        """Find past reports as ``(build, target, path)``.
+
+        Reports in subdirectories belong to the build named by the first
+        directory below ``directory`` and are targets named by their file
+        stem (``builds/<sha>/.next/analyze/edge.html``); reports directly in
+        ``directory`` are builds of their own, for the client target.
+        """
+        found = []
+        for path in sorted(directory.rglob('*')):
+            if path.suffix not in cls.REPORT_SUFFIXES or not path.is_file():
+                continue
+            relative = path.relative_to(directory)
+            if len(relative.parts) > 1:
+                found.append((relative.parts[0], path.stem, path))
+            else:
+                found.append((path.stem, 'client', path))
+        return found
+
+    def backfill(self, directory: Path, workers: Optional[int] = None,
+                 streaming: bool = False) -> int:
+        """Ingest every report under ``directory``; returns the number of builds added.
+
+        Reports already stored (same content hash and target) are skipped.
+        The rest are parsed in a process pool and inserted in bulk as they
+        arrive, all inside one transaction.
+
+        A build's ``created_at`` is the ``analysis_timestamp`` of an
+        ``--export`` report, else the committer date of a build named by a
+        commit known to the git repository in the working directory, else
+        the report's mtime. Reports restored from git or CI artifacts share
+        one mtime, so builds that fall back to it keep discovery order
+        (build directory name).
+        """
+        pending = []
+        for build, target, path in self.discover(directory):
+            digest = file_digest(path)
+            if not self.has_report(digest, target):
+                pending.append((build, target, path, digest))
+        if not pending:
+            return 0
+
+        jobs = [(str(path), None, streaming, None, 0) for _, _, path, _ in pending]
+        workers = min(len(jobs), workers or os.cpu_count() or 1)
+        with contextlib.ExitStack() as stack:
+            if workers > 1:
+                pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+                results = pool.map(_load_target, *zip(*jobs))
+            else:
+                results = (_load_target(*job) for job in jobs)
+
+            dates = commit_dates([build for build, _, _, _ in pending if _COMMIT_SHA.match(build)])
+            try:
+                with self.db:
+                    added = self._ingest(pending, results, dates)
+            except BaseException:
+                self._module_ids = None  # ids handed out in the rolled back transaction
+                raise
+        return added
+
+    def _ingest(self, pending: List[Tuple[str, str, Path, str]], results: Iterator[Any],
+                commit_dates: Dict[str, str]) -> int:
+        added = 0
+        for (build, target, path, digest), result in zip(pending, results):
+            if result is None:
+                print(f"Warning: skipping unreadable report {path}")
+                continue
+            blob, keys, sizes, _, timestamp = result
+            analyzer = BundleAnalyzer(str(path))
+            ParseCache.deserialize(blob, analyzer)
+            index = {key: sizes[i * 4:i * 4 + 4].tolist() for i, key in enumerate(keys)}
+            commit = build if _COMMIT_SHA.match(build) else None
+            created_at = timestamp or commit_dates.get(build) or utc_timestamp(path.stat().st_mtime)
+            if self.record(build, target, analyzer, index, commit, created_at, digest) is not None:
+                added += 1
+        return added
+
+    def package_trend(self, package: str, target: str = 'client', builds: int = 200) -> List[Dict[str, Any]]:
+        """Sizes of ``package`` over the last ``builds`` builds of ``target``, oldest first."""
+        rows = self.db.execute(
+            f"SELECT b.build, b.commit_sha, b.created_at, p.parsed, p.gzip FROM ({self.RECENT_BUILDS}) b "
+            "LEFT JOIN package_sizes p ON p.package = ? AND p.build_id = b.id "
+            "ORDER BY b.created_at, b.id", (target, builds, package)).fetchall()
+        return self._trend(rows)
+
+    def module_trend(self, key: str, target: str = 'client', builds: int = 200) -> List[Dict[str, Any]]:
+        """Sizes of one module key over the last ``builds`` builds of ``target``, oldest first."""
+        row = self.db.execute('SELECT id FROM modules WHERE key = ?', (normalize_module_path(key),)).fetchone()
+        rows = self.db.execute(
+            f"SELECT b.build, b.commit_sha, b.created_at, m.parsed, m.gzip FROM ({self.RECENT_BUILDS}) b "
+            "LEFT JOIN module_sizes m ON m.module_id = ? AND m.build_id = b.id "
+            "ORDER BY b.created_at, b.id", (target, builds, row[0] if row else -1)).fetchall()
+        return self._trend(rows)
+
+    @staticmethod
+    def _trend(rows: List[Tuple]) -> List[Dict[str, Any]]:
+        return [{'build': build, 'commit': commit, 'created_at': created_at,
+                 'parsed': parsed or 0, 'gzip': gzip or 0}
+                for build, commit, created_at, parsed, gzip in rows]
+
+    def first_crossing(self, chunk: str, threshold: int, metric: str = 'gzip',
+                       target: str = 'client') -> Optional[Dict[str, Any]]:
+        """The first build where ``chunk`` reached ``threshold`` bytes, with the build before it."""
+        column = 'gzip' if metric == 'gzip' else 'parsed'
+        select = (f"SELECT b.build, b.commit_sha, b.created_at, c.label, c.{column} "
+                  "FROM chunk_sizes c JOIN builds b ON b.id = c.build_id WHERE c.chunk = ? AND b.target = ? ")
+        fields = ('build', 'commit', 'created_at', 'label', 'size')
+        chunk = normalize_chunk_name(chunk)
+        row = self.db.execute(select + f"AND c.{column} >= ? ORDER BY b.created_at, b.id LIMIT 1",
+                              (chunk, target, threshold)).fetchone()
+        if row is None:
+            return None
+        result = dict(zip(fields, row))
+        previous = self.db.execute(select + "AND b.created_at < ? ORDER BY b.created_at DESC, b.id DESC LIMIT 1",
+                                   (chunk, target, result['created_at'])).fetchone()
+        result['previous'] = dict(zip(fields, previous)) if previous else None
+        return result
+
+
+class IncrementalReport:
+    """A watched bundle analyzer report that is re-indexed chunk by chunk.
+
+    Every top-level chart node is remembered with the BLAKE2b hash and byte
+    length of its JSON text and the table rows it flattened to. On refresh,
+    the bytes at the same position in the new file are hashed first: a
+    match skips decoding and copies the previous rows, and only chunks that
+    changed are decoded and flattened again. Moved chunks are recognized by
+    hash as well. The trie is shared with the previous build (so a diff
+    against it stays valid) and rebuilt from scratch once more rows have
+    been re-flattened than the table holds.
+    """
+
+    def __init__(self, html_file: Path, build_dir: Optional[str] = None):
+        self.html_file = Path(html_file)
+        self.name = self.html_file.stem
+        self.build_dir = build_dir
+        self.current: Optional[BundleAnalyzer] = None
+        self.previous: Optional[BundleAnalyzer] = None
+        # Guards current/previous/last_refresh against readers on other threads
+        self.lock = threading.Lock()
+        # (digest, byte length, first row, end row, chunk header, [(row offset, extras)])
+        self._chunks: List[Tuple[bytes, int, int, int, Dict[str, Any], List[Tuple[int, Any]]]] = []
+        self._stale_rows = 0
+        self.last_refresh: Dict[str, Any] = {}
+
+    @staticmethod
+    def _digest(data: bytes) -> bytes:
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def refresh(self) -> bool:
+        """Re-read the report, reusing the rows of unchanged chunks."""
+        started = time.perf_counter()
+        old = self.current
+        full = old is None or self._stale_rows > len(old.modules)
+        expected = [] if full else self._chunks
+        by_digest = {} if full else {record[0]: record for record in self._chunks}
+
+        analyzer = BundleAnalyzer(str(self.html_file), self.build_dir)
+        table = analyzer.modules = ModuleTable(ModuleTrie() if full else old.modules.trie)
+        chunks = []
+        reused = flattened = 0
+
+        try:
+            with open(self.html_file, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                start = find_chart_data(mm)
+                if start < 0:
+                    print(f"Error: Could not find chartData in {self.html_file}")
+                    return False
+                reader = JsonStreamReader(mm)
+                pos = reader.skip_ws(start + 1)
+                index = 0
+                while mm[pos:pos + 1] != b']':
+                    # Cheap check first: same bytes at the same ordinal position
+                    end = digest = None
+                    if index < len(expected):
+                        candidate = expected[index]
+                        stop = pos + candidate[1]
+                        if mm[reader.skip_ws(stop):reader.skip_ws(stop) + 1] in (b',', b']') \
+                                and self._digest(mm[pos:stop]) == candidate[0]:
+                            end, digest = stop, candidate[0]
+                    if end is None:
+                        end = reader.skip_value(pos)
+                        digest = self._digest(mm[pos:end])
+
+                    row = len(table)
+                    source = by_digest.get(digest)
+                    if source is not None:
+                        header, extras = source[4], source[5]
+                        self._copy_rows(old.modules, table, source[2], source[3], index)
+                        for offset, value in extras:
+                            table.extras[row + offset] = value
+                        reused += 1
+                    else:
+                        header = json.loads(mm[pos:end])
+                        analyzer.flatten_modules([header], first_chunk=index)
+                        header.pop('groups', None)
+                        extras = [(r - row, table.extras[r]) for r in range(row, len(table))
+                                  if r in table.extras]
+                        flattened += 1
+                        self._stale_rows += len(table) - row
+                    analyzer.chart_data.append(header)
+                    chunks.append((digest, end - pos, row, len(table), header, extras))
+
+                    index += 1
+                    pos = reader.skip_ws(end)
+                    if mm[pos:pos + 1] == b',':
+                        pos = reader.skip_ws(pos + 1)
+                    elif mm[pos:pos + 1] != b']':
+                        raise json.JSONDecodeError("Expecting ',' delimiter", '', pos)
+        except (OSError, ValueError) as e:
+            print(f"Error reading {self.html_file}: {e}")
+            return False
+
+        if full:
+            self._stale_rows = 0
+        analyzer._modules_flattened = True
+        analyzer.analyze_modules()
+
+        self._chunks = chunks
+        last_refresh = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'seconds': round(time.perf_counter() - started, 4),
+            'chunks_reused': reused,
+            'chunks_parsed': flattened,
+            'modules': len(table),
+            'full': full,
+        }
+        with self.lock:
+            self.previous, self.current = old, analyzer
+            self.last_refresh = last_refresh
+        return True
+
+    def snapshot(self) -> Tuple[Optional[BundleAnalyzer], Optional[BundleAnalyzer], Dict[str, Any]]:
+        """Return ``(current, previous, last_refresh)`` as published by one refresh."""
+        with self.lock:
+            return self.current, self.previous, self.last_refresh
+
+    @staticmethod
+    def _copy_rows(source: ModuleTable, table: ModuleTable, start: int, end: int, chunk: int) -> None:
+        """Append rows ``start:end`` of ``source`` to ``table`` under chunk index ``chunk``."""
+        for name in ('stat', 'parsed', 'gzip', 'nodes'):
+            getattr(table, name).frombytes(getattr(source, name)[start:end].tobytes())
+        table.chunks.frombytes(array(table.chunks.typecode, [chunk]).tobytes() * (end - start))
+        table.ids.extend(source.ids[start:end])
+        table.labels.extend(source.labels[start:end])
+
+
+class ReportWatcher:
+    """Wait for reports matching ``pattern`` in a directory to be rewritten.
+
+    Uses inotify (through ctypes, no extra dependency) where available and
+    falls back to polling sizes and mtimes every ``interval`` seconds.
+    """
 
-        except FileNotFoundError:
-            print(f"Error: File {self.html_file} not found")
-            return False
-        except json.JSONDecodeError as e:
-            print(f"Error parsing JSON data: {e}")
-            return False
-        except Exception as e:
-            print(f"Error extracting chart data: {e}")
-            return False
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    # Quiet period that coalesces the bursts of events of one rebuild
+    SETTLE = 0.2
 
-    def flatten_modules(self, data: List[Dict[str, Any]], path: str = "") -> None:
-        """Recursively flatten the nested module structure."""
-        for item in data:
-            # Use path if available, otherwise use label
-            item_path = item.get('path') or item.get('label', 'unknown')
-            current_path = f"{path}/{item_path}" if path else item_path
+    def __init__(self, directory: Path, pattern: str = '*.html', interval: float = 1.0,
+                 polling: bool = False):
+        self.directory = Path(directory)
+        self.pattern = pattern
+        self.interval = interval
+        self.fd = -1
+        if not polling:
+            self.fd = self._inotify()
+        self._snapshot = self._scan() if self.fd < 0 else {}
 
-            # If it has groups, it's a directory/folder
-            if 'groups' in item and item['groups']:
-                self.flatten_modules(item['groups'], current_path)
-            else:
-                # This is a leaf module
-                module_info = {
-                    'path': current_path,
-                    'statSize': item.get('statSize', 0),
-                    'parsedSize': item.get('parsedSize', 0),
-                    'gzipSize': item.get('gzipSize', 0),
-                    'id': item.get('id'),
-                    'label': item.get('label', ''),
-                    'isAsset': item.get('isAsset', False),
-                    'isInitialByEntrypoint': item.get('isInitialByEntrypoint', {})
-                }
-                self.modules.append(module_info)
+    @property
+    def mode(self) -> str:
+        return 'inotify' if self.fd >= 0 else 'polling'
 
-    def analyze_modules(self) -> None:
-        """Analyze all modules and extract key information."""
-        self.modules = []
-        self.flatten_modules(self.chart_data)
+    def _inotify(self) -> int:
+        try:
+            import ctypes
+            import ctypes.util
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return -1
+            if libc.inotify_add_watch(fd, os.fsencode(str(self.directory)),
+                                      self.IN_CLOSE_WRITE | self.IN_MOVED_TO) < 0:
+                os.close(fd)
+                return -1
+            return fd
+        except (OSError, AttributeError):
+            return -1
 
-        # Sort by parsed size (most relevant for runtime performance)
-        self.modules.sort(key=lambda x: x['parsedSize'], reverse=True)
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot = {}
+        for path in self.directory.glob(self.pattern):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            snapshot[path] = (st.st_size, st.st_mtime_ns)
+        return snapshot
 
-    def get_top_modules(self, top_n: int = 20, min_size_kb: int = 50,
-                        filter_type: str = 'all') -> List[Dict[str, Any]]:
-        """Get top N modules above minimum size with optional filtering."""
-        min_size_bytes = min_size_kb * 1024
-        filtered_modules = [
-            module for module in self.modules
-            if module['parsedSize'] >= min_size_bytes
-        ]
+    def _read_events(self, timeout: Optional[float]) -> List[Path]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        changed = []
+        data = os.read(self.fd, 64 * 1024)
+        offset = 0
+        while offset + 16 <= len(data):
+            _, _, _, length = struct.unpack_from('iIII', data, offset)
+            name = data[offset + 16:offset + 16 + length].rstrip(b'\0')
+            offset += 16 + length
+            if name and fnmatch.fnmatch(os.fsdecode(name), self.pattern):
+                changed.append(self.directory / os.fsdecode(name))
+        return changed
 
-        # Apply filtering
-        if filter_type == 'node_modules':
-            filtered_modules = [m for m in filtered_modules if 'node_modules' in m['path']]
-        elif filter_type == 'local':
-            filtered_modules = [m for m in filtered_modules if 'node_modules' not in m['path']]
+    def wait(self, timeout: Optional[float] = None) -> List[Path]:
+        """Block until reports change (or ``timeout`` passes) and return them."""
+        if self.fd >= 0:
+            changed = self._read_events(timeout)
+            if changed:
+                while True:
+                    more = self._read_events(self.SETTLE)
+                    if not more:
+                        break
+                    changed.extend(more)
+            return sorted(set(changed))
 
-        return filtered_modules[:top_n]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            changed = [path for path, state in snapshot.items() if self._snapshot.get(path) != state]
+            if changed:
+                # Wait for the writer to finish before reporting the change
+                time.sleep(self.SETTLE)
+                if self._scan() == snapshot:
+                    self._snapshot = snapshot
+                    return sorted(changed)
+                continue
+            if deadline is not None and time.monotonic() >= deadline:
+                return []
+            time.sleep(self.interval)
 
-    def format_size(self, size_bytes: int) -> str:
-        """Format bytes to human readable format."""
-        if size_bytes >= 1024 * 1024:
-            return ".1f"
-        elif size_bytes >= 1024:
-            return ".1f"
-        else:
-            return f"{size_bytes} B"
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
 
-    def print_summary(self) -> None:
-        """Print bundle summary."""
-        if not self.modules:
-            return
 
-        total_stat_size = sum(m['statSize'] for m in self.modules)
-        total_parsed_size = sum(m['parsedSize'] for m in self.modules)
-        total_gzip_size = sum(m['gzipSize'] for m in self.modules)
+class AnalysisService:
+    """Queries against the in-memory reports of a ``--watch`` session.
 
-        print("📊 Bundle Analysis Summary")
-        print("=" * 50)
-        print(f"Total modules: {len(self.modules)}")
-        print(f"Total stat size: {self.format_size(total_stat_size)}")
-        print(f"Total parsed size: {self.format_size(total_parsed_size)}")
-        print(f"Total gzip size: {self.format_size(total_gzip_size)}")
-        print()
+    ``GET /reports``, ``/top``, ``/tree`` and ``/diff`` take ``report``
+    (file stem, default: the first report), ``n``, ``min_size`` (KB),
+    ``filter`` and ``metric`` query parameters.
+    """
 
-    def print_hot_modules(self, top_n: int = 20, min_size_kb: int = 50, filter_type: str = 'all') -> None:
-        """Print the hottest modules (largest ones)."""
-        top_modules = self.get_top_modules(top_n, min_size_kb, filter_type)
+    def __init__(self, reports: Dict[str, IncrementalReport]):
+        self.reports = reports
+        self.lock = threading.Lock()
 
-        if not top_modules:
-            print(f"No modules found above {min_size_kb}KB")
-            return
+    def query(self, target: str) -> Tuple[int, str, str]:
+        """Answer one request path; returns ``(status, content type, body)``."""
+        url = urlsplit(target)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        route = url.path.rstrip('/') or '/reports'
 
-        print(f"🔥 Top {len(top_modules)} Hot Modules (> {min_size_kb}KB)")
-        print("=" * 80)
-        print(f"{'#':<3} {'Module':<50} {'Parsed':<10} {'Gzip':<10}")
-        print("-" * 80)
+        if route == '/reports':
+            with self.lock:
+                reports = list(self.reports.items())
+            body = []
+            for name, report in reports:
+                _, previous, last_refresh = report.snapshot()
+                body.append({'report': name, 'file': str(report.html_file),
+                             'has_previous': previous is not None, **last_refresh})
+            return 200, 'application/json', json.dumps(body, indent=2)
 
-        for i, module in enumerate(top_modules, 1):
-            path = module['path']
-            # Truncate very long paths
-            if len(path) > 50:
-                path = "..." + path[-47:]
+        with self.lock:
+            name = params.get('report') or next(iter(self.reports), '')
+            report = self.reports.get(name)
+        current, previous, _ = report.snapshot() if report else (None, None, {})
+        if current is None:
+            return 404, 'application/json', json.dumps({'error': f"unknown or unreadable report '{name}'"})
 
-            parsed_size = self.format_size(module['parsedSize'])
-            gzip_size = self.format_size(module['gzipSize'])
+        try:
+            top_n = int(params.get('n', 20))
+            min_size = int(params.get('min_size', 0))
+        except ValueError:
+            return 400, 'application/json', json.dumps({'error': 'n and min_size must be integers'})
+        filter_type = params.get('filter', 'all')
+        metric = params.get('metric', 'parsed')
+        if filter_type not in ('all', 'node_modules', 'local') or metric not in ('parsed', 'gzip'):
+            return 400, 'application/json', json.dumps({'error': 'invalid filter or metric'})
 
-            print(f"{i:<3} {path:<50} {parsed_size:<10} {gzip_size:<10}")
+        if route == '/top':
+            rows = current.modules.top(top_n, metric, min_size * 1024, filter_type)
+            return 200, 'application/json', json.dumps(
+                [current.modules.row(i) for i in rows], indent=2, ensure_ascii=False)
+        if route == '/tree':
+            # Rendered into a private buffer; sys.stdout is shared by every thread
+            out = io.StringIO()
+            if params.get('compact'):
+                current.print_compact_tree(top_n, min_size, filter_type, out)
+            else:
+                current.print_module_tree(top_n, min_size, filter_type, out)
+            return 200, 'text/plain; charset=utf-8', out.getvalue()
+        if route == '/diff':
+            if previous is None:
+                return 409, 'application/json', json.dumps({'error': 'no previous build yet'})
+            diff = BundleDiff(previous, current)
+            diff.compute()
+            return 200, 'application/json', json.dumps(diff.to_dict(top_n, metric), indent=2,
+                                                       ensure_ascii=False)
+        return 404, 'application/json', json.dumps({'error': f"unknown endpoint '{url.path}'"})
 
-    def print_chunk_analysis(self) -> None:
-        """Analyze and print chunk-level information."""
-        chunks = [item for item in self.chart_data if item.get('isAsset')]
 
-        if not chunks:
-            return
+def make_request_handler(service: AnalysisService):
+    """Build an HTTP request handler class bound to ``service``."""
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            status, content_type, body = service.query(self.path)
+            data = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
 
-        print("\n📦 Chunk Analysis")
-        print("=" * 50)
+        def address_string(self):
+            # Unix socket peers have no host address
+            return self.client_address[0] if self.client_address else 'unix'
 
-        # Sort chunks by parsed size
-        chunks.sort(key=lambda x: x['parsedSize'], reverse=True)
+        def log_message(self, format, *args):
+            pass
 
-        for i, chunk in enumerate(chunks[:10], 1):  # Top 10 chunks
-            entrypoints = [k for k, v in chunk.get('isInitialByEntrypoint', {}).items() if v]
-            entrypoint_str = f" ({', '.join(entrypoints)})" if entrypoints else ""
+    return Handler
 
-            label = chunk.get('label', 'unknown')
-            if len(label) > 40:
-                label = label[:37] + "..."
 
-            parsed_size = self.format_size(chunk['parsedSize'])
-            gzip_size = self.format_size(chunk['gzipSize'])
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
 
-            print(f"{i:2d}. {label:<40} {parsed_size:<10} {gzip_size:<10}{entrypoint_str}")
 
-    def print_optimization_suggestions(self) -> None:
-        """Print optimization suggestions based on analysis."""
-        if not self.modules:
-            return
+def run_watch(args: argparse.Namespace) -> None:
+    """Handle ``--watch``: keep reports indexed and serve queries until interrupted."""
+    directory = Path(args.watch or args.input[0])
+    if not args.watch and not directory.is_dir():
+        directory = directory.parent
+    if not directory.is_dir():
+        print(f"Error: {directory} is not a directory")
+        sys.exit(1)
 
-        print("\n💡 Optimization Suggestions")
-        print("=" * 50)
+    watcher = ReportWatcher(directory, interval=args.poll_interval, polling=args.poll)
+    reports: Dict[str, IncrementalReport] = {}
+    service = AnalysisService(reports)
 
-        # Find large node_modules
-        node_modules = [m for m in self.modules if 'node_modules' in m['path'] and m['parsedSize'] > 100 * 1024]
+    def refresh(path: Path) -> None:
+        report = reports.get(path.stem) or IncrementalReport(path, args.build_dir)
+        with service.lock:
+            reports.setdefault(path.stem, report)
+        # Indexing happens outside any lock; the report publishes the new build under its own
+        if report.refresh():
+            stats = report.snapshot()[2]
+            print(f"🔄 {path.name}: {stats['modules']} modules, {stats['chunks_parsed']} chunks parsed, "
+                  f"{stats['chunks_reused']} reused in {stats['seconds'] * 1000:.0f} ms")
 
-        if node_modules:
-            print(f"• Found {len(node_modules)} large node_modules modules")
-            total_nm_size = sum(m['parsedSize'] for m in node_modules)
-            print(f"  Total node_modules size: {self.format_size(total_nm_size)}")
+    for path in sorted(directory.glob('*.html')):
+        refresh(path)
 
-            # Check for common heavy packages
-            heavy_packages = []
-            for module in node_modules[:5]:
-                if 'react' in module['path'].lower() and 'dom' in module['path'].lower():
-                    heavy_packages.append("React DOM")
-                elif 'lodash' in module['path'].lower():
-                    heavy_packages.append("Lodash")
-                elif 'moment' in module['path'].lower():
-                    heavy_packages.append("Moment.js")
+    handler = make_request_handler(service)
+    if args.socket:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(args.socket)
+        server = UnixHTTPServer(args.socket, handler)
+        where = f"unix:{args.socket}"
+    else:
+        server = http.server.ThreadingHTTPServer(('127.0.0.1', args.port), handler)
+        where = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"👀 Watching {directory}/*.html ({watcher.mode}); serving /reports /top /tree /diff on {where}")
 
-            if heavy_packages:
-                print(f"  Consider tree-shaking: {', '.join(set(heavy_packages))}")
+    try:
+        while True:
+            for path in watcher.wait():
+                if path.is_file():
+                    refresh(path)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        watcher.close()
+        if args.socket:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(args.socket)
 
-        # Check for large assets
-        large_assets = [m for m in self.modules if any(ext in m['path'].lower() for ext in ['.png', '.jpg', '.svg', '.woff', '.woff2']) and m['statSize'] > 50 * 1024]
 
-        if large_assets:
-            print(f"• Found {len(large_assets)} large asset files")
-            total_asset_size = sum(m['statSize'] for m in large_assets)
-            print(f"  Total asset size: {self.format_size(total_asset_size)}")
-            print("  Consider optimizing/compressing large assets")
+def run_targets(args: argparse.Namespace) -> None:
+    """Handle several ``--input`` reports, or an analyze directory, as targets of one build."""
+    targets = TargetSet(args.input, args.build_dir)
+    if not targets.reports:
+        print(f"Error: no reports found in {', '.join(args.input)}")
+        sys.exit(1)
 
-    def print_module_tree(self, top_n: int = 20, min_size_kb: int = 50,
-                          filter_type: str = 'all') -> None:
-        """Print a hierarchical tree view of large modules."""
-        top_modules = self.get_top_modules(top_n, min_size_kb, filter_type)
+    categorizer = load_category_rules(args)
+    print(f"🔍 Analyzing {len(targets.reports)} targets: {', '.join(targets.reports)}")
+    print()
+    if args.profile or args.profile_output:
+        targets.profiler = PhaseProfiler()
+    parse_cache = ParseCache(Path(args.cache_dir), args.cache_size * 1024 * 1024) if args.cache else None
+    if not targets.load(args.stream, parse_cache, args.workers):
+        sys.exit(1)
+    if categorizer is not None:
+        for analyzer in targets.analyzers.values():
+            analyzer.categorizer = categorizer
 
-        if not top_modules:
-            print(f"No modules found above {min_size_kb}KB for tree view")
-            return
+    targets.print_report(args.top, args.min_size, args.filter)
 
-        print(f"\n🌳 Module Hierarchy Tree (> {min_size_kb}KB, filtered: {filter_type})")
+    # Single-report views, once per target
+    per_target = (args.measure or args.duplicates or args.entrypoints or args.packages
+                  or args.tree or args.compact_tree)
+    for name, analyzer in targets.analyzers.items() if per_target else ():
+        print(f"\n🎯 Target: {name}")
         print("=" * 80)
+        if args.measure:
+            analyzer.measure_chunk_sizes(args.codecs, args.workers)
+            analyzer.print_chunk_analysis()
+        if args.duplicates:
+            analyzer.print_duplicates(args.top)
+        if args.entrypoints:
+            analyzer.print_entrypoint_costs(args.top, args.network, args.cpu)
+        if args.packages:
+            analyzer.print_package_rollup(args.top, args.lockfile)
+        if args.compact_tree:
+            analyzer.print_compact_tree(args.top, args.min_size, args.filter)
+        elif args.tree:
+            analyzer.print_module_tree(args.top, args.min_size, args.filter)
 
-        # Build tree structure
-        tree = self._build_module_tree(top_modules)
+    if args.export:
+        targets.export(args.export, args.top, args.min_size, args.filter)
+        print(f"\n📄 Results exported to: {args.export}")
 
-        # Print the tree
-        self._print_tree_node(tree, "", True)
+    if args.history:
+        record_history(args, targets.analyzers)
 
-    def _build_module_tree(self, modules: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Build a hierarchical tree structure from module paths."""
-        tree = {}
+    passed = run_budgets(args, targets.analyzers) if args.budgets else True
 
-        for module in modules:
-            # Clean and simplify the path
-            path = self._simplify_module_path(module['path'])
-            path_parts = path.split('/')
+    finish_profile(targets.profiler, args)
+    if not passed:
+        sys.exit(1)
 
-            # Skip empty parts
-            path_parts = [p for p in path_parts if p]
 
-            current = tree
+def load_category_rules(args: argparse.Namespace) -> Optional[ModuleCategorizer]:
+    """The ``--category-rules`` categorizer, or None; exits on an unreadable file."""
+    if not args.category_rules:
+        return None
+    try:
+        return ModuleCategorizer.from_file(args.category_rules)
+    except (OSError, ValueError, KeyError, re.error) as e:
+        print(f"Error reading category rules {args.category_rules}: {e}")
+        sys.exit(1)
 
-            # Navigate/create the path in the tree
-            for i, part in enumerate(path_parts):
-                if part not in current:
-                    if i == len(path_parts) - 1:
-                        # This is a leaf node (the actual module)
-                        current[part] = {
-                            'type': 'module',
-                            'data': module
-                        }
-                    else:
-                        # This is an intermediate directory
-                        current[part] = {
-                            'type': 'directory',
-                            'children': {}
-                        }
 
-                if current[part]['type'] == 'directory':
-                    current = current[part]['children']
-                else:
-                    # If we encounter a module where we expected a directory, stop
-                    break
+def current_commit(args: argparse.Namespace) -> Optional[str]:
+    """The commit being analyzed: ``--commit``, the CI's variable, or ``git rev-parse HEAD``."""
+    commit = args.commit or os.environ.get('GITHUB_SHA') or os.environ.get('CI_COMMIT_SHA')
+    if commit:
+        return commit
+    try:
+        result = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None if result.returncode == 0 else None
 
-        return tree
 
-    def _simplify_module_path(self, path: str) -> str:
-        """Simplify complex webpack paths for better readability."""
-        # Remove repetitive concatenated paths
-        if ' (concatenated)' in path:
-            # Extract the main file path from concatenated modules
-            parts = path.split(' (concatenated)')
-            if len(parts) > 1:
-                # Use the first meaningful part
-                path = parts[0]
+def commit_dates(commits: Sequence[str]) -> Dict[str, str]:
+    """Committer dates (UTC timestamps) of ``commits`` found in the git repository here.
 
-        # Clean up webpack chunk references
-        path = path.replace('static/chunks/', 'chunks/')
+    Unknown commits, and every commit when git is unavailable, are left out.
+    """
+    if not commits:
+        return {}
+    try:
+        result = subprocess.run(['git', 'log', '--no-walk=unsorted', '--ignore-missing', '--format=%H %ct',
+                                 *sorted(set(commits))], capture_output=True, text=True, timeout=60)
+    except (OSError, subprocess.SubprocessError):
+        return {}
+    if result.returncode != 0:
+        return {}
+    dates = {}
+    for line in result.stdout.splitlines():
+        sha, _, seconds = line.partition(' ')
+        for commit in commits:
+            if sha.startswith(commit):
+                dates[commit] = utc_timestamp(int(seconds))
+    return dates
 
-        # Simplify deep node_modules nesting
-        import re
-        # Replace multiple node_modules with single one
-        path = re.sub(r'node_modules/[^/]+/node_modules/', 'node_modules/', path)
-        path = re.sub(r'node_modules/[^/]+/node_modules/', 'node_modules/', path)  # Run twice for nested cases
 
-        # Simplify src directory repetition
-        path = re.sub(r'src/\./src/', 'src/', path)
-        path = re.sub(r'src/\./src/', 'src/', path)
+def record_history(args: argparse.Namespace, analyzers: Dict[str, BundleAnalyzer]) -> None:
+    """Record the analyzed targets of this run as one build in ``--history``."""
+    commit = current_commit(args)
+    created_at = utc_timestamp()
+    build = args.build_label or commit or created_at
+    store = HistoryStore(args.history)
+    try:
+        with store.db:
+            for target, analyzer in analyzers.items():
+                if store.record(build, target, analyzer, commit=commit, created_at=created_at,
+                                digest=file_digest(analyzer.html_file)) is None:
+                    print(f"\n🗄️  {build} ({target}) is already in {args.history}")
+                else:
+                    print(f"\n🗄️  Recorded {build} ({target}) in {args.history}")
+    finally:
+        store.close()
 
-        return path
 
-    def _print_tree_node(self, node: Dict[str, Any], prefix: str = "",
-                        is_last: bool = True, is_root: bool = False) -> None:
-        """Recursively print tree nodes with proper indentation."""
-        if is_root:
-            # Start with root level
-            for i, (name, data) in enumerate(node.items()):
-                is_last_item = i == len(node) - 1
-                self._print_tree_item(name, data, "", is_last_item)
-        else:
-            # Print a single item
-            for name, data in node.items():
-                self._print_tree_item(name, data, prefix, is_last)
-
-    def _print_tree_item(self, name: str, data: Dict[str, Any], prefix: str,
-                        is_last: bool) -> None:
-        """Print a single tree item with its data."""
-        # Create the branch symbol
-        if is_last:
-            branch = "└── "
-            next_prefix = prefix + "    "
-        else:
-            branch = "├── "
-            next_prefix = prefix + "│   "
+def run_history(args: argparse.Namespace) -> None:
+    """Handle ``--backfill``, ``--trend`` and ``--first-crossing`` against ``--history``."""
+    store = HistoryStore(args.history)
+    try:
+        if args.backfill:
+            directory = Path(args.backfill)
+            if not directory.is_dir():
+                print(f"Error: {directory} is not a directory")
+                sys.exit(1)
+            start = time.perf_counter()
+            added = store.backfill(directory, args.workers, args.stream)
+            print(f"🗄️  Backfilled {added} build target(s) from {directory} into {args.history} "
+                  f"in {time.perf_counter() - start:.1f}s")
 
-        if data['type'] == 'module':
-            # Print module with size info
-            module = data['data']
-            parsed_size = self.format_size(module['parsedSize'])
-            gzip_size = self.format_size(module['gzipSize'])
+        target = args.target or 'client'
+        # Only used for its size formatting
+        formatter = BundleAnalyzer(args.history)
+        fmt, delta = formatter.format_size, formatter.format_delta
+        if args.trend:
+            start = time.perf_counter()
+            trend = store.package_trend(args.trend, target, args.history_builds)
+            kind = 'Package'
+            if not any(row['parsed'] for row in trend):
+                trend = store.module_trend(args.trend, target, args.history_builds)
+                kind = 'Module'
+            elapsed = (time.perf_counter() - start) * 1000
+
+            print(f"\n📈 {kind} Trend: {args.trend} ({target}, last {len(trend)} builds, query {elapsed:.1f} ms)")
+            print("=" * 92)
+            print(f"{'Build':<24} {'Commit':<10} {'Date':<21} {'Parsed':>12} {'Gzip':>12} {'Δ Gzip':>10}")
+            print("-" * 92)
+            previous = None
+            for row in trend:
+                change = delta(row['gzip'] - previous) if previous is not None else ''
+                print(f"{row['build'][:24]:<24} {(row['commit'] or '')[:8]:<10} {row['created_at']:<21} "
+                      f"{fmt(row['parsed']):>12} {fmt(row['gzip']):>12} {change:>10}")
+                previous = row['gzip']
+            if len(trend) > 1:
+                first, last = trend[0], trend[-1]
+                print(f"Change over {len(trend)} builds: parsed {delta(last['parsed'] - first['parsed'])}, "
+                      f"gzip {delta(last['gzip'] - first['gzip'])}")
+
+        if args.first_crossing:
+            chunk, kb = args.first_crossing
+            threshold = int(float(kb) * 1024)
+            start = time.perf_counter()
+            crossing = store.first_crossing(chunk, threshold, args.history_metric, target)
+            elapsed = (time.perf_counter() - start) * 1000
+
+            print(f"\n⏫ First build where {normalize_chunk_name(chunk)} reached {fmt(threshold)} "
+                  f"{args.history_metric} ({target}, query {elapsed:.1f} ms)")
+            print("=" * 80)
+            if crossing is None:
+                print("Never crossed in the recorded history")
+            else:
+                print(f"Build: {crossing['build']}  commit: {crossing['commit'] or '-'}  at {crossing['created_at']}")
+                print(f"Chunk: {crossing['label']} = {fmt(crossing['size'])}")
+                previous = crossing['previous']
+                if previous:
+                    print(f"Previous build: {previous['build']} at {previous['created_at']} = {fmt(previous['size'])}")
+    finally:
+        store.close()
 
-            # Truncate long names
-            display_name = name
-            if len(display_name) > 40:
-                display_name = display_name[:37] + "..."
 
-            print(f"{prefix}{branch}{display_name} ({parsed_size}, gz: {gzip_size})")
+def finish_profile(profiler: PhaseProfiler, args: argparse.Namespace) -> None:
+    """Print and/or write the collected phases for ``--profile``/``--profile-output``."""
+    if not profiler.enabled:
+        return
+    profiler.stop()
+    if args.profile:
+        profiler.print_report()
+    if args.profile_output:
+        if args.profile_output.endswith('.jsonl'):
+            profiler.write_jsonl(args.profile_output)
         else:
-            # Print directory
-            print(f"{prefix}{branch}{name}/")
+            profiler.write_chrome_trace(args.profile_output)
+        print(f"\n📄 Profile written to: {args.profile_output}")
 
-            # Sort children for consistent display
-            children = list(data['children'].items())
-            children.sort(key=lambda x: x[1]['type'] == 'directory')  # Directories first
 
-            for i, (child_name, child_data) in enumerate(children):
-                is_last_child = i == len(children) - 1
-                self._print_tree_item(child_name, child_data, next_prefix, is_last_child)
+def run_diff(args: argparse.Namespace) -> None:
+    """Handle ``--diff BASE HEAD``."""
+    base_file, head_file = args.diff
+    print(f"🔍 Comparing bundles: {base_file} → {head_file}")
+    print()
 
-    def print_compact_tree(self, top_n: int = 20, min_size_kb: int = 50,
-                          filter_type: str = 'all') -> None:
-        """Print a compact tree view grouped by logical categories."""
-        top_modules = self.get_top_modules(top_n, min_size_kb, filter_type)
+    base = load_analyzer(base_file, args.stream)
+    head = load_analyzer(head_file, args.stream)
+    if base is None or head is None:
+        sys.exit(1)
 
-        if not top_modules:
-            print(f"No modules found above {min_size_kb}KB for compact tree view")
-            return
+    diff = BundleDiff(base, head)
+    diff.compute()
+    diff.print_report(args.top, args.diff_metric)
 
-        print(f"\n🌲 Compact Module Tree (> {min_size_kb}KB, filtered: {filter_type})")
-        print("=" * 80)
+    if args.export:
+        diff.export(args.export, args.top, args.diff_metric)
+        print(f"\n📄 Diff exported to: {args.export}")
 
-        # Group modules by categories
-        categories = self._categorize_modules(top_modules)
 
-        for i, (category, modules) in enumerate(categories.items()):
-            is_last_category = i == len(categories) - 1
-            self._print_category_tree(category, modules, is_last_category)
+def run_budgets(args: argparse.Namespace, analyzers: Dict[str, BundleAnalyzer]) -> bool:
+    """Handle ``--budgets``: check every analyzed target and return whether the build passed.
 
-    def _categorize_modules(self, modules: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
-        """Categorize modules into logical groups."""
-        categories = {
-            'React Ecosystem': [],
-            'UI Components': [],
-            'Forms & Validation': [],
-            'State Management': [],
-            'Utilities': [],
-            'Styling': [],
-            'Other Dependencies': [],
-            'Local Components': []
-        }
+    With several targets the baseline may be a directory of reports, paired
+    with the targets by file stem; the verdict covers all targets.
+    """
+    try:
+        gate = BudgetGate.from_file(args.budgets)
+    except (OSError, ValueError, TypeError, AttributeError, re.error) as e:
+        print(f"Error reading budgets {args.budgets}: {e}")
+        sys.exit(1)
 
-        for module in modules:
-            path = module['path'].lower()
-            category = 'Other Dependencies'  # Default
-
-            # Categorize based on path patterns
-            if any(lib in path for lib in ['react', 'next', 'react-dom']):
-                category = 'React Ecosystem'
-            elif any(lib in path for lib in ['@radix-ui', 'lucide', 'heroicons', 'ui']):
-                category = 'UI Components'
-            elif any(lib in path for lib in ['react-hook-form', 'zod', 'yup', 'formik']):
-                category = 'Forms & Validation'
-            elif any(lib in path for lib in ['zustand', 'redux', 'jotai', 'recoil']):
-                category = 'State Management'
-            elif any(lib in path for lib in ['lodash', 'ramda', 'date-fns', 'clsx']):
-                category = 'Utilities'
-            elif any(lib in path for lib in ['tailwind', 'styled-components', 'emotion']):
-                category = 'Styling'
-            elif 'src/' in path and not any(lib in path for lib in ['node_modules']):
-                category = 'Local Components'
+    base_reports: Dict[str, Path] = {}
+    baseline_file = args.budget_baseline or gate.baseline
+    if baseline_file and gate.needs_baseline:
+        path = Path(baseline_file)
+        if path.is_dir():
+            base_reports = {report.stem: report for report in sorted(path.iterdir())
+                            if report.suffix in HistoryStore.REPORT_SUFFIXES and report.is_file()}
+        elif len(analyzers) == 1:
+            base_reports = {next(iter(analyzers.values())).html_file.stem: path}
+        else:
+            base_reports = {path.stem: path}
 
-            categories[category].append(module)
+    verdicts = {}
+    for target, analyzer in analyzers.items():
+        baseline = None
+        base_report = base_reports.get(analyzer.html_file.stem)
+        if base_report is not None:
+            baseline = load_analyzer(str(base_report), args.stream)
+            if baseline is None:
+                sys.exit(1)
+        with analyzer.profiler.phase('budgets', len(gate.rules)):
+            verdicts[target] = gate.evaluate(analyzer, baseline)
+        verdicts[target]['baseline'] = str(base_report) if baseline is not None else None
 
-        # Remove empty categories
-        return {k: v for k, v in categories.items() if v}
+    if len(verdicts) == 1:
+        verdict = next(iter(verdicts.values()))
+    else:
+        verdict = gate.combine(verdicts)
+        verdict['baselines'] = {target: v['baseline'] for target, v in verdicts.items()}
+    BudgetGate.print_report(verdict, next(iter(analyzers.values())), args.top)
 
-    def _print_category_tree(self, category: str, modules: List[Dict[str, Any]],
-                           is_last_category: bool) -> None:
-        """Print a category and its modules in tree format."""
-        if not modules:
-            return
+    if args.budget_output:
+        with open(args.budget_output, 'w', encoding='utf-8') as f:
+            json.dump(verdict, f, indent=2, ensure_ascii=False)
+        print(f"\n📄 Budget verdict written to: {args.budget_output}")
+    return verdict['passed']
 
-        # Category header
-        branch = "└── " if is_last_category else "├── "
-        print(f"{branch}{category}/")
 
-        # Calculate total size for category
-        total_parsed = sum(m['parsedSize'] for m in modules)
-        total_gzip = sum(m['gzipSize'] for m in modules)
+def run_cache_churn(args: argparse.Namespace) -> None:
+    """Handle ``--cache-churn BASE HEAD``."""
+    base_file, head_file = args.cache_churn
+    print(f"🔍 Cache churn: {base_file} → {head_file}")
+    print()
 
-        # Sort modules by size within category
-        modules.sort(key=lambda x: x['parsedSize'], reverse=True)
+    base = load_analyzer(base_file, args.stream)
+    head = load_analyzer(head_file, args.stream)
+    if base is None or head is None:
+        sys.exit(1)
 
-        next_prefix = "    " if is_last_category else "│   "
+    churn = CacheChurn(base, head)
+    churn.compute()
+    churn.print_report(args.top)
 
-        for i, module in enumerate(modules):
-            is_last_module = i == len(modules) - 1
+    if args.export:
+        churn.export(args.export, args.top)
+        print(f"\n📄 Cache churn exported to: {args.export}")
 
-            # Module branch
-            mod_branch = "└── " if is_last_module else "├── "
-            mod_prefix = next_prefix + ("    " if is_last_module else "│   ")
 
-            # Format module name
-            path = module['path']
-            # Extract just the filename/library name for cleaner display
-            if 'node_modules/' in path:
-                # For npm packages, show package name
-                parts = path.split('node_modules/')
-                if len(parts) > 1:
-                    package_path = parts[-1].split('/')[0]
-                    if '@' in package_path:
-                        # Scoped package
-                        scoped_parts = parts[-1].split('/')
-                        if len(scoped_parts) >= 2:
-                            package_path = f"{scoped_parts[0]}/{scoped_parts[1]}"
-                    name = package_path
-                else:
-                    name = path.split('/')[-1]
-            else:
-                # For local files, show relative path
-                name = path.split('/')[-1]
-                if len(name) > 30:
-                    name = name[:27] + "..."
+def run_split_simulation(analyzer: BundleAnalyzer, args: argparse.Namespace) -> None:
+    """Handle ``--simulate-split`` and ``--search-split``."""
+    weights = None
+    try:
+        if args.route_weights:
+            with open(args.route_weights, 'r', encoding='utf-8') as f:
+                weights = json.load(f)
+        policy = None
+        if args.simulate_split:
+            with open(args.simulate_split, 'r', encoding='utf-8') as f:
+                policy = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error reading split simulation input: {e}")
+        sys.exit(1)
 
-            parsed_size = self.format_size(module['parsedSize'])
-            gzip_size = self.format_size(module['gzipSize'])
+    simulator = SplitChunkSimulator(analyzer, weights, args.request_cost)
+    if not simulator.entrypoints:
+        print("\nNo entrypoint information found; cannot simulate split chunks")
+        return
 
-            print(f"{next_prefix}{mod_branch}{name} ({parsed_size}, gz: {gzip_size})")
+    if policy is not None:
+        try:
+            compiled = simulator.compile_policy(policy)
+        except (AttributeError, TypeError, ValueError, re.error) as e:
+            print(f"Error reading split policy {args.simulate_split}: {e}")
+            sys.exit(1)
+        print_split_simulation(analyzer, simulator, simulator.evaluate(compiled),
+                               f"✂️  Split Simulation ({args.simulate_split})", args.top)
 
-        # Show category total
-        total_parsed_fmt = self.format_size(total_parsed)
-        total_gzip_fmt = self.format_size(total_gzip)
-        print(f"{next_prefix}💾 Total: {total_parsed_fmt} parsed, {total_gzip_fmt} gzipped")
-        print()
+    if args.search_split:
+        best_policy, best = simulator.search(args.search_split, start=policy)
+        print_split_simulation(analyzer, simulator, best,
+                               f"🔎 Best Split Policy after {args.search_split} candidates", args.top)
+        print("\nPolicy:")
+        print(json.dumps(best_policy, indent=2))
 
-    def export_results(self, filename: str, top_n: int = 20, min_size_kb: int = 50,
-                      filter_type: str = 'all') -> None:
-        """Export analysis results to JSON file."""
-        top_modules = self.get_top_modules(top_n, min_size_kb, filter_type)
-        chunks = [item for item in self.chart_data if item.get('isAsset')][:10]
-        chunks.sort(key=lambda x: x['parsedSize'], reverse=True)
 
-        results = {
-            'summary': {
-                'total_modules': len(self.modules),
-                'total_stat_size': sum(m['statSize'] for m in self.modules),
-                'total_parsed_size': sum(m['parsedSize'] for m in self.modules),
-                'total_gzip_size': sum(m['gzipSize'] for m in self.modules),
-                'analysis_timestamp': '2025-01-24T00:00:00Z'  # Current date
-            },
-            'top_modules': top_modules,
-            'top_chunks': chunks,
-            'filter_applied': filter_type,
-            'min_size_kb': min_size_kb
-        }
+def profile_argument(profiles: Dict[str, Dict[str, float]], fields: Sequence[str]):
+    """Build an argparse type that validates a profile name or custom spec."""
+    def parse(value: str) -> str:
+        try:
+            resolve_profile(value, profiles, fields)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+        return value
+    return parse
 
-        import json
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+
+def codec_list_argument(value: str) -> List[str]:
+    """Parse and validate a comma-separated ``name-level`` codec list."""
+    codecs_ = [codec.strip() for codec in value.split(',') if codec.strip()]
+    for codec in codecs_:
+        try:
+            compressed_size(b'', codec)
+        except ValueError:
+            raise argparse.ArgumentTypeError(
+                f"Unsupported codec '{codec}' (available: {', '.join(available_codecs())})")
+    return codecs_
 
 
 def main():
     parser = argparse.ArgumentParser(description="Analyze Next.js bundle analyzer data")
-    parser.add_argument('--input', '-i', default='.next/analyze/client.html',
-                        help='Path to bundle analyzer HTML file')
+    parser.add_argument('--input', '-i', nargs='+', default=['.next/analyze/client.html'],
+                        help='Bundle analyzer HTML file, webpack stats.json or export; several reports '
+                             'or an analyze directory are analyzed concurrently as targets of one build')
     parser.add_argument('--top', '-t', type=int, default=20,
                         help='Show top N modules')
     parser.add_argument('--min-size', '-m', type=int, default=50,
@@ -539,32 +5933,214 @@ def main():
     parser.add_argument('--filter', '-f', choices=['all', 'node_modules', 'local'],
                         default='all', help='Filter modules by type')
     parser.add_argument('--export', '-e', help='Export results to JSON file')
+    parser.add_argument('--profile', action='store_true',
+                        help='Print wall/CPU time, peak memory and item counts per analysis phase')
+    parser.add_argument('--profile-output', metavar='FILE',
+                        help='Also write the phases as JSON lines (.jsonl) or a Chrome trace (other suffixes)')
+    parser.add_argument('--flamegraph', metavar='FILE',
+                        help='Write every module as collapsed stacks for flamegraph.pl or speedscope')
+    parser.add_argument('--treemap', metavar='FILE',
+                        help='Write a self-contained HTML treemap of every module')
+    parser.add_argument('--weight', choices=['parsed', 'gzip', 'retained'], default='parsed',
+                        help='Bytes used by --flamegraph and --treemap (retained needs stats.json)')
+    parser.add_argument('--export-format', choices=['json', 'compact'],
+                        help='Export format (default: compact for .ahm files, JSON otherwise)')
     parser.add_argument('--tree', action='store_true', help='Show hierarchical tree view of modules')
     parser.add_argument('--compact-tree', action='store_true', help='Show compact tree view grouped by category')
+    parser.add_argument('--stream', action='store_true',
+                        help='Memory-map the report and decode chunks one at a time')
+    parser.add_argument('--duplicates', action='store_true',
+                        help='Report modules shipped more than once and the bytes wasted')
+    parser.add_argument('--entrypoints', action='store_true',
+                        help='Report initial JS bytes and load time per entrypoint')
+    parser.add_argument('--network', default='fast-3g',
+                        type=profile_argument(NETWORK_PROFILES, ('bandwidth_kbps', 'rtt_ms')),
+                        help=f"Network profile ({', '.join(NETWORK_PROFILES)}) or KBPS:RTT_MS")
+    parser.add_argument('--cpu', default='mid-mobile',
+                        type=profile_argument(CPU_PROFILES, ('parse_bytes_per_ms',)),
+                        help=f"CPU profile ({', '.join(CPU_PROFILES)}) or PARSE_BYTES_PER_MS")
+    parser.add_argument('--measure', action='store_true',
+                        help='Measure real compressed sizes of emitted chunk files')
+    parser.add_argument('--codecs', type=codec_list_argument,
+                        help=f"Comma-separated codecs to measure (default: {','.join(available_codecs())})")
+    parser.add_argument('--source-maps', action='store_true',
+                        help='Attribute chunk bytes to original sources using the emitted .js.map files')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: all cores)')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                        help=f'Parse cache directory (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--cache-size', type=int, default=512,
+                        help='Parse cache size limit in MB; least recently used entries are evicted (default: 512)')
+    parser.add_argument('--cache', action=argparse.BooleanOptionalAction, default=False,
+                        help='Reuse parsed reports from the parse cache in --cache-dir (default: off)')
+    parser.add_argument('--what-if-merge', nargs='+', metavar='CHUNK',
+                        help='Measure the compressed size of the given chunks merged into one')
+    parser.add_argument('--retained', action='store_true',
+                        help='Rank modules/packages by retained size (needs stats.json input)')
+    parser.add_argument('--retained-entrypoint', metavar='NAME',
+                        help='Compute retained sizes from a single entrypoint')
+    parser.add_argument('--packages', action='store_true',
+                        help='Roll sizes up to package@version and attribute them to direct dependencies')
+    parser.add_argument('--lockfile', metavar='FILE',
+                        help='package-lock.json for --packages (default: project root or current directory)')
+    parser.add_argument('--category-rules', metavar='FILE',
+                        help='JSON rules file with the categories used by --compact-tree')
+    parser.add_argument('--simulate-split', metavar='POLICY',
+                        help='Simulate a splitChunks policy JSON file against this build')
+    parser.add_argument('--search-split', type=int, metavar='N',
+                        help='Search N candidate split policies for the lowest weighted route payload')
+    parser.add_argument('--route-weights', metavar='FILE',
+                        help='JSON object of entrypoint weights (e.g. traffic share) for the split search')
+    parser.add_argument('--request-cost', type=int, default=1024,
+                        help='Byte-equivalent cost of one extra initial request (default: 1024)')
+    parser.add_argument('--build-dir',
+                        help='Next.js build directory with emitted chunks (default: two levels above --input)')
+    parser.add_argument('--diff', nargs=2, metavar=('BASE', 'HEAD'),
+                        help='Compare two reports or exports from different builds')
+    parser.add_argument('--diff-metric', choices=['parsed', 'gzip'], default='parsed',
+                        help='Size used to rank diff changes')
+    parser.add_argument('--watch', nargs='?', const='', metavar='DIR',
+                        help='Keep reports in DIR (default: the --input directory) indexed and serve queries')
+    parser.add_argument('--port', type=int, default=8765,
+                        help='Local HTTP port for --watch (default: 8765)')
+    parser.add_argument('--socket', metavar='PATH',
+                        help='Serve --watch queries on a Unix socket instead of HTTP')
+    parser.add_argument('--poll', action='store_true',
+                        help='Poll for report changes instead of using inotify')
+    parser.add_argument('--poll-interval', type=float, default=1.0,
+                        help='Polling interval in seconds (default: 1.0)')
+    parser.add_argument('--cache-churn', nargs=2, metavar=('BASE', 'HEAD'),
+                        help='Report chunks and bytes a returning visitor re-fetches between two builds')
+    parser.add_argument('--budgets', metavar='FILE',
+                        help='JSON size budgets to check; exits with status 1 when one fails')
+    parser.add_argument('--budget-baseline', metavar='REPORT',
+                        help='Baseline report or export for delta_* budgets (overrides the file); '
+                             'a directory of reports pairs with several targets by file stem')
+    parser.add_argument('--budget-output', metavar='FILE',
+                        help='Write the budget verdict as JSON')
+    parser.add_argument('--history', metavar='DB',
+                        help='SQLite history file; a normal run records this build into it')
+    parser.add_argument('--build-label', metavar='NAME',
+                        help='Build name recorded in --history (default: the commit, else a timestamp)')
+    parser.add_argument('--commit', metavar='SHA',
+                        help='Commit recorded in --history (default: $GITHUB_SHA, $CI_COMMIT_SHA or git HEAD)')
+    parser.add_argument('--target', metavar='NAME',
+                        help='Target recorded/queried in --history (default: report file stem / client)')
+    parser.add_argument('--backfill', metavar='DIR',
+                        help='Ingest every past report under DIR into --history in parallel, dated by '
+                             'the export timestamp, else the commit date, else the file mtime')
+    parser.add_argument('--trend', metavar='NAME',
+                        help='Size history of a package (or module key) from --history')
+    parser.add_argument('--first-crossing', nargs=2, metavar=('CHUNK', 'KB'),
+                        help='First build in --history where CHUNK reached KB kilobytes')
+    parser.add_argument('--history-builds', type=int, default=200,
+                        help='Number of most recent builds --trend covers (default: 200)')
+    parser.add_argument('--history-metric', choices=['parsed', 'gzip'], default='gzip',
+                        help='Size used by --first-crossing (default: gzip)')
 
     args = parser.parse_args()
 
-    analyzer = BundleAnalyzer(args.input)
+    if args.diff:
+        run_diff(args)
+        return
+
+    if args.cache_churn:
+        run_cache_churn(args)
+        return
+
+    if args.watch is not None:
+        run_watch(args)
+        return
+
+    if args.backfill or args.trend or args.first_crossing:
+        if not args.history:
+            parser.error('--backfill, --trend and --first-crossing need --history DB')
+        run_history(args)
+        return
+
+    if len(args.input) > 1 or Path(args.input[0]).is_dir():
+        single = [flag for flag, value in (
+            ('--flamegraph', args.flamegraph), ('--treemap', args.treemap),
+            ('--source-maps', args.source_maps), ('--retained', args.retained),
+            ('--retained-entrypoint', args.retained_entrypoint),
+            ('--simulate-split', args.simulate_split), ('--search-split', args.search_split),
+            ('--what-if-merge', args.what_if_merge), ('--export-format', args.export_format)) if value]
+        if single:
+            parser.error(f"{', '.join(single)} only work with a single --input report")
+        run_targets(args)
+        return
+    args.input = args.input[0]
+
+    analyzer = BundleAnalyzer(args.input, args.build_dir)
+    categorizer = load_category_rules(args)
+    if categorizer is not None:
+        analyzer.categorizer = categorizer
+    if args.cache:
+        analyzer.parse_cache = ParseCache(Path(args.cache_dir), args.cache_size * 1024 * 1024)
+    analyzer.measure_gzip = args.measure
+    if args.profile or args.profile_output:
+        analyzer.profiler = PhaseProfiler()
 
     print(f"🔍 Analyzing bundle from: {args.input}")
     if args.filter != 'all':
         print(f"   Filtering by: {args.filter}")
     print()
 
-    if not analyzer.extract_chart_data():
+    if not analyzer.extract_chart_data(streaming=args.stream):
         sys.exit(1)
 
     analyzer.analyze_modules()
+
+    if args.measure:
+        analyzer.measure_chunk_sizes(args.codecs, args.workers)
+
+    if args.source_maps:
+        attribution = analyzer.apply_source_maps(args.workers)
+        if attribution.chunks:
+            mapped, total = attribution.totals()
+            print(f"🗺️  Source maps: {len(attribution.chunks)} chunks, "
+                  f"{analyzer.format_size(mapped)} of {analyzer.format_size(total)} mapped to original sources")
+        else:
+            print(f"No source maps found under {analyzer.build_dir / 'static' / 'chunks'}")
+        print()
+
     analyzer.print_summary()
     analyzer.print_hot_modules(args.top, args.min_size, args.filter)
     analyzer.print_chunk_analysis()
     analyzer.print_optimization_suggestions()
 
+    if args.duplicates:
+        analyzer.print_duplicates(args.top)
+
+    if args.entrypoints:
+        analyzer.print_entrypoint_costs(args.top, args.network, args.cpu)
+
+    if args.retained or args.retained_entrypoint:
+        analyzer.print_retained_sizes(args.top, args.retained_entrypoint)
+    elif args.tree and analyzer.stats_source is not None:
+        # Annotate the tree with retained sizes whenever the graph is available
+        analyzer.compute_retained_sizes()
+
+    if args.packages:
+        analyzer.print_package_rollup(args.top, args.lockfile)
+
+    if args.simulate_split or args.search_split:
+        run_split_simulation(analyzer, args)
+
+    if args.what_if_merge:
+        analyzer.print_merge_what_if(args.what_if_merge, args.codecs, args.workers)
+
     # Export to JSON if requested
     if args.export:
-        analyzer.export_results(args.export, args.top, args.min_size, args.filter)
+        analyzer.export_results(args.export, args.top, args.min_size, args.filter, args.export_format)
         print(f"\n📄 Results exported to: {args.export}")
 
+    for filename, treemap in ((args.flamegraph, False), (args.treemap, True)):
+        if filename and analyzer.export_stacks(filename, args.weight, args.filter, treemap):
+            print(f"\n🔥 {'Treemap' if treemap else 'Collapsed stacks'} ({args.weight} bytes) written to: {filename}")
+
+    if args.history:
+        record_history(args, {args.target or analyzer.html_file.stem: analyzer})
+
     # Show tree view if requested
     if args.tree or args.compact_tree:
         if args.compact_tree:
@@ -572,6 +6148,12 @@ def main():
         else:
             analyzer.print_module_tree(args.top, args.min_size, args.filter)
 
+    passed = run_budgets(args, {args.target or analyzer.html_file.stem: analyzer}) if args.budgets else True
+
+    finish_profile(analyzer.profiler, args)
+    if not passed:
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,779 @@
+
+# Copyright (c) 2025 Bivex
+#
+# Author: Bivex
+# Available for contact via email: support@b-b.top
+# For up-to-date contact information:
+# https://github.com/bivex
+#
+# Licensed under the MIT License.
+# Commercial licensing available upon request.
+"""
+Bundle Analyzer Hot Modules Benchmarks
+
+Generates synthetic Next.js builds (a ``window.chartData`` analyzer report, a
+webpack ``stats.json``, emitted chunk files and a ``package-lock.json``) at a
+configurable scale, times every public ``BundleAnalyzer`` operation on them
+and compares the results with a stored baseline.
+
+Synthetic builds are deterministic for a given scale and seed: deeply nested
+source trees, vendored packages installed at several versions, concatenated
+modules and many entrypoints sharing chunks. They are generated once into
+the work directory and reused while their parameters are unchanged.
+
+Baselines are only comparable on the same machine (or CI runner class) and
+with the same optional dependencies, so record one there first.
+
+Usage Examples:
+    # Quick run at the two smallest scales
+    python benchmark_hot_modules.py --scales 1k,10k
+
+    # Record a baseline, then fail when anything gets more than 15% slower
+    python benchmark_hot_modules.py --scales 100k --save-baseline bench-baseline.json
+    python benchmark_hot_modules.py --scales 100k --baseline bench-baseline.json --threshold 0.15
+
+    # Only the parsing operations, on a custom scale with very deep nesting
+    python benchmark_hot_modules.py --modules 250000 --depth 60 --operations 'extract*,flatten*'
+
+    # Just write a synthetic build to look at or feed to analyze_hot_modules.py
+    python benchmark_hot_modules.py --scales 1m --generate-only --work-dir /tmp/synthetic
+
+Arguments:
+    --scales LIST       Preset scales: 1k, 10k, 100k, 1m (default: 1k,10k)
+    --modules N         Custom scale with N leaf modules (overrides --scales)
+    --chunks N          Chunks for --modules (default: modules / 250, at least 10)
+    --entrypoints N     Entrypoints for --modules (default: chunks / 3, at least 5)
+    --depth N           Maximum directory nesting of source modules (default: 24)
+    --concatenated R    Share of modules emitted as concatenated groups (default: 0.15)
+    --seed N            Random seed for the synthetic build (default: 1)
+    --operations GLOBS  Comma-separated operation name globs to run (default: all)
+    --repeat N          Timed runs per operation; the fastest counts (default: 3)
+    --no-memory         Skip the extra tracemalloc run that records peak memory
+    --work-dir DIR      Where synthetic builds are generated and reused
+    --max-chunk-bytes MB  Total size cap for emitted chunk files (default: 64)
+    --generate-only     Generate the synthetic builds and exit
+    --output FILE       Write the results as JSON
+    --baseline FILE     Compare against a stored baseline; exit 1 on regressions
+    --save-baseline F   Store the results as a baseline
+    --threshold R       Allowed relative slowdown before failing (default: 0.2)
+    --memory-threshold R  Allowed relative peak memory growth (default: --threshold)
+    --min-delta-ms MS   Ignore slowdowns smaller than this many ms (default: 5)
+"""
+
+import argparse
+import contextlib
+import fnmatch
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from analyze_hot_modules import BudgetGate, BundleAnalyzer, PhaseProfiler, np
+
+
+BENCHMARK_VERSION = 1
+SCALES = {
+    '1k': {'modules': 1_000, 'chunks': 12, 'entrypoints': 8},
+    '10k': {'modules': 10_000, 'chunks': 60, 'entrypoints': 30},
+    '100k': {'modules': 100_000, 'chunks': 400, 'entrypoints': 150},
+    '1m': {'modules': 1_000_000, 'chunks': 2_000, 'entrypoints': 500},
+}
+DEFAULT_WORK_DIR = Path(tempfile.gettempdir()) / 'analyze-hot-modules-bench'
+# One rule per index kind, for the budget gate operation
+BENCHMARK_BUDGETS = {
+    'budgets': [
+        {'entrypoint': '*', 'initial_gzip': '300KB'},
+        {'chunk': 'static/chunks/*.js', 'gzip': '100KB'},
+        {'package': 're:^@', 'parsed': '500KB'},
+        {'category': '*', 'gzip': '1MB'},
+    ],
+}
+
+_WORDS = ('components', 'features', 'hooks', 'lib', 'utils', 'ui', 'forms', 'layout',
+          'dashboard', 'billing', 'auth', 'settings', 'shared', 'internal', 'core',
+          'widgets', 'charts', 'table', 'modal', 'icons')
+_SCOPES = ('@radix-ui', '@tanstack', '@sentry', '@clerk', '@opentelemetry', '@babel',
+           '@floating-ui', '@emotion')
+_NAMED_CHUNKS = ('webpack', 'framework', 'main', 'main-app', 'polyfills')
+
+
+class SyntheticBuild:
+    """A deterministic synthetic Next.js build at a given scale.
+
+    Leaf modules are spread over chunks with skewed sizes (a few large
+    vendor chunks, many small route chunks). A share of them is grouped into
+    concatenated modules, the way webpack-bundle-analyzer nests the inner
+    modules of a scope-hoisted module under its path. Some vendored modules
+    come from a second, nested install of the same package, so the duplicate
+    and package reports have something to find.
+    """
+
+    def __init__(self, modules: int, chunks: int, entrypoints: int, depth: int = 24,
+                 concatenated: float = 0.15, seed: int = 1):
+        self.module_count = modules
+        self.chunk_count = max(chunks, len(_NAMED_CHUNKS) + 1)
+        self.entrypoint_count = entrypoints
+        self.depth = depth
+        self.concatenated = concatenated
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        package_count = max(20, modules // 400)
+        self.packages = [f"{_SCOPES[i % len(_SCOPES)]}/pkg-{i}" if i % 3 == 0 else f"pkg-{i}"
+                         for i in range(package_count)]
+        # Zipf-like popularity, so a few packages own most vendored modules
+        self.package_weights = [1 / (i + 1) for i in range(package_count)]
+        # package -> package that installs a second copy of it in its own node_modules
+        self.nested = {self.packages[i]: self.packages[(i * 7 + 1) % package_count]
+                       for i in range(0, package_count, 5)
+                       if self.packages[(i * 7 + 1) % package_count] != self.packages[i]}
+
+        self.entrypoints = ['main', 'main-app'] + [
+            f"app/[locale]/{'/'.join(self.rng.sample(_WORDS, 1 + i % 3))}-{i}/page"
+            for i in range(max(0, entrypoints - 2))]
+        self.source_dirs = self.source_tree(max(20, modules // 25))
+        self.labels = self.chunk_labels()
+        self.initial = self.initial_chunks()
+
+    def params(self) -> Dict[str, Any]:
+        return {'modules': self.module_count, 'chunks': self.chunk_count,
+                'entrypoints': self.entrypoint_count, 'depth': self.depth,
+                'concatenated': self.concatenated, 'seed': self.seed}
+
+    def source_tree(self, count: int) -> List[str]:
+        """Source directories as a tree whose branches grow up to ``depth`` levels.
+
+        New directories mostly extend one of the last few created, so deep
+        chains form, and modules share folders the way a real ``src/`` does.
+        """
+        rng = self.rng
+        dirs = [(word, 1) for word in _WORDS[:4]]
+        while len(dirs) < count:
+            parent, depth = dirs[-rng.randint(1, min(len(dirs), 4))]
+            if depth >= self.depth:
+                parent, depth = rng.choice(dirs)
+                if depth >= self.depth:
+                    continue
+            dirs.append((f"{parent}/{rng.choice(_WORDS)}-{len(dirs)}", depth + 1))
+        return [path for path, _ in dirs]
+
+    def chunk_labels(self) -> List[str]:
+        labels = []
+        for i in range(self.chunk_count):
+            digest = f"{self.rng.getrandbits(64):016x}"
+            if i < len(_NAMED_CHUNKS):
+                labels.append(f"static/chunks/{_NAMED_CHUNKS[i]}-{digest}.js")
+            elif i % 4 == 0 and len(self.entrypoints) > 2:
+                route = self.entrypoints[2 + i % (len(self.entrypoints) - 2)]
+                labels.append(f"static/chunks/{route.rsplit('/', 1)[0]}/page-{digest}.js")
+            else:
+                labels.append(f"static/chunks/{i}-{digest}.js")
+        return labels
+
+    def initial_chunks(self) -> Dict[str, List[int]]:
+        """Chunks each entrypoint loads: the shared framework chunks plus a few of its own."""
+        shared = list(range(len(_NAMED_CHUNKS)))
+        pool = range(len(_NAMED_CHUNKS), self.chunk_count)
+        return {entrypoint: shared + sorted(self.rng.sample(pool, min(len(pool), self.rng.randint(2, 6))))
+                for entrypoint in self.entrypoints}
+
+    def chunk_module_counts(self) -> List[int]:
+        weights = [self.rng.paretovariate(1.2) for _ in range(self.chunk_count)]
+        total = sum(weights)
+        counts = [max(1, int(self.module_count * w / total)) for w in weights]
+        counts[0] += self.module_count - sum(counts)
+        if counts[0] < 1:
+            # Rounding overshoot: take it back from the largest chunks
+            excess = 1 - counts[0]
+            counts[0] = 1
+            for i in sorted(range(1, len(counts)), key=counts.__getitem__, reverse=True):
+                take = min(excess, counts[i] - 1)
+                counts[i] -= take
+                excess -= take
+                if not excess:
+                    break
+        return counts
+
+    def module_path(self) -> str:
+        """A chunk-relative module path (``./node_modules/...`` or ``./src/...``)."""
+        rng = self.rng
+        if rng.random() < 0.65:
+            package = rng.choices(self.packages, self.package_weights)[0]
+            prefix = f"node_modules/{package}"
+            if package in self.nested and rng.random() < 0.3:
+                prefix = f"node_modules/{self.nested[package]}/node_modules/{package}"
+            dirs = [rng.choice(('dist', 'esm', 'cjs', 'build'))] + \
+                [rng.choice(_WORDS) for _ in range(rng.randint(0, 3))]
+            return f"./{prefix}/{'/'.join(dirs)}/{rng.choice(_WORDS)}-{rng.randint(0, 40)}.js"
+        directory = rng.choice(self.source_dirs)
+        extension = rng.choice(('.tsx', '.ts', '.js'))
+        return f"./src/{directory}/{rng.choice(_WORDS).title()}{rng.randint(0, 200)}{extension}"
+
+    def sizes(self) -> Tuple[int, int, int]:
+        stat = max(20, int(self.rng.lognormvariate(7.3, 1.4)))
+        parsed = max(10, int(stat * self.rng.uniform(0.3, 0.9)))
+        return stat, parsed, max(10, int(parsed * self.rng.uniform(0.25, 0.4)))
+
+    @staticmethod
+    def folder_nodes(leaves: List[Tuple[List[str], Dict[str, Any]]], base: str) -> List[Dict[str, Any]]:
+        """Nest leaves under folder nodes whose ``path`` extends ``base``, summing sizes.
+
+        Like webpack-bundle-analyzer, folders with a single subfolder and no
+        modules of their own are merged into one node.
+        """
+        root: Dict[str, Any] = {'folders': {}, 'leaves': []}
+        for dirs, leaf in leaves:
+            node = root
+            for segment in dirs:
+                node = node['folders'].setdefault(segment, {'folders': {}, 'leaves': []})
+            node['leaves'].append(leaf)
+
+        def build(node: Dict[str, Any], path: str) -> List[Dict[str, Any]]:
+            groups = []
+            for segment, child in node['folders'].items():
+                # Single-folder chains collapse into one node ("dist/esm/utils")
+                label = segment
+                while len(child['folders']) == 1 and not child['leaves']:
+                    (segment, child), = child['folders'].items()
+                    label = f"{label}/{segment}"
+                child_path = f"{path}/{label}"
+                children = build(child, child_path)
+                groups.append({
+                    'label': label,
+                    'path': child_path,
+                    'statSize': sum(g['statSize'] for g in children),
+                    'parsedSize': sum(g['parsedSize'] for g in children),
+                    'gzipSize': sum(g['gzipSize'] for g in children),
+                    'groups': children,
+                })
+            return groups + node['leaves']
+
+        return build(root, base)
+
+    def iter_chunks(self) -> Iterator[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """Yield ``(chart data chunk node, stats.json modules)`` per chunk."""
+        rng = self.rng
+        entry_chunks: Dict[int, Dict[str, bool]] = {}
+        for entrypoint, chunk_ids in self.initial.items():
+            for chunk_id in chunk_ids:
+                entry_chunks.setdefault(chunk_id, {})[entrypoint] = True
+        entry_of = {chunk_ids[-1]: entrypoint for entrypoint, chunk_ids in self.initial.items()}
+
+        module_id = 0
+        issuers: List[int] = []
+        for chunk_id, (label, count) in enumerate(zip(self.labels, self.chunk_module_counts())):
+            leaves: List[Tuple[List[str], Dict[str, Any]]] = []
+            stats_modules = []
+            remaining = count
+            while remaining:
+                module_id += 1
+                reasons = [{'moduleId': issuers[-rng.randint(1, min(len(issuers), 500))],
+                            'type': 'harmony import specifier'}] if issuers else []
+                if not stats_modules and chunk_id in entry_of:
+                    reasons.append({'moduleId': None, 'type': 'entry', 'loc': entry_of[chunk_id]})
+                issuers.append(module_id)
+
+                path = self.module_path()
+                inner_count = min(remaining, rng.randint(2, 24)) if rng.random() < self.concatenated else 1
+                remaining -= inner_count
+                if inner_count == 1:
+                    stat, parsed, gzip = self.sizes()
+                    leaf = {'id': module_id, 'label': path.rsplit('/', 1)[1], 'path': path,
+                            'statSize': stat, 'parsedSize': parsed, 'gzipSize': gzip}
+                    stats_modules.append({'id': module_id, 'name': path, 'size': stat,
+                                          'chunks': [chunk_id], 'reasons': reasons})
+                    leaves.append((path[2:].split('/')[:-1], leaf))
+                    continue
+
+                # Scope-hoisted module: inner modules nest under the concatenated path
+                concat_path = f"{path} + {inner_count - 1} modules (concatenated)"
+                inner_leaves, inner_stats = [], []
+                inner_path = path
+                for i in range(inner_count):
+                    if i:
+                        inner_path = f"{path.rsplit('/', 1)[0]}/{rng.choice(_WORDS)}-{i}.js" \
+                            if rng.random() < 0.6 else self.module_path()
+                    stat, parsed, gzip = self.sizes()
+                    inner_leaves.append((inner_path[2:].split('/')[:-1], {
+                        'id': None, 'label': inner_path.rsplit('/', 1)[1],
+                        'path': f"{concat_path}/{inner_path[2:]}",
+                        'statSize': stat, 'parsedSize': parsed, 'gzipSize': gzip,
+                        'inaccurateSizes': True}))
+                    inner_stats.append({'name': inner_path, 'size': stat})
+                groups = self.folder_nodes(inner_leaves, concat_path)
+                stat = sum(m['size'] for m in inner_stats)
+                leaves.append((path[2:].split('/')[:-1], {
+                    'id': module_id, 'label': concat_path.rsplit('/', 1)[1], 'path': concat_path,
+                    'statSize': stat,
+                    'parsedSize': sum(leaf['parsedSize'] for _, leaf in inner_leaves),
+                    'gzipSize': sum(leaf['gzipSize'] for _, leaf in inner_leaves),
+                    'concatenated': True, 'groups': groups}))
+                stats_modules.append({'id': module_id, 'name': concat_path, 'size': stat,
+                                      'chunks': [chunk_id], 'reasons': reasons, 'modules': inner_stats})
+
+            groups = self.folder_nodes(leaves, '.')
+            yield {
+                'label': label,
+                'isAsset': True,
+                'statSize': sum(g['statSize'] for g in groups),
+                'parsedSize': sum(g['parsedSize'] for g in groups),
+                'gzipSize': sum(g['gzipSize'] for g in groups),
+                'groups': groups,
+                'isInitialByEntrypoint': entry_chunks.get(chunk_id, {}),
+            }, stats_modules
+
+    def filler(self, size: int = 1 << 16) -> str:
+        """Pseudo-JavaScript with realistic redundancy for the emitted chunk files."""
+        rng = self.rng
+        parts, total = [], 0
+        while total < size:
+            name = f"{rng.choice(_WORDS)}{rng.randint(0, 999)}"
+            parts.append(f'{rng.randint(1, 99999)}:function(e,t,n){{"use strict";'
+                         f'var {name}=n({rng.randint(1, 99999)});'
+                         f't.{name}=function(r){{return {name}.{rng.choice(_WORDS)}(r,"{rng.getrandbits(32):x}")}}}},')
+            total += len(parts[-1])
+        return ''.join(parts)
+
+    def write(self, directory: Path, max_chunk_bytes: int = 64 << 20) -> Dict[str, Path]:
+        """Write the report, stats.json, chunk files and lockfile under ``directory``.
+
+        The report and stats.json are streamed chunk by chunk, so a million
+        modules only need memory for one chunk at a time. Chunk files hold
+        pseudo-JavaScript of the chunk's parsed size, scaled down so they
+        total at most ``max_chunk_bytes``.
+        """
+        build_dir = directory / '.next'
+        (build_dir / 'analyze').mkdir(parents=True, exist_ok=True)
+        paths = {
+            'html': build_dir / 'analyze' / 'client.html',
+            'stats': build_dir / 'stats.json',
+            'lockfile': directory / 'package-lock.json',
+            'build_dir': build_dir,
+        }
+
+        chunks, assets = [], []
+        with open(paths['html'], 'w', encoding='utf-8') as html, \
+                open(paths['stats'], 'w', encoding='utf-8') as stats:
+            html.write('<!DOCTYPE html><html><head><meta charset="utf-8"/><title>client</title>'
+                       '</head><body><script>window.chartData = [')
+            stats.write('{"version":"5.98.0","hash":"synthetic","modules":[')
+            separator = ''
+            for chunk_id, (node, modules) in enumerate(self.iter_chunks()):
+                if chunk_id:
+                    html.write(',')
+                html.write(json.dumps(node, separators=(',', ':')))
+                for module in modules:
+                    stats.write(separator)
+                    stats.write(json.dumps(module, separators=(',', ':')))
+                    separator = ','
+                chunks.append({'id': chunk_id, 'names': [], 'files': [node['label']],
+                               'initial': bool(node['isInitialByEntrypoint'])})
+                assets.append({'name': node['label'], 'size': node['parsedSize'], 'chunks': [chunk_id]})
+            html.write('];</script></body></html>')
+
+            entrypoints = {name: {'name': name, 'chunks': chunk_ids,
+                                  'assets': [{'name': self.labels[i]} for i in chunk_ids]}
+                           for name, chunk_ids in self.initial.items()}
+            stats.write('],"chunks":')
+            stats.write(json.dumps(chunks))
+            stats.write(',"assets":')
+            stats.write(json.dumps(assets))
+            stats.write(',"entrypoints":')
+            stats.write(json.dumps(entrypoints))
+            stats.write('}')
+
+        filler = self.filler()
+        scale = min(1.0, max_chunk_bytes / max(1, sum(asset['size'] for asset in assets)))
+        for asset in assets:
+            chunk_file = build_dir / asset['name']
+            chunk_file.parent.mkdir(parents=True, exist_ok=True)
+            size, offset = max(64, int(asset['size'] * scale)), self.rng.randrange(len(filler))
+            with open(chunk_file, 'w', encoding='utf-8') as f:
+                while size > 0:
+                    piece = filler[offset:offset + size]
+                    f.write(piece)
+                    size -= len(piece)
+                    offset = 0
+
+        self.write_lockfile(directory)
+        return paths
+
+    def write_lockfile(self, directory: Path) -> None:
+        """Write a lockfile v3 and package.json covering every synthetic package."""
+        rng = self.rng
+        count = len(self.packages)
+        direct = self.packages[:max(1, count // 3)]
+        packages: Dict[str, Any] = {'': {'name': 'synthetic-app', 'version': '1.0.0',
+                                         'dependencies': {name: '*' for name in direct}}}
+        for i, name in enumerate(self.packages):
+            dependencies = {self.packages[j]: '*'
+                            for j in rng.sample(range(i + 1, count), min(3, count - i - 1))}
+            dependencies.update({nested: '0.x' for nested, owner in self.nested.items() if owner == name})
+            packages[f"node_modules/{name}"] = {'version': f"{1 + i % 5}.{i % 13}.0",
+                                                'dependencies': dependencies}
+        for name, owner in self.nested.items():
+            packages[f"node_modules/{owner}/node_modules/{name}"] = {'version': '0.9.0'}
+
+        with open(directory / 'package-lock.json', 'w', encoding='utf-8') as f:
+            json.dump({'name': 'synthetic-app', 'lockfileVersion': 3, 'packages': packages}, f)
+        with open(directory / 'package.json', 'w', encoding='utf-8') as f:
+            json.dump({'name': 'synthetic-app', 'version': '1.0.0',
+                       'dependencies': {name: '*' for name in direct},
+                       'devDependencies': {self.packages[-1]: '*'}}, f, indent=2)
+
+
+def prepare_build(name: str, build: SyntheticBuild, work_dir: Path,
+                  max_chunk_bytes: int) -> Dict[str, Path]:
+    """Generate ``build`` under ``work_dir`` unless an identical one is already there."""
+    params = dict(build.params(), generator=BENCHMARK_VERSION, max_chunk_bytes=max_chunk_bytes)
+    directory = work_dir / name
+    manifest = directory / 'manifest.json'
+    try:
+        with open(manifest, 'r', encoding='utf-8') as f:
+            reusable = json.load(f) == params
+    except (OSError, ValueError):
+        reusable = False
+
+    if reusable:
+        build_dir = directory / '.next'
+        return {'html': build_dir / 'analyze' / 'client.html', 'stats': build_dir / 'stats.json',
+                'lockfile': directory / 'package-lock.json', 'build_dir': build_dir}
+
+    print(f"Generating synthetic build '{name}' ({build.module_count:,} modules) in {directory}")
+    paths = build.write(directory, max_chunk_bytes)
+    with open(manifest, 'w', encoding='utf-8') as f:
+        json.dump(params, f)
+    return paths
+
+
+class BenchmarkRunner:
+    """Times public :class:`BundleAnalyzer` operations on one synthetic build.
+
+    Every operation runs ``repeat`` times on a freshly prepared analyzer and
+    the fastest run counts; preparation (parsing the report an operation
+    reads from) is not timed. A final run under :mod:`tracemalloc` records
+    the peak memory growth of the operation itself. Printed output goes to
+    ``os.devnull`` so terminal speed does not skew the printers.
+    """
+
+    def __init__(self, paths: Dict[str, Path], repeat: int = 3, trace_memory: bool = True,
+                 patterns: Optional[List[str]] = None):
+        self.paths = paths
+        self.repeat = max(1, repeat)
+        self.trace_memory = trace_memory
+        self.patterns = patterns or ['*']
+        self.html_bytes = paths['html'].stat().st_size
+        self._loaded: Dict[str, BundleAnalyzer] = {}
+        self._compact = paths['build_dir'] / 'analyze' / 'bench.ahm'
+
+    def fresh(self, source: str = 'html') -> BundleAnalyzer:
+        return BundleAnalyzer(str(self.paths[source]), str(self.paths['build_dir']))
+
+    def extracted(self) -> BundleAnalyzer:
+        analyzer = self.fresh()
+        analyzer.extract_chart_data()
+        return analyzer
+
+    def loaded(self, source: str = 'html') -> BundleAnalyzer:
+        """An extracted and analyzed analyzer, built once per source and shared."""
+        if source not in self._loaded:
+            analyzer = self.fresh(source)
+            analyzer.extract_chart_data()
+            analyzer.analyze_modules()
+            self._loaded[source] = analyzer
+        analyzer = self._loaded[source]
+        analyzer.duplicates = None
+        return analyzer
+
+    def cold(self, source: str = 'html') -> BundleAnalyzer:
+        """A fresh analyzer with the compression cache of the build removed."""
+        cache = self.paths['build_dir'] / 'cache' / 'analyze-hot-modules' / 'compression.json'
+        with contextlib.suppress(FileNotFoundError):
+            cache.unlink()
+        return self.fresh(source)
+
+    def compact(self) -> BundleAnalyzer:
+        if not self._compact.exists():
+            self.loaded().export_results(str(self._compact))
+        return self.fresh('compact')
+
+    def operations(self) -> List[Tuple[str, str, Callable[[], BundleAnalyzer],
+                                       Callable[[BundleAnalyzer], int]]]:
+        """``(name, unit, prepare, run)`` per operation; ``run`` returns the items processed."""
+        self.paths['compact'] = self._compact
+
+        def modules(a: BundleAnalyzer) -> int:
+            return len(a.modules)
+
+        def chunk_bytes(a: BundleAnalyzer) -> int:
+            return sum(p.stat().st_size for p in (self.paths['build_dir'] / 'static').rglob('*.js'))
+
+        export_dir = self.paths['build_dir'] / 'analyze'
+        return [
+            ('extract_chart_data', 'bytes', self.fresh,
+             lambda a: a.extract_chart_data() and self.html_bytes),
+            ('extract_chart_data[stream]', 'bytes', self.fresh,
+             lambda a: a.extract_chart_data(streaming=True) and self.html_bytes),
+            ('extract_chart_data[stats]', 'bytes', lambda: self.cold('stats'),
+             lambda a: a.extract_chart_data() and self.paths['stats'].stat().st_size),
+            ('extract_chart_data[compact]', 'modules', self.compact,
+             lambda a: a.extract_chart_data() and modules(a)),
+            ('flatten_modules', 'modules', self.extracted,
+             lambda a: a.flatten_modules(a.chart_data) or modules(a)),
+            ('analyze_modules', 'modules', self.extracted,
+             lambda a: a.analyze_modules() or modules(a)),
+            ('get_top_modules', 'modules', self.loaded,
+             lambda a: a.get_top_modules(1000, 0) and modules(a)),
+            ('print_summary', 'modules', self.loaded, lambda a: a.print_summary() or modules(a)),
+            ('print_hot_modules', 'modules', self.loaded,
+             lambda a: a.print_hot_modules(100, 0) or modules(a)),
+            ('print_chunk_analysis', 'chunks', self.loaded,
+             lambda a: a.print_chunk_analysis() or len(a.chart_data)),
+            ('print_optimization_suggestions', 'modules', self.loaded,
+             lambda a: a.print_optimization_suggestions() or modules(a)),
+            ('find_duplicates', 'modules', self.loaded, lambda a: a.find_duplicates() and modules(a)),
+            ('evaluate_budgets', 'modules', self.loaded,
+             lambda a: BudgetGate(BENCHMARK_BUDGETS).evaluate(a) and modules(a)),
+            ('compute_entrypoint_costs', 'entrypoints', self.loaded,
+             lambda a: len(a.compute_entrypoint_costs())),
+            ('compute_package_rollup', 'modules', self.loaded,
+             lambda a: a.compute_package_rollup(str(self.paths['lockfile'])) and modules(a)),
+            ('compute_retained_sizes', 'modules', lambda: self.loaded('stats'),
+             lambda a: a.compute_retained_sizes() and modules(a)),
+            ('measure_chunk_sizes', 'bytes', self.cold,
+             lambda a: a.measure_chunk_sizes(['gzip-6']) and chunk_bytes(a)),
+            ('print_module_tree', 'modules', self.loaded,
+             lambda a: a.print_module_tree(1000, 0) or 1000),
+            ('print_compact_tree', 'modules', self.loaded,
+             lambda a: a.print_compact_tree(1000, 0) or 1000),
+            ('export_results[json]', 'modules', self.loaded,
+             lambda a: a.export_results(str(export_dir / 'bench-export.json'), 1000, 0) or 1000),
+            ('export_results[compact]', 'modules', self.loaded,
+             lambda a: a.export_results(str(export_dir / 'bench-export.ahm')) or modules(a)),
+        ]
+
+    def selected(self, name: str) -> bool:
+        return any(fnmatch.fnmatchcase(name, pattern) for pattern in self.patterns)
+
+    def measure(self, prepare: Callable[[], BundleAnalyzer], run: Callable[[BundleAnalyzer], int],
+                name: str, trace_memory: bool) -> Tuple[Dict[str, Any], int]:
+        """Run the operation once as a profiler phase; return its record and item count."""
+        analyzer = prepare()
+        gc.collect()
+        profiler = PhaseProfiler(trace_memory=trace_memory)
+        try:
+            with open(os.devnull, 'w', encoding='utf-8') as sink, contextlib.redirect_stdout(sink):
+                with profiler.phase(name):
+                    items = run(analyzer)
+        finally:
+            profiler.stop()
+        return profiler.records[0], items or 0
+
+    def run(self) -> Dict[str, Dict[str, Any]]:
+        results: Dict[str, Dict[str, Any]] = {}
+        for name, unit, prepare, run in self.operations():
+            if not self.selected(name):
+                continue
+            try:
+                runs = [self.measure(prepare, run, name, False) for _ in range(self.repeat)]
+            except Exception as e:
+                # A crash (e.g. RecursionError on deep trees) fails the run, not the suite
+                results[name] = {'error': f"{type(e).__name__}: {e}"}
+                continue
+            record, items = min(runs, key=lambda r: r[0]['wall_ms'])
+            result = {
+                'wall_ms': round(record['wall_ms'], 3),
+                'cpu_ms': round(record['cpu_ms'], 3),
+                'items': items,
+                'unit': unit,
+                'per_s': round(items / (record['wall_ms'] / 1000)) if record['wall_ms'] > 0 else None,
+            }
+            if self.trace_memory:
+                result['peak_kb'] = self.measure(prepare, run, name, True)[0]['peak_kb']
+            results[name] = result
+        self._loaded.clear()
+        return results
+
+
+def format_rate(result: Dict[str, Any]) -> str:
+    if not result.get('per_s'):
+        return '-'
+    if result['unit'] == 'bytes':
+        return f"{result['per_s'] / (1024 * 1024):,.1f} MB/s"
+    return f"{result['per_s']:,} {result['unit']}/s"
+
+
+def print_results(scale: str, params: Dict[str, Any], results: Dict[str, Dict[str, Any]]) -> None:
+    print(f"\n⏱️  Benchmark: {scale} ({params['modules']:,} modules, {params['chunks']:,} chunks, "
+          f"{params['entrypoints']:,} entrypoints, depth {params['depth']})")
+    print("=" * 96)
+    print(f"{'Operation':<34} {'Wall ms':>11} {'CPU ms':>11} {'Peak MB':>9} {'Throughput':>26}")
+    print("-" * 96)
+    for name, result in results.items():
+        if 'error' in result:
+            print(f"{name:<34} {'failed':>11}  {result['error'][:48]}")
+            continue
+        peak = f"{result['peak_kb'] / 1024:.1f}" if 'peak_kb' in result else '-'
+        print(f"{name:<34} {result['wall_ms']:>11.1f} {result['cpu_ms']:>11.1f} {peak:>9} "
+              f"{format_rate(result):>26}")
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__ if np is not None else None,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float,
+            memory_threshold: float, min_delta_ms: float) -> int:
+    """Print changes against ``baseline`` and return the number of regressions.
+
+    Wall time regresses when it grows by more than ``threshold`` and by at
+    least ``min_delta_ms`` (sub-millisecond operations are mostly noise);
+    peak memory when it grows by more than ``memory_threshold`` and 1 MB.
+    Scales generated with different parameters are skipped.
+    """
+    print(f"\n📉 Baseline Comparison (threshold: time +{threshold:.0%}, memory +{memory_threshold:.0%})")
+    print("=" * 96)
+    if baseline.get('environment') != report['environment']:
+        print(f"Warning: baseline environment differs: {baseline.get('environment')}")
+
+    regressions = 0
+    print(f"{'Scale':<8} {'Operation':<34} {'Metric':<8} {'Baseline':>12} {'Current':>12} {'Change':>9}  Verdict")
+    print("-" * 96)
+    for scale, current in report['scales'].items():
+        base = baseline.get('scales', {}).get(scale)
+        if base is None:
+            print(f"{scale:<8} (not in baseline)")
+            continue
+        if base['params'] != current['params']:
+            print(f"{scale:<8} (skipped: baseline was generated with {base['params']})")
+            continue
+
+        for name, result in current['operations'].items():
+            before = base['operations'].get(name)
+            if 'error' in result:
+                regressions += 1
+                print(f"{scale:<8} {name:<34} {'':<8} {'':>12} {'':>12} {'':>9}  FAILED")
+                continue
+            if before is None or 'error' in before:
+                print(f"{scale:<8} {name:<34} {'':<8} {'-':>12} {'-':>12} {'':>9}  new")
+                continue
+            checks = [('wall_ms', 'time', threshold, min_delta_ms)]
+            if 'peak_kb' in result and 'peak_kb' in before:
+                checks.append(('peak_kb', 'memory', memory_threshold, 1024))
+            for key, metric, limit, floor in checks:
+                old, new = before[key], result[key]
+                change = (new - old) / old if old else 0.0
+                if change > limit and new - old >= floor:
+                    verdict = 'REGRESSION'
+                    regressions += 1
+                elif change < -limit and old - new >= floor:
+                    verdict = 'faster' if metric == 'time' else 'smaller'
+                else:
+                    continue
+                print(f"{scale:<8} {name:<34} {metric:<8} {old:>12,.1f} {new:>12,.1f} {change:>+9.1%}  {verdict}")
+
+    print(f"\n{'❌' if regressions else '✅'} {regressions} regression(s)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analyze_hot_modules.py on synthetic builds")
+    parser.add_argument('--scales', default='1k,10k',
+                        help=f"Comma-separated preset scales ({', '.join(SCALES)})")
+    parser.add_argument('--modules', type=int, help='Custom scale with N leaf modules (overrides --scales)')
+    parser.add_argument('--chunks', type=int, help='Chunks for --modules')
+    parser.add_argument('--entrypoints', type=int, help='Entrypoints for --modules')
+    parser.add_argument('--depth', type=int, default=24,
+                        help='Maximum directory nesting of source modules')
+    parser.add_argument('--concatenated', type=float, default=0.15,
+                        help='Share of modules emitted as concatenated groups')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for the synthetic build')
+    parser.add_argument('--operations', default='*',
+                        help='Comma-separated glob patterns of operations to run')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per operation (fastest counts)')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Skip the tracemalloc run that records peak memory')
+    parser.add_argument('--work-dir', default=str(DEFAULT_WORK_DIR),
+                        help='Directory for generated synthetic builds')
+    parser.add_argument('--max-chunk-bytes', type=int, default=64,
+                        help='Total size cap in MB for emitted chunk files')
+    parser.add_argument('--generate-only', action='store_true', help='Generate the builds and exit')
+    parser.add_argument('--output', '-o', help='Write the results as JSON')
+    parser.add_argument('--baseline', help='Compare against a stored baseline; exit 1 on regressions')
+    parser.add_argument('--save-baseline', help='Store the results as a baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed relative slowdown (0.2 = 20%%)')
+    parser.add_argument('--memory-threshold', type=float,
+                        help='Allowed relative peak memory growth (default: --threshold)')
+    parser.add_argument('--min-delta-ms', type=float, default=5.0,
+                        help='Ignore slowdowns smaller than this many milliseconds')
+
+    args = parser.parse_args()
+
+    if args.modules:
+        chunks = args.chunks or max(10, args.modules // 250)
+        scales = {f"custom-{args.modules}": {
+            'modules': args.modules, 'chunks': chunks,
+            'entrypoints': args.entrypoints or max(5, chunks // 3)}}
+    else:
+        unknown = [s for s in args.scales.split(',') if s not in SCALES]
+        if unknown:
+            parser.error(f"unknown scale(s): {', '.join(unknown)} (choose from {', '.join(SCALES)})")
+        scales = {s: SCALES[s] for s in args.scales.split(',')}
+
+    work_dir = Path(args.work_dir)
+    report: Dict[str, Any] = {'version': BENCHMARK_VERSION, 'environment': environment(), 'scales': {}}
+    for name, scale in scales.items():
+        build = SyntheticBuild(scale['modules'], scale['chunks'], scale['entrypoints'],
+                               args.depth, args.concatenated, args.seed)
+        paths = prepare_build(name, build, work_dir, args.max_chunk_bytes << 20)
+        if args.generate_only:
+            print(f"{name}: {paths['html']}\n{' ' * len(name)}  {paths['stats']}")
+            continue
+
+        runner = BenchmarkRunner(paths, args.repeat, not args.no_memory, args.operations.split(','))
+        results = runner.run()
+        print_results(name, build.params(), results)
+        report['scales'][name] = {'params': build.params(), 'operations': results}
+
+    if args.generate_only:
+        return
+
+    failed = [f"{scale}/{name}" for scale, data in report['scales'].items()
+              for name, result in data['operations'].items() if 'error' in result]
+    if failed:
+        print(f"\n❌ Failed operations: {', '.join(failed)}")
+
+    for filename in (args.output, args.save_baseline):
+        if filename:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"\n💾 Results written to: {filename}")
+
+    if args.baseline:
+        try:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error reading baseline {args.baseline}: {e}")
+            sys.exit(2)
+        memory_threshold = args.memory_threshold if args.memory_threshold is not None else args.threshold
+        if compare(report, baseline, args.threshold, memory_threshold, args.min_delta_ms):
+            sys.exit(1)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# Copyright (c) 2025 Bivex
+#
+# Author: Bivex
+# Available for contact via email: support@b-b.top
+# For up-to-date contact information:
+# https://github.com/bivex
+#
+# Licensed under the MIT License.
+# Commercial licensing available upon request.
+"""
+Regression tests for analyze_hot_modules.py helpers.
+
+Run with ``python -m pytest test_analyze_hot_modules.py`` or
+``python -m unittest test_analyze_hot_modules``.
+"""
+
+import json
+import tracemalloc
+import unittest
+
+from analyze_hot_modules import (BudgetGate, BundleAnalyzer, ModuleCategorizer, PhaseProfiler, install_path,
+                                 iter_json_object)
+
+
+class InstallPathTest(unittest.TestCase):
+    def test_leading_node_modules(self):
+        self.assertEqual(install_path('node_modules/react/index.js'), 'node_modules/react')
+        self.assertEqual(install_path('node_modules/a/node_modules/@scope/b/lib/x.js'),
+                         'node_modules/a/node_modules/@scope/b')
+
+    def test_non_leading_node_modules(self):
+        self.assertEqual(install_path('packages/ui/node_modules/react/index.js'),
+                         'packages/ui/node_modules/react')
+        self.assertEqual(install_path('../../node_modules/react/index.js'), 'node_modules/react')
+        self.assertEqual(install_path('(app-pages-browser)/node_modules/@radix-ui/react-slot/dist/index.mjs'),
+                         'node_modules/@radix-ui/react-slot')
+        self.assertEqual(install_path('node_modules/.pnpm/react@18.2.0/node_modules/react/index.js'),
+                         'node_modules/.pnpm/react@18.2.0/node_modules/react')
+
+    def test_local_module(self):
+        self.assertIsNone(install_path('src/app/page.tsx'))
+
+
+class ModuleCategorizerTest(unittest.TestCase):
+    def test_first_listed_path_category_wins(self):
+        categorizer = ModuleCategorizer()
+        self.assertEqual(categorizer.categorize('src/components/ui/button.tsx'), 'UI Components')
+        self.assertEqual(categorizer.categorize('src/app/page.tsx'), 'Local Components')
+
+    def test_package_rules(self):
+        categorizer = ModuleCategorizer()
+        self.assertEqual(categorizer.categorize('node_modules/react-dom/index.js'), 'React Ecosystem')
+        self.assertEqual(categorizer.categorize('node_modules/@radix-ui/react-slot/dist/index.mjs'),
+                         'UI Components')
+        self.assertEqual(categorizer.categorize('node_modules/left-pad/index.js'), 'Other Dependencies')
+
+    def test_user_rules_with_named_groups(self):
+        categorizer = ModuleCategorizer({'default': 'Other', 'categories': [
+            {'name': 'Pages', 'paths': [r'(?P<dir>app|pages)/']},
+            {'name': 'Source', 'paths': [r'(?P<dir>src)/']},
+        ]})
+        self.assertEqual(categorizer.categorize('src/app/page.tsx'), 'Pages')
+        self.assertEqual(categorizer.categorize('src/lib/util.ts'), 'Source')
+        self.assertEqual(categorizer.categorize('lib/util.ts'), 'Other')
+
+    def test_categorize_rows_by_module_key(self):
+        analyzer = BundleAnalyzer('client.html')
+        analyzer.categorizer = ModuleCategorizer({'default': 'Other', 'categories': [
+            {'name': 'Pages', 'paths': [r'^src/app/']},
+            {'name': 'App', 'paths': [r'(^|/)app/']},
+            {'name': 'Local', 'paths': [r'(^|/)src/']},
+        ]})
+        module = {'id': 927, 'label': 'accordion.tsx', 'path': './src/components/ui/accordion.tsx',
+                  'statSize': 2530, 'parsedSize': 1084, 'gzipSize': 532}
+        page = {'id': 12, 'label': 'page.tsx', 'path': './src/app/page.tsx',
+                'statSize': 900, 'parsedSize': 400, 'gzipSize': 200}
+        analyzer.chart_data = [{
+            'label': 'static/chunks/app/[locale]/page-282cb218297ce221.js', 'isAsset': True,
+            'statSize': 3430, 'parsedSize': 1484, 'gzipSize': 732,
+            'groups': [{'label': 'src', 'path': './src', 'statSize': 3430, 'parsedSize': 1484, 'gzipSize': 732,
+                        'groups': [module, page]}]}]
+        analyzer.analyze_modules()
+        rows = analyzer.get_top_modules(10, 0)
+        self.assertIn('static/chunks/app/', rows[0]['path'])
+        categories = analyzer._categorize_modules(rows)
+        self.assertEqual({name: [row['key'] for row in modules] for name, modules in categories.items()},
+                         {'Pages': ['src/app/page.tsx'], 'Local': ['src/components/ui/accordion.tsx']})
+
+
+class BudgetGateTest(unittest.TestCase):
+    def verdict(self, unmatched, checks=()):
+        return {'checks': list(checks), 'unmatched': unmatched, 'summary': {'skipped_delta_checks': 0}}
+
+    def test_combine_unmatched_in_every_target(self):
+        gate = BudgetGate({'budgets': [
+            {'chunk': 'static/chunks/main.js', 'gzip': '10KB'},
+            {'chunk': 'static/chunks/mian.js', 'gzip': '10KB'},
+            {'package': 'left-pad', 'gzip': '1KB', 'severity': 'warn'}]})
+        check = {'budget': 'chunk static/chunks/main.js', 'subject': 'static/chunks/main.js', 'status': 'pass'}
+        verdict = gate.combine({
+            'client': self.verdict(['chunk static/chunks/mian.js', 'package left-pad'], [check]),
+            'edge': self.verdict(['chunk static/chunks/main.js', 'chunk static/chunks/mian.js',
+                                  'package left-pad'])})
+        self.assertEqual(verdict['unmatched'], ['chunk static/chunks/mian.js', 'package left-pad'])
+        self.assertEqual(verdict['summary']['unmatched_errors'], 1)
+        self.assertFalse(verdict['passed'])
+        self.assertEqual(verdict['checks'][0]['target'], 'client')
+
+
+class IterJsonObjectTest(unittest.TestCase):
+    def test_matches_iterencode(self):
+        encoder = json.JSONEncoder(indent=2, ensure_ascii=False)
+        rows = [{'path': 'node_modules/react/index.js', 'sizes': [1, 2]}, {'path': 'src/é\n.ts'}]
+        document = {'summary': {'total': 2}, 'rows': rows, 'empty': [], 'none': None}
+        members = [('summary', document['summary']), ('rows', iter(rows)),
+                   ('empty', iter([])), ('none', None)]
+        self.assertEqual(''.join(iter_json_object(members, encoder)), ''.join(encoder.iterencode(document)))
+        self.assertEqual(''.join(iter_json_object([], encoder)), '{}')
+
+
+class PhaseProfilerTest(unittest.TestCase):
+    def test_stop_keeps_outer_tracing(self):
+        tracemalloc.start()
+        try:
+            profiler = PhaseProfiler()
+            with profiler.phase('outer'):
+                pass
+            profiler.stop()
+            self.assertTrue(tracemalloc.is_tracing())
+        finally:
+            tracemalloc.stop()
+
+    def test_stop_ends_own_tracing(self):
+        self.assertFalse(tracemalloc.is_tracing())
+        profiler = PhaseProfiler()
+        with profiler.phase('outer'):
+            self.assertTrue(tracemalloc.is_tracing())
+        profiler.stop()
+        self.assertFalse(tracemalloc.is_tracing())
+
+
+if __name__ == '__main__':
+    unittest.main()